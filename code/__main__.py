@@ -25,4 +25,7 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    watchdog = FrameWatchdog(DEGRADE_STEPS,budget=FRAME_BUDGET,overrun=DEGRADE_OVERRUN,
+                             headroom=DEGRADE_HEADROOM,window=DEGRADE_WINDOW)
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,retained=True,step=GAME_STEP,
+             stats=True,watchdog=watchdog).run()
@@ -73,6 +73,13 @@ class Invaders(GameApp):
         _oldscore:      the score after previous waves [int]
         _oldalienspeed: the alien speed after the previous waves [int or float]
         _laterwave:     if the current wave is not the first [bool]
+        _overlays:      the messages built so far, keyed by their text and whether
+                        their fill was dropped, so that each message is only built
+                        once; the welcome message is kept under 'welcome' [dict of
+                        (str, bool) or str to GLabel or list of GLabels]
+        _preloader:     the loader reading the images, sounds and glyph atlases of the
+                        game in the background during the welcome screen [Preloader]
+        _statsKey:      if the 'f' key in the previous animation frame was held down [bool]
     """
 
     # DO NOT MAKE A NEW INITIALIZER!
@@ -91,10 +98,15 @@ class Invaders(GameApp):
         (in attribute _text) saying that the user should press to play a game.
         """
         self._lastkeys = False
+        self._statsKey = False
         self._state = STATE_INACTIVE
         self._oldlives = 3
         self._oldscore = 0
         self._laterwave = False
+        self._overlays = {}
+        self._preloader = Preloader(AssetManifest.scan(glyphs=PRELOAD_GLYPHS,
+                                                       voices=PRELOAD_VOICES))
+        self._preloader.start()
 
         self._welcomeText()
 
@@ -117,11 +129,13 @@ class Invaders(GameApp):
         message on the screen. The application remains in this state so long as the
         player never presses a key.  In addition, this is the state the application
         returns to when the game is over (all lives are lost or all aliens are dead).
+        While in this state, the assets of the game are loaded in the background.
 
         STATE_NEWWAVE: This is the state creates a new wave and shows it on the screen.
         The application switches to this state if the state was STATE_INACTIVE in the
         previous frame, and the player pressed a key. This state only lasts one animation
-        frame before switching to STATE_ACTIVE.
+        frame before switching to STATE_ACTIVE.  It first finishes loading any assets
+        that are left, so the wave itself never waits for the disk.
 
         STATE_ACTIVE: This is a session of normal gameplay.  The player can move the
         ship and fire laser bolts.  All of this should be handled inside of class Wave
@@ -139,16 +153,23 @@ class Invaders(GameApp):
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
 
+        In every state, pressing 'f' shows or hides the frame time statistics.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
         assert type(dt) == int or float
 
+        self._toggleStats()
         if self._state == STATE_INACTIVE:
+            self._preloader.poll()
             self._determineState()
         elif self._state == STATE_NEWWAVE:
+            self._preloader.finish()
             self._text = None
             self._wave = Wave()
+            self._wave.setStats(self.stats)
+            self._wave.setWatchdog(self.watchdog)
             self.afterFirst()
             self._state = STATE_ACTIVE
         elif (self._state == STATE_ACTIVE and self._wave.getShip() != None and
@@ -195,6 +216,9 @@ class Invaders(GameApp):
         Wave. In order to draw them, you either need to add getters for these attributes
         or you need to add a draw method to class Wave.  We suggest the latter.  See
         the example subcontroller.py from class.
+
+        While a wave is active, the ship and bolts are drawn blended between the last
+        two updates (see the attribute alpha of GameApp).
         """
         if self._text != None:
             try:
@@ -210,6 +234,8 @@ class Invaders(GameApp):
                         x.draw(self.view)
                 else:
                     self._text.draw(self.view)
+        elif self._state == STATE_ACTIVE:
+            self._wave.draw(self.view,self.alpha)
         else:
             self._wave.draw(self.view)
 
@@ -243,6 +269,20 @@ class Invaders(GameApp):
 
         self._lastkeys = curr_keys
 
+    def _toggleStats(self):
+        """
+        Shows or hides the frame time statistics when the player presses 'f'.
+
+        A key press is when a key is pressed for the FIRST TIME, as in
+        _determinePause.  This does nothing if the game does not record its frame
+        statistics.
+        """
+        if self.stats is not None:
+            curr_key = self.input.is_key_down('f')
+            if curr_key == True and self._statsKey == False:
+                self.stats.overlay = not self.stats.overlay
+            self._statsKey = curr_key
+
     def _determinePause(self):
         """
         Determines if the game is paused assign STATE_PAUSED to self._state
@@ -260,57 +300,88 @@ class Invaders(GameApp):
             self._state = STATE_PAUSED
         self._lastkeys = curr_keys
 
+    def _overlay(self,text,**keywords):
+        """
+        Returns: the full-screen message showing text.
+
+        The message is only built the first time that text is shown; after that the
+        same GLabel is returned from _overlays, so showing it again (every frame while
+        paused, for instance) does not allocate or render anything.
+
+        If the frame watchdog has the 'overlay' step on, the message is built with the
+        opacity of its fill scaled by OVERLAY_ALPHA, so the fill is lighter while the
+        game is running over budget.
+
+        Parameter text: the text of the message
+        Precondition: text is a string
+
+        Parameter keywords: the other GLabel attributes of the message
+        Precondition: keywords are valid GLabel keywords (other than text), including
+        a fillcolor that is an RGBA list
+        """
+        lite = self.watchdog is not None and self.watchdog.degraded('overlay')
+        if not (text,lite) in self._overlays:
+            if lite:
+                fill = keywords['fillcolor']
+                keywords['fillcolor'] = fill[:3]+[fill[3]*OVERLAY_ALPHA]
+            self._overlays[(text,lite)] = GLabel(text=text,width=GAME_WIDTH,
+                                                 height=GAME_HEIGHT,x=GAME_WIDTH/2,
+                                                 y=GAME_HEIGHT/2,**keywords)
+        return self._overlays[(text,lite)]
+
     def _pauseText(self):
         """
-        Creates the message when the player dies.
+        Creates the message when the game is paused.
+
+        There is one message for each number of lives remaining, drawn from the same
+        glyph atlas as the score.
         """
-        self._text = GLabel(text="GAME PAUSED\nLives Remaining: "
+        self._text = self._overlay("GAME PAUSED\nLives Remaining: "
                             + str(self._wave.getLives())
                             + "\n\nPress 'S' to Continue",
                             font_name='Arcade.ttf',
                             font_size=50,halign='center',valign='middle',
-                            linecolor='yellow', fillcolor=[0,0,0,0.5],
-                            width=GAME_WIDTH, height=GAME_HEIGHT,
-                            x=GAME_WIDTH/2,y=GAME_HEIGHT/2)
+                            linecolor='yellow', fillcolor=[0,0,0,0.5],glyphs=True)
 
     def _deathText(self):
         """
         Creates the message when the player dies.
+
+        There is one message for each number of lives remaining, drawn from the same
+        glyph atlas as the score.
         """
-        self._text = GLabel(text="YOU DIED\nLives Remaining: "
+        self._text = self._overlay("YOU DIED\nLives Remaining: "
                             + str(self._wave.getLives())
                             + "\n\nPress 'S' to Continue",
                             font_name='Arcade.ttf',
                             font_size=50,halign='center',valign='middle',
-                            linecolor='yellow', fillcolor=[0,0,0,0.5],
-                            width=GAME_WIDTH, height=GAME_HEIGHT,
-                            x=GAME_WIDTH/2,y=GAME_HEIGHT/2)
+                            linecolor='yellow', fillcolor=[0,0,0,0.5],glyphs=True)
 
     def _gameOverText(self):
         """
         Creates the message when the game is over.
         """
-        self._text = GLabel(text="GAME OVER",font_name='Arcade.ttf',
+        self._text = self._overlay("GAME OVER",font_name='Arcade.ttf',
                             font_size=80,halign='center',valign='middle',
-                            linecolor='red',fillcolor=[0,0,0,0.8],
-                            width=GAME_WIDTH, height=GAME_HEIGHT,
-                            x=GAME_WIDTH/2,y=GAME_HEIGHT/2)
+                            linecolor='red',fillcolor=[0,0,0,0.8])
 
     def _completeText(self):
         """
         Creates the message when the wave is complete.
         """
-        self._text = GLabel(text="WAVE COMPLETE\n\nPress 'S' to\nStart a New Wave",
+        self._text = self._overlay("WAVE COMPLETE\n\nPress 'S' to\nStart a New Wave",
                             font_name='Arcade.ttf',font_size=80,halign='center',
-                            valign='middle',linecolor='yellow',fillcolor=[0,0,0,0.8],
-                            width=GAME_WIDTH, height=GAME_HEIGHT,
-                            x=GAME_WIDTH/2,y=GAME_HEIGHT/2)
+                            valign='middle',linecolor='yellow',fillcolor=[0,0,0,0.8])
 
     def _welcomeText(self):
         """
         Creates the welcome message.
+
+        The three labels of the message are kept in _overlays under the key 'welcome'.
         """
-        if self._state == STATE_INACTIVE:
+        if self._state == STATE_INACTIVE and 'welcome' in self._overlays:
+            self._text = self._overlays['welcome']
+        elif self._state == STATE_INACTIVE:
             self._text = [GLabel(text="Welcome to \nSpace Invaders",
                         font_name='Arcade.ttf',font_size=100,halign='center',
                         valign='middle',linecolor='yellow', height=GAME_HEIGHT+400,
@@ -329,5 +400,6 @@ class Invaders(GameApp):
                         GLabel(text="Press 'S' to Play",font_name='Arcade.ttf',
                         font_size=50,halign='center',valign='middle',x=GAME_WIDTH/2,
                         y=100,linecolor='yellow')]
+            self._overlays['welcome'] = self._text
         else:
             self._text = None
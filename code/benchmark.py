@@ -0,0 +1,291 @@
+"""
+Benchmark script for Alien Invaders
+
+This module times the hot paths of the game loop at several alien grid sizes and
+reports the results as JSON, so that the numbers can be compared between releases.
+It uses the headless game2d backend (see simulate.py), so the timings measure the
+game logic, not Kivy.
+
+For every grid size it measures
+
+    update           one call to Wave.update, with a bot at the controls
+    alienCollision   Wave.alienCollision with a player bolt in flight
+    shipCollision    Wave.shipCollision with alien bolts in flight
+    moveAliensH      one alien step
+    findLowestCells  Wave.findLowestCells
+    draw             Wave.draw to a headless view
+    init             Wave.__init__
+
+and, once, the startup of the Invaders application.  Each result has the number of
+calls, the mean, minimum, median and 95th percentile time per call in nanoseconds, the
+peak memory allocated during a call in bytes, and the change in the number of
+allocated memory blocks per call.
+
+To benchmark the default sizes and save the results, type
+
+    python benchmark.py --output bench.json
+"""
+import os
+os.environ.setdefault('GAME2D_HEADLESS', '1')
+
+import sys
+# consts.py reads positional arguments from sys.argv, so hide the options from it
+ARGUMENTS = sys.argv[1:]
+del sys.argv[1:]
+
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from consts import *
+from game2d import *
+from wave import *
+from simulate import bot
+
+# the grid sizes (rows, aliens per row) to benchmark; the last two are the largest
+# grids that start above the defense line and inside the window (see fits)
+GRID_SIZES = ((1,1),(1,15),(5,12),(9,1),(9,15))
+
+
+def measure(op, rows, cols, setup, call, count, prepare=None):
+    """
+    Returns: a dictionary with the timings and allocations of call.
+
+    The function setup is called once and its result is passed to every call.  If
+    prepare is not None, it is called with the same state before every call, outside of
+    the timed region.  The calls are first timed without tracing, and then repeated
+    under tracemalloc to measure allocations.  Only the blocks allocated by call itself
+    are counted, not those allocated by prepare.
+
+    Parameter op: the name of the operation
+    Precondition: op is a string
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+
+    Parameter setup: a function that returns the state for call
+    Precondition: setup is a function with no arguments
+
+    Parameter call: the function to measure
+    Precondition: call is a function with one argument
+
+    Parameter count: the number of calls to time
+    Precondition: count is an int > 0
+
+    Parameter prepare: the function to call (untimed) before every call
+    Precondition: prepare is None or a function with one argument
+    """
+    state = setup()
+    times = []
+    for x in range(count):
+        if prepare is not None:
+            prepare(state)
+        start = time.perf_counter_ns()
+        call(state)
+        times.append(time.perf_counter_ns()-start)
+    times.sort()
+
+    state = setup()
+    peak = 0
+    blocks = 0
+    tracemalloc.start()
+    for x in range(count):
+        if prepare is not None:
+            prepare(state)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        allocated = sys.getallocatedblocks()
+        call(state)
+        blocks += sys.getallocatedblocks()-allocated
+        peak = max(peak,tracemalloc.get_traced_memory()[1]-before)
+    tracemalloc.stop()
+
+    return {'op':op,'rows':rows,'cols':cols,'calls':count,
+            'mean_ns':sum(times)/count,'min_ns':times[0],
+            'p50_ns':times[count//2],'p95_ns':times[min(count-1,count*95//100)],
+            'peak_bytes':peak,'blocks_per_call':blocks/count}
+
+
+def fits(rows, cols):
+    """
+    Returns: True if a new wave of the given size can be played.
+
+    A wave with too many rows starts below the defense line, and is over before its
+    first frame; a wave with too many aliens per row starts outside of the window.
+    Benchmarking such a wave would only measure new waves.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+    """
+    wave = Wave(rows,cols)
+    formation = wave.getFormation()
+    right = formation.getX(0,cols-1)+ALIEN_WIDTH/2
+    return not wave.dLineCollision() and right <= GAME_WIDTH
+
+
+def playing(rows, cols, seed):
+    """
+    Returns: a function that builds a wave and input for the update benchmark.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+
+    Parameter seed: the random seed
+    Precondition: seed is an int
+    """
+    def setup():
+        seeds = random.Random(seed)
+        return [Wave(rows,cols,seeds.getrandbits(32)),GInput(),rows,cols,seeds]
+    return setup
+
+
+def turn(state):
+    """
+    Readies the wave in state for the next frame, starting a new wave if it is over.
+
+    Parameter state: the wave, input, rows, aliens per row and seeds of new waves
+    Precondition: state is a list [Wave, GInput, int, int, random.Random]
+    """
+    wave, input, rows, cols, seeds = state
+    if wave.getShip() is None:
+        if wave.getLives() == 0:
+            wave = state[0] = Wave(rows,cols,seeds.getrandbits(32))
+        else:
+            wave.makeShip()
+    if wave.getNoAliens() or wave.dLineCollision():
+        wave = state[0] = Wave(rows,cols,seeds.getrandbits(32))
+    bot(wave,input)
+
+
+def step(state):
+    """
+    Plays a single frame of the wave in state.
+
+    Parameter state: the wave, input, rows, aliens per row and seeds of new waves
+    Precondition: state is a list [Wave, GInput, int, int, random.Random]
+    """
+    state[0].update(state[1],1/60)
+
+
+def firing(rows, cols, player, aliens):
+    """
+    Returns: a function that builds a wave with bolts in flight that hit nothing.
+
+    The player bolt (if any) is just below the formation and the alien bolts are
+    spread out above the ship, so the collision tests do all their work but never
+    change the wave.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+
+    Parameter player: whether to fire a player bolt
+    Precondition: player is a bool
+
+    Parameter aliens: the number of alien bolts to fire
+    Precondition: aliens is an int >= 0
+    """
+    def setup():
+        wave = Wave(rows,cols)
+        bolts = wave.getBolts()
+        formation = wave.getFormation()
+        if player:
+            bolts.fire(formation.getX(0,cols//2),formation.getY(0,0)-ALIEN_V_PITCH,
+                       PLAYER_BOLT_SPEED)
+        for x in range(aliens):
+            bolts.fire((x+1)*GAME_WIDTH/(aliens+1),SHIP_BOTTOM+SHIP_HEIGHT*2,
+                       -ALIEN_BOLT_SPEED)
+        wave.isEachPlayerBolt()
+        return wave
+    return setup
+
+
+def startup():
+    """
+    Creates and starts a new Invaders application.
+    """
+    from app import Invaders
+    game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT)
+    game.start()
+    return game
+
+
+def run(sizes, count, seed):
+    """
+    Returns: the list of results for every operation and grid size.
+
+    Parameter sizes: the grid sizes to benchmark
+    Precondition: sizes is a sequence of (rows, aliens per row) pairs of ints > 0
+
+    Parameter count: the number of calls to time for each operation
+    Precondition: count is an int > 0
+
+    Parameter seed: the random seed
+    Precondition: seed is an int
+    """
+    results = []
+    for rows, cols in sizes:
+        results.append(measure('update',rows,cols,playing(rows,cols,seed),step,count,
+                               turn))
+        results.append(measure('alienCollision',rows,cols,firing(rows,cols,True,0),
+                               Wave.alienCollision,count))
+        results.append(measure('shipCollision',rows,cols,firing(rows,cols,False,8),
+                               Wave.shipCollision,count))
+        results.append(measure('moveAliensH',rows,cols,lambda: Wave(rows,cols),
+                               Wave.moveAliensH,count))
+        results.append(measure('findLowestCells',rows,cols,lambda: Wave(rows,cols),
+                               Wave.findLowestCells,count))
+        results.append(measure('draw',rows,cols,lambda: (Wave(rows,cols),GView()),
+                               lambda state: state[0].draw(state[1]),count))
+        results.append(measure('init',rows,cols,lambda: None,
+                               lambda state: Wave(rows,cols),max(count//50,5)))
+    results.append(measure('startup',ALIEN_ROWS,ALIENS_IN_ROW,lambda: None,
+                           lambda state: startup(),max(count//50,5)))
+    return results
+
+
+def main():
+    """
+    Runs the benchmarks requested on the command line and writes them as JSON.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Alien Invaders game loop')
+    parser.add_argument('--calls',type=int,default=500,
+                        help='number of timed calls per operation')
+    parser.add_argument('--size',type=int,nargs=2,action='append',metavar=('ROWS','COLS'),
+                        help='grid size to benchmark (may be repeated)')
+    parser.add_argument('--seed',type=int,default=0,help='random seed')
+    parser.add_argument('--output',default=None,help='file for the JSON results')
+    args = parser.parse_args(ARGUMENTS)
+
+    sizes = [tuple(size) for size in args.size] if args.size else GRID_SIZES
+    for rows, cols in sizes:
+        if rows < 1 or cols < 1 or not fits(rows,cols):
+            parser.error('a %d x %d wave does not fit in the window' % (rows,cols))
+    report = {'python':platform.python_version(),
+              'platform':platform.platform(),
+              'headless':bool(os.environ.get('GAME2D_HEADLESS')),
+              'results':run(sizes,args.calls,args.seed)}
+
+    if args.output is None:
+        json.dump(report,sys.stdout,indent=2)
+        print()
+    else:
+        with open(args.output,'w') as file:
+            json.dump(report,file,indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Texture atlas build script for Alien Invaders
+
+This module packs the small images in the Images folder (the ship, the aliens, the
+alien filmstrips and the sound icons) into a Kivy texture atlas, Images/images.atlas,
+with one or more pages named images-0.png, images-1.png and so on.  When the atlas is
+present, game2d loads it on startup and every image packed into it is drawn from a
+region of its page, so the objects on screen share a few textures instead of binding
+one texture each.
+
+Images larger than the maximum size (by default 256 pixels on either side) are left
+out.  The backgrounds are thousands of pixels wide and would not fit on any page.
+
+Run this script again whenever an image is added or changed:
+
+    python build_atlas.py
+"""
+import argparse
+import os
+import struct
+from kivy.atlas import Atlas
+
+# the folder with the images, relative to this module
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+
+# the name of the atlas (the game2d default), without the .atlas extension
+ATLAS_NAME = 'images'
+
+
+def image_size(path):
+    """
+    Returns: the (width, height) of the PNG file at path, or None if it is not a PNG.
+
+    Only the file header is read.
+
+    Parameter path: the path to the file
+    Precondition: path is a string
+    """
+    with open(path,'rb') as file:
+        header = file.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    return struct.unpack('>II',header[16:24])
+
+
+def select(limit):
+    """
+    Returns: the sorted list of paths of the images to pack.
+
+    An image is packed if it is a PNG with no side larger than limit that is not
+    itself an atlas page.
+
+    Parameter limit: the largest width or height of a packed image
+    Precondition: limit is an int > 0
+    """
+    result = []
+    for name in sorted(os.listdir(IMAGES)):
+        path = os.path.join(IMAGES,name)
+        if name.startswith(ATLAS_NAME+'-'):
+            continue
+        size = image_size(path)
+        if size is not None and max(size) <= limit:
+            result.append(path)
+    return result
+
+
+def main():
+    """
+    Builds the atlas with the options given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Pack the Alien Invaders images')
+    parser.add_argument('--size',type=int,default=512,help='width and height of a page')
+    parser.add_argument('--max',type=int,default=256,
+                        help='largest width or height of a packed image')
+    args = parser.parse_args()
+
+    for name in os.listdir(IMAGES):
+        if name.startswith(ATLAS_NAME+'-') or name == ATLAS_NAME+'.atlas':
+            os.remove(os.path.join(IMAGES,name))
+
+    paths = select(args.max)
+    filename, meta = Atlas.create(os.path.join(IMAGES,ATLAS_NAME),paths,args.size)
+    for page in sorted(meta):
+        print('%s: %s' % (page,', '.join(sorted(meta[page]))))
+    print('wrote %s' % filename)
+
+
+if __name__ == '__main__':
+    main()
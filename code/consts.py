@@ -50,6 +50,10 @@ ALIEN_V_SEP   = 16
 ALIEN_H_WALK  = ALIEN_WIDTH // 4
 # the number of vertical pixels to move an alien
 ALIEN_V_WALK  = ALIEN_HEIGHT // 2
+# the horizontal distance between the centers of neighboring aliens
+ALIEN_H_PITCH = ALIEN_WIDTH + ALIEN_H_SEP
+# the vertical distance between the centers of neighboring aliens
+ALIEN_V_PITCH = ALIEN_HEIGHT + ALIEN_V_SEP
 # The distance of the top alien from the top of the window
 ALIEN_CEILING = 100
 # the number of rows of aliens, in range 1..10
@@ -78,6 +82,8 @@ ALIEN_BOLT_SPEED  = 10
 PLAYER_BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the maximum number of bolts (player and alien) on screen at once
+BOLT_CAPACITY = 64
 
 
 ### GAME CONSTANTS ###
@@ -95,10 +101,47 @@ STATE_DEATH = 4
 #: state when the game is complete (won or lost)
 STATE_COMPLETE = 5
 
+# the fixed time of one game update in seconds; the ship and bolt speeds above
+# are in pixels per update
+GAME_STEP = 1/60.0
+
+# the target time of the work of one animation frame, in seconds
+FRAME_BUDGET = 1/60.0
+# the work the frame watchdog turns off, one step at a time, while frames run over
+# budget, cheapest to lose first
+DEGRADE_STEPS = ('background','overlay','hud','audio')
+# the fractions of FRAME_BUDGET above and below which the watchdog degrades or
+# restores a step, and the number of frames it averages first
+DEGRADE_OVERRUN  = 1.0
+DEGRADE_HEADROOM = 0.7
+DEGRADE_WINDOW   = 30
+# the fraction of the fill opacity of a message kept while 'overlay' is degraded
+OVERLAY_ALPHA = 0.5
+# the seconds between hud updates while the 'hud' step is degraded
+HUD_INTERVAL = 0.25
+# the seconds within which a repeated sound is dropped while 'audio' is degraded
+AUDIO_COALESCE = 0.05
+
+
 ### BACKGROUND CONSTANTS ###
 BACKGROUND_SPEED = 0.3
 
 
+### ASSET CONSTANTS ###
+
+# the glyph atlases (font, size) built during the welcome screen; every image and
+# sound in the asset folders is preloaded as well (see AssetManifest.scan)
+PRELOAD_GLYPHS = (('Arcade.ttf',50),)
+# the number of overlapping voices of the alien laser sound
+ALIEN_PEW_VOICES = 4
+# the most sounds that may play at once, over every sound of the shared SoundBank; a
+# wave has up to 10 that can overlap (4 alien laser voices, the ship laser, a blast, a
+# pop and 3 music notes), so heavy fire stops the sound that has played the longest
+SOUND_VOICES = 6
+# the sounds (file, voices) played over themselves, loaded during the welcome screen
+PRELOAD_VOICES = (('pew2.wav',ALIEN_PEW_VOICES),)
+
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
 """
 sys.argv is a list of the command line arguments when you run Python. These
@@ -4,13 +4,32 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+If the environment variable GAME2D_HEADLESS is set when this module is first imported,
+every class is replaced by the plain-Python stand-in from the headless module.  This
+allows a game to be simulated without Kivy, a window or any textures.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import os
+from .gcache import TextureCache
+from .gstats import FrameStats
+from .greplay import InputLog, InputReplay
+from .gwatchdog import FrameWatchdog
+from .gprofile import PhaseHook, StatsHook, CProfileHook, TracemallocHook
+
+if os.environ.get('GAME2D_HEADLESS'):
+    from .headless import GObject, GScene, GRectangle, GEllipse, GImage, GLabel
+    from .headless import GSprite, GSpriteBatch, GPath, GTriangle, GPolygon, GInput, GView
+    from .headless import Sound, SoundLibrary, SoundBank, VoicePool, GameApp, Preloader
+    from .gpreload import AssetManifest
+else:
+    from .gobject import GObject, GScene
+    from .grectangle import GRectangle, GEllipse, GImage, GLabel
+    from .gsprite import GSprite
+    from .gbatch import GSpriteBatch
+    from .gpath import GPath, GTriangle, GPolygon
+    from .gview import GInput, GView
+    from .sound import Sound, SoundLibrary, SoundBank, VoicePool
+    from .app import GameApp
+    from .gpreload import AssetManifest, Preloader
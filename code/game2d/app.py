@@ -16,8 +16,24 @@ from kivy.config import Config
 from kivy.clock  import Clock
 
 import os.path
+from .gcache import TextureCache
+from .gloop import FrameLoop
 
-class GameApp(kivy.app.App):
+
+def _drop_regions(name):
+    """
+    Removes the filmstrip frames cut from the texture ``name`` from the region cache.
+    
+    This is called by the texture cache whenever a texture leaves it.
+    
+    :param name: The file name
+    :type name:  ``str``
+    """
+    for key in [key for key in GameApp.REGION_CACHE if key[0] == name]:
+        del GameApp.REGION_CACHE[key]
+
+
+class GameApp(FrameLoop,kivy.app.App):
     """
     A controller class for a simple game application.
     
@@ -36,8 +52,19 @@ class GameApp(kivy.app.App):
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
     """
-    # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    # Class attribute for tracking textures (to reduce memory footprint); unbounded
+    # until a budget is given with the keyword texture_budget
+    TEXTURE_CACHE = TextureCache(on_evict=_drop_regions)
+    # Class attribute for tracking filmstrip frames, keyed by (file name, format)
+    REGION_CACHE = {}
+    # Class attribute for tracking shared sounds, keyed by file name
+    SOUND_CACHE = {}
+    # Class attribute for tracking the voices of overlapping sounds, keyed by file name
+    VOICE_CACHE = {}
+    # Class attribute mapping image names (without extension) to atlas regions
+    ATLAS_INDEX = {}
+    # The texture atlas in the Images folder that is loaded, if present, on creation
+    ATLAS_FILE = 'images.atlas'
     
     
     # MUTABLE ATTRIBUTES
@@ -170,24 +197,110 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
         
+        If the image was packed into a texture atlas (see :meth:`load_atlas`), the 
+        texture is a region of the atlas page instead of a texture of its own, so
+        every image on that page shares a single texture.  The region is cached as a
+        part of the page, and is evicted along with it.
+        
+        The cache keeps only the most recently used textures if it has a budget (see
+        :class:`TextureCache`), but never evicts a texture that an image or sprite
+        still holds.  A texture that was evicted is loaded again here.
+        
         This method will crash if name is not a valid file.
         
         :param name: The file name
         :type name:  ``str``
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            return cls.TEXTURE_CACHE[name]
+        texture = cls.TEXTURE_CACHE.get(name)
+        if texture is not None:
+            return texture
         
+        region = cls.ATLAS_INDEX.get(os.path.splitext(name)[0])
         try:
-            from kivy.core.image import Image
-            texture = Image(name).texture
-            cls.TEXTURE_CACHE[name] = texture
+            if region is None:
+                from kivy.core.image import Image
+                texture = Image(name).texture
+                cls.TEXTURE_CACHE.add(name,texture)
+            else:
+                page = cls.load_texture(region[0])
+                texture = page.get_region(region[1],region[2],region[3],region[4])
+                cls.TEXTURE_CACHE.add(name,texture,region[0])
         except:
             texture = None
         
         return texture
     
+    @classmethod
+    def load_atlas(cls,name):
+        """
+        Returns: The number of images in the given texture atlas
+        
+        The ``name`` must refer to a Kivy ``.atlas`` file in the **Images** folder, with
+        its pages next to it.  Every image in the atlas is added to the atlas index, so
+        that :meth:`load_texture` returns a region of the atlas page for it from now
+        on.  Images are matched by file name without the extension.  The pages are not
+        loaded until one of their images is used.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        import json
+        assert cls.is_image(name), '%s is not an atlas file' % repr(name)
+        with open(os.path.join(cls.images,name)) as file:
+            atlas = json.load(file)
+        
+        count = 0
+        for page in atlas:
+            for image in atlas[page]:
+                x, y, width, height = atlas[page][image]
+                cls.ATLAS_INDEX[image] = (page,x,y,width,height)
+                count += 1
+        return count
+    
+    @classmethod
+    def load_regions(cls,name,format):
+        """
+        Returns: The frames of the given filmstrip, or None if it cannot be loaded
+        
+        The ``name`` must refer to the file in the **Images** folder.  The image is
+        divided into a grid with ``format[0]`` rows and ``format[1]`` columns, and the
+        frames are returned as a tuple of texture regions, arranged left-to-right, 
+        top-to-bottom.  The frames are cached, so every sprite with the same source 
+        and format shares a single tuple.  That tuple must not be modified.
+        
+        This method will crash if name is not a valid file.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param format: The number of rows and columns in the filmstrip
+        :type format:  2-element ``tuple`` of ``int``
+        """
+        key = (name,format)
+        if key in cls.REGION_CACHE:
+            return cls.REGION_CACHE[key]
+        
+        texture = cls.load_texture(name)
+        if not texture:
+            return None
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        frames = []
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                frames.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),
+                                                 int(width),int(height)))
+                tx += width
+            ty += height
+        
+        regions = tuple(frames)
+        cls.REGION_CACHE[key] = regions
+        return regions
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -195,18 +308,69 @@ class GameApp(kivy.app.App):
         
         The ``name`` should refer to the file in in the texture cache.  If the texture
         is in the cache, it will return the cached texture before removing it.  Otherwise, 
-        it will returning None.
+        it will returning None.  Any filmstrip frames cut from the texture are removed
+        as well, as are the images cut from it if it is an atlas page.
         
         :param name: The file name
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            texture = cls.TEXTURE_CACHE[name]
-            del cls.TEXTURE_CACHE[name]
-            return texture
+        return cls.TEXTURE_CACHE.pop(name)
+    
+    @classmethod
+    def load_sound(cls,name):
+        """
+        Returns: The shared sound for the given file name
+        
+        The ``name`` must refer to a file in the **Sounds** folder.  If the sound has 
+        already been loaded (or preloaded, see :class:`Preloader`), it will return the 
+        cached sound.  Otherwise, it will load the sound and cache it before returning it.
+        
+        Every call with the same name returns the same :class:`Sound`, which can only 
+        play once at a time.  Create a :class:`Sound` directly for an effect that must 
+        overlap with itself.
+        
+        This method will crash if name is not a valid file.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert cls.is_sound(name), '%s is not a sound file' % repr(name)
+        if name in cls.SOUND_CACHE:
+            return cls.SOUND_CACHE[name]
+        
+        from .sound import Sound
+        sound = Sound(name)
+        cls.SOUND_CACHE[name] = sound
+        return sound
+    
+    @classmethod
+    def load_voices(cls,name,count):
+        """
+        Returns: A list of count voices of the given sound file
         
-        return None
+        The ``name`` must refer to a file in the **Sounds** folder.  Unlike 
+        :meth:`load_sound`, every voice is a :class:`Sound` of its own, so the voices 
+        can play over each other (see :class:`VoicePool`).  The voices are cached (or
+        preloaded, see :class:`Preloader`) by file name, and only the voices that are
+        missing from the cache are loaded.  Every call with the same name returns the
+        same first voices.
+        
+        This method will crash if name is not a valid file.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param count: The number of voices
+        :type count:  ``int`` > 0
+        """
+        assert cls.is_sound(name), '%s is not a sound file' % repr(name)
+        voices = cls.VOICE_CACHE.setdefault(name,[])
+        if len(voices) < count:
+            from .sound import Sound
+            while len(voices) < count:
+                voices.append(Sound(name))
+        return voices[:count]
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -223,6 +387,15 @@ class GameApp(kivy.app.App):
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
+        The optional keyword ``retained`` puts the view in retained mode (see 
+        :class:`GView`), so the canvas is no longer rebuilt every animation frame.
+        The optional keyword ``texture_budget`` limits the texture cache to the given 
+        number of bytes (see :class:`TextureCache`).  The optional keyword ``step``
+        runs :meth:`update` with a fixed time step (see :attr:`step`).  The optional
+        keyword ``stats`` records the frame times (see :attr:`stats`); it is either True
+        or a :class:`FrameStats`.  The optional keyword ``watchdog`` is a 
+        :class:`FrameWatchdog` to give the cost of every frame (see :attr:`watchdog`).
+        
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
@@ -232,19 +405,31 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        r = keywords.pop('retained', False)
+        b = keywords.pop('texture_budget', GameApp.TEXTURE_CACHE.budget)
+        s = keywords.pop('step', None)
+        t = keywords.pop('stats', None)
+        g = keywords.pop('watchdog', None)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert type(r) == bool, 'retained %s is not a bool' % repr(r)
+        assert b is None or type(b) == int, 'texture_budget %s is not an int' % repr(b)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._retained = r
+        self._setloop(f,s,t,g)
+        GameApp.TEXTURE_CACHE.budget = b
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
         self._setpaths()
+        if GameApp.is_image(GameApp.ATLAS_FILE):
+            GameApp.load_atlas(GameApp.ATLAS_FILE)
         
         # Tell Kivy to build the application
         kivy.app.App.__init__(self,**keywords)
@@ -261,6 +446,7 @@ class GameApp(kivy.app.App):
         from .gview import GInput, GView
         self._view = GView()
         self._view.size_hint = (1,1)
+        self._view.retained = self._retained
         self._input = GInput()
         self._input._register(self._view)
         return self.view
@@ -283,6 +469,8 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
+        if self._stats is not None:
+            self._stats.close()
         kivy.app.App.stop(self)
         sys.exit(0)
     
@@ -339,20 +527,6 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,0)
         self.start()
     
-    def _refresh(self,dt):
-        """
-        Processes a single animation frame.
-        
-        This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
-        
-        :param dt: time in seconds since last update
-        :type dt:  ``int`` or ``float``
-        """
-        self.view.clear()
-        self.update(dt)
-        self.draw()
-    
     def _setpaths(self):
         """
         Sets the resource paths to the application directory.
@@ -0,0 +1,161 @@
+"""
+A module to support drawing many sprites at once.
+
+Every :class:`GSprite` has its own drawing cache, with its own transforms, color and
+rectangle, so drawing a hundred sprites issues a hundred sets of instructions.  When
+many sprites share a filmstrip and are never rotated or scaled individually (such as a
+formation of aliens), a :class:`GSpriteBatch` can draw all of them as a single mesh.
+The cost of drawing a batch does not depend on the number of sprites in it.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .app import GameApp
+
+# #mark -
+class GSpriteBatch(object):
+    """
+    A class representing a group of sprites drawn from one filmstrip as a single mesh.
+
+    The filmstrip is given by the image file ``source`` and the grid size ``format``,
+    exactly as for a :class:`GSprite`.  Every sprite in the batch has the same
+    ``width`` and ``height``; only the center and the animation frame of each sprite
+    differ.  These are set all at once with :meth:`update`, which rewrites the mesh in
+    place.  The drawing cache itself is built only once.
+
+    A batch is not a :class:`GObject`.  It cannot be rotated, scaled or tinted, and it
+    has no collision test.  Keep the game objects for the game logic and use the batch
+    to draw them.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for this batch.
+
+        **invariant**. Value is a string refering to a valid file.
+        """
+        return self._source
+
+    @property
+    def format(self):
+        """
+        The grid size of the filmstrip, as (rows, columns).
+
+        **invariant**. Value is a 2-element tuple of ints > 0.
+        """
+        return self._format
+
+    @property
+    def width(self):
+        """
+        The width of every sprite in this batch.
+
+        **invariant**. Value is an int or float > 0.
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of every sprite in this batch.
+
+        **invariant**. Value is an int or float > 0.
+        """
+        return self._height
+
+    @property
+    def count(self):
+        """
+        The number of sprites currently in this batch.
+
+        **invariant**. Value is an int >= 0.
+        """
+        return self._count
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        The keywords ``source``, ``width`` and ``height`` are required.  The keyword
+        ``format`` is the grid size of the filmstrip, as for :class:`GSprite`, and
+        defaults to (1,1).  For example, to draw aliens from the filmstrip
+        ``alien-strip1.png``, which has 3 rows and 2 columns, use the constructor::
+
+            GSpriteBatch(source='alien-strip1.png',format=(3,2),width=33,height=33)
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        source = keywords['source']
+        format = keywords['format'] if 'format' in keywords else (1,1)
+        assert GameApp.is_image(source), '%s is not an image file' % repr(source)
+        assert type(format) == tuple and len(format) == 2, '%s is not a tuple pair' % repr(format)
+        assert type(keywords['width']) in [int,float], 'width %s is not a number' % repr(keywords['width'])
+        assert type(keywords['height']) in [int,float], 'height %s is not a number' % repr(keywords['height'])
+        self._source = source
+        self._format = format
+        self._width  = keywords['width']
+        self._height = keywords['height']
+        self._count  = 0
+
+        # The frames are shared with every sprite using the same filmstrip
+        self._images = GameApp.load_regions(source,format)
+        if self._images:
+            self._coords = [tuple(image.tex_coords) for image in self._images]
+            texture = self._images[0]
+            GameApp.TEXTURE_CACHE.hold(source,self)
+        else:
+            self._coords = [(0,0,0,0,0,0,0,0)]*(format[0]*format[1])
+            texture = None
+            print('Failed to load',repr(source))
+
+        self._mesh = Mesh(mode='triangles',texture=texture,
+                          fmt=[(b'vPosition',2,'float'),(b'vTexCoords0',2,'float')])
+        self._cache = InstructionGroup()
+        self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
+
+    # PUBLIC METHODS
+    def update(self,sprites):
+        """
+        Sets the sprites in this batch.
+
+        Each sprite is given as a tuple (x, y, frame), where (x, y) is the center of the
+        sprite and frame is its animation frame, as in :class:`GSprite`.  The mesh is
+        rewritten in place; its indices are only rebuilt when the number of sprites
+        changes.
+
+        :param sprites: the sprites to draw
+        :type sprites:  sequence of (``float``, ``float``, ``int``) tuples
+        """
+        w = self._width/2.0
+        h = self._height/2.0
+        vertices = []
+        for x, y, frame in sprites:
+            uv = self._coords[frame]
+            vertices.extend((x-w,y-h,uv[0],uv[1],
+                             x+w,y-h,uv[2],uv[3],
+                             x+w,y+h,uv[4],uv[5],
+                             x-w,y+h,uv[6],uv[7]))
+        self._mesh.vertices = vertices
+
+        count = len(vertices)//16
+        if count != self._count:
+            indices = []
+            for base in range(0,4*count,4):
+                indices.extend((base,base+1,base+2,base+2,base+3,base))
+            self._mesh.indices = indices
+            self._count = count
+
+    def draw(self, view):
+        """
+        Draws this batch in the provided view.
+
+        The batch is a single drawing command, however many sprites it holds.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cache)
@@ -0,0 +1,414 @@
+"""
+A module to support bounded texture caching.
+
+:class:`GameApp` keeps every texture it loads in a cache so that images using the same
+file share one texture.  This module provides that cache.  It behaves like a dictionary
+from file names to textures, but it can be given a budget in bytes.  When the textures
+in the cache take more memory than the budget, the least recently used ones are
+evicted.  A texture is never evicted while something still draws with it: the
+drawables that load textures (:class:`GImage`, :class:`GSprite` and
+:class:`GSpriteBatch`) register as its holders, and the texture is held until every
+holder is garbage collected or moves on to another texture.  Evicting such a texture
+would only make the next load create a second copy of it.  Textures can also be pinned
+to keep them in the cache whether or not they are held.
+
+An entry can be registered as part of another entry (its owner), such as an image that
+is a region of an atlas page.  Such entries take no memory of their own, are never
+evicted on their own, and are removed along with their owner.
+
+This module does not import Kivy until a texture is measured, so it may be used by the
+headless backend.
+"""
+import weakref
+from collections import OrderedDict
+
+# #mark -
+class TextureCache(object):
+    """
+    A class representing a cache of textures with least-recently-used eviction.
+
+    The cache supports the dictionary operations ``in``, ``[]``, ``del``, ``len`` and
+    iteration, as well as :meth:`get`, :meth:`pop`, :meth:`add` and :meth:`clear`.
+    Reading a texture (with ``[]`` or :meth:`get`) marks it as recently used and counts
+    as a hit or a miss.  The memory of a texture is estimated as width x height x bytes per
+    pixel; mipmaps and driver overhead are not counted.
+
+    The optional ``on_evict`` function is called with the name of every entry that is
+    removed from the cache, whether it is evicted, deleted or cleared.
+    """
+    # The bytes per pixel of each texture color format
+    PIXEL_BYTES = {'rgba':4,'bgra':4,'rgb':3,'bgr':3,'luminance_alpha':2,
+                   'luminance':1,'alpha':1}
+
+    # MUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The maximum number of bytes of textures to keep, or None for no limit.
+
+        Lowering the budget evicts textures immediately.  Pinned and held textures are
+        never evicted, so the resident bytes can exceed the budget if too much is in use.
+
+        **invariant**: Value is ``None`` or an ``int`` >= 0.
+        """
+        return self._budget
+
+    @budget.setter
+    def budget(self,value):
+        assert value is None or (type(value) == int and value >= 0), \
+            'budget %s is not a non-negative int' % repr(value)
+        self._budget = value
+        self._evict()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def resident(self):
+        """
+        The estimated number of bytes of the textures in this cache.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._resident
+
+    @property
+    def hits(self):
+        """
+        The number of reads that found their texture.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        The number of reads that did not find their texture.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._misses
+
+    @property
+    def evictions(self):
+        """
+        The number of textures evicted to stay within the budget.
+
+        Entries removed along with their owner are not counted.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._evictions
+
+    # BUILT-IN METHODS
+    def __init__(self,budget=None,on_evict=None):
+        """
+        Creates a new, empty texture cache.
+
+        :param budget: The maximum number of bytes to keep, or None for no limit
+        :type budget:  ``int`` >= 0 or ``None``
+
+        :param on_evict: The function to call with the name of each removed entry
+        :type on_evict:  a function of one argument or ``None``
+        """
+        self._entries  = OrderedDict()   # name -> (texture, bytes, owner)
+        self._parts    = {}              # owner -> set of names
+        self._pinned   = set()
+        self._users    = {}              # name -> number of holders
+        self._holders  = weakref.WeakKeyDictionary()   # holder -> (name, finalizer)
+        self._resident = 0
+        self._hits   = 0
+        self._misses = 0
+        self._evictions = 0
+        self._budget = None
+        self.on_evict = on_evict
+        self.budget = budget
+
+    def __contains__(self,name):
+        """
+        :return: True if the texture for name is in this cache
+        :rtype:  ``bool``
+        """
+        return name in self._entries
+
+    def __getitem__(self,name):
+        """
+        :return: The texture for name, marking it as recently used
+        :rtype:  ``Texture``
+        """
+        if not name in self._entries:
+            self._misses += 1
+            raise KeyError(name)
+        return self.get(name)
+
+    def __setitem__(self,name,texture):
+        """
+        Adds the texture for name to this cache.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param texture: The texture
+        :type texture:  ``Texture``
+        """
+        self.add(name,texture)
+
+    def __delitem__(self,name):
+        """
+        Removes the texture for name (and any entries it owns) from this cache.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if not name in self._entries:
+            raise KeyError(name)
+        self._remove(name)
+
+    def __len__(self):
+        """
+        :return: The number of entries in this cache
+        :rtype:  ``int``
+        """
+        return len(self._entries)
+
+    def __iter__(self):
+        """
+        :return: An iterator over the names in this cache, least recently used first
+        :rtype:  iterator of ``str``
+        """
+        return iter(list(self._entries))
+
+    # PUBLIC METHODS
+    def get(self,name,default=None):
+        """
+        Returns: The texture for name, or default if it is not in this cache
+
+        The texture (and its owner, if any) is marked as recently used.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param default: The value to return on a miss
+        :type default:  any
+        """
+        if not name in self._entries:
+            self._misses += 1
+            return default
+        self._hits += 1
+        self._entries.move_to_end(name)
+        owner = self._entries[name][2]
+        if owner in self._entries:
+            self._entries.move_to_end(owner)
+        return self._entries[name][0]
+
+    def add(self,name,texture,owner=None):
+        """
+        Adds the texture for name to this cache, evicting textures if necessary.
+
+        If ``owner`` is given, the texture is part of the texture cached as ``owner``
+        (for instance, a region of an atlas page).  It is then counted as taking no
+        memory and is removed whenever its owner is.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param texture: The texture
+        :type texture:  ``Texture``
+
+        :param owner: The name of the entry this texture is part of, or None
+        :type owner:  ``str`` or ``None``
+        """
+        if name in self._entries:
+            self._remove(name)
+        size = 0 if owner is not None else self._sizeof(texture)
+        self._entries[name] = (texture,size,owner)
+        self._resident += size
+        if owner is not None:
+            self._parts.setdefault(owner,set()).add(name)
+        self._evict(name)
+
+    def pop(self,name,default=None):
+        """
+        Returns: The texture for name after removing it, or default if it is absent
+
+        This is not counted as a hit or a miss.  Any entries that are part of the
+        texture are removed as well.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param default: The value to return if name is not in this cache
+        :type default:  any
+        """
+        if not name in self._entries:
+            return default
+        texture = self._entries[name][0]
+        self._remove(name)
+        return texture
+
+    def pin(self,name):
+        """
+        Keeps the texture for name (and its parts) in this cache until unpinned.
+
+        A name may be pinned before its texture is loaded.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        self._pinned.add(name)
+
+    def unpin(self,name):
+        """
+        Allows the texture for name to be evicted again.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        self._pinned.discard(name)
+        self._evict()
+
+    def hold(self,name,holder):
+        """
+        Keeps the texture for name (and the entry it is part of) in this cache while
+        holder uses it.
+
+        The texture is held until holder is garbage collected or holds another texture.
+        Holding the same texture again does nothing, so a drawable may call this every
+        time it rebuilds its drawing instructions.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param holder: The object drawing with the texture
+        :type holder:  any object that supports weak references
+        """
+        entry = self._holders.get(holder)
+        if entry is not None:
+            if entry[0] == name:
+                return
+            entry[1]()
+        self._users[name] = self._users.get(name,0)+1
+        self._holders[holder] = (name,weakref.finalize(holder,self._release,name))
+
+    def is_held(self,name):
+        """
+        Returns: True if name, or an entry that is part of it, has a holder
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if name in self._users:
+            return True
+        for part in self._parts.get(name,()):
+            if part in self._users:
+                return True
+        return False
+
+    def is_pinned(self,name):
+        """
+        Returns: True if name is pinned
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return name in self._pinned
+
+    def clear(self):
+        """
+        Removes every entry from this cache.
+
+        Pins and statistics are kept.
+        """
+        for name in list(self._entries):
+            if name in self._entries:
+                self._remove(name)
+
+    def stats(self):
+        """
+        Returns: A dictionary with the statistics of this cache
+
+        The keys are 'entries', 'resident', 'budget', 'hits', 'misses', 'evictions',
+        'pinned' and 'held' (the number of names with a holder).
+        """
+        return {'entries':len(self._entries),'resident':self._resident,
+                'budget':self._budget,'hits':self._hits,'misses':self._misses,
+                'evictions':self._evictions,'pinned':len(self._pinned),
+                'held':len(self._users)}
+
+    # HIDDEN METHODS
+    def _sizeof(self,texture):
+        """
+        Returns: The estimated number of bytes of the given texture
+
+        :param texture: The texture
+        :type texture:  ``Texture``
+        """
+        try:
+            from kivy.graphics.texture import TextureRegion
+            if isinstance(texture,TextureRegion):
+                return 0
+        except ImportError:
+            pass
+        if texture is None:
+            return 0
+        colorfmt = getattr(texture,'colorfmt','rgba')
+        return int(texture.width)*int(texture.height)*self.PIXEL_BYTES.get(colorfmt,4)
+
+    def _remove(self,name):
+        """
+        Removes the entry for name and every entry that is part of it.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        texture, size, owner = self._entries.pop(name)
+        self._resident -= size
+        if owner is not None and owner in self._parts:
+            self._parts[owner].discard(name)
+        for part in self._parts.pop(name,()):
+            if part in self._entries:
+                self._remove(part)
+        if self.on_evict is not None:
+            self.on_evict(name)
+
+    def _release(self,name):
+        """
+        Drops one holder of name, evicting textures if it was the last one.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        count = self._users.get(name,0)-1
+        if count > 0:
+            self._users[name] = count
+        else:
+            self._users.pop(name,None)
+            self._evict()
+
+    def _evict(self,keep=None):
+        """
+        Evicts the least recently used textures until the cache is within budget.
+
+        Pinned or held entries, parts of other entries, and the entry ``keep`` (and the
+        entry it is part of) are skipped.
+
+        :param keep: The name of an entry that must not be evicted, or None
+        :type keep:  ``str`` or ``None``
+        """
+        if self._budget is None or self._resident <= self._budget:
+            return
+        if keep in self._entries and self._entries[keep][2] is not None:
+            keep = (keep,self._entries[keep][2])
+        else:
+            keep = (keep,)
+        for name in list(self._entries):
+            if self._resident <= self._budget:
+                break
+            if not name in self._entries or name in keep or name in self._pinned:
+                continue
+            if self.is_held(name):
+                continue
+            texture, size, owner = self._entries[name]
+            if owner is not None or size == 0:
+                continue
+            self._remove(name)
+            self._evictions += 1
@@ -0,0 +1,530 @@
+"""
+A module to support fast text rendering with glyph atlases.
+
+A Kivy label rasterizes its entire string into a new texture every time the text
+changes.  This module provides an alternative for text that changes often (scores,
+counters) or is shown on many screens.  The printable characters of a font are
+rendered once into a :class:`GlyphAtlas`, shared by every label with the same font,
+size and weight.  A :class:`GlyphText` then lays out a string as textured quads from
+that atlas in a single mesh, so changing the text only rewrites the mesh vertices.
+
+You do not normally use these classes directly.  Create a :class:`GLabel` with the
+keyword ``glyphs=True`` instead.
+
+The atlas has no kerning, and characters outside of the printable ASCII range are
+drawn as '?'.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.core.text import Label as CoreLabel
+
+# #mark -
+class GlyphAtlas(object):
+    """
+    A class representing the printable characters of a font rendered to one texture.
+
+    The characters are rendered in white, in a block of ``ROWS`` lines, so that any
+    color can be applied when the quads are drawn.  Atlases are cached by font name,
+    size and weight; use :meth:`get` rather than the constructor.
+
+    Laid out strings are memoized as well, so that labels showing the same string share
+    the same vertices.  The memo is cleared once it grows past ``LAYOUT_LIMIT`` strings.
+    """
+    # The characters in the atlas (the space is handled as an advance only)
+    CHARSET = ''.join(chr(c) for c in range(33,127))
+    # The number of lines the characters are split across
+    ROWS = 8
+    # The maximum number of memoized layouts per atlas
+    LAYOUT_LIMIT = 256
+    # Class attribute for tracking atlases, keyed by (font name, font size, bold)
+    ATLAS_CACHE = {}
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture holding the rendered characters.
+
+        **invariant**: Value is a Kivy ``Texture``.
+        """
+        return self._texture
+
+    @property
+    def line_height(self):
+        """
+        The height of a single line of text in pixels.
+
+        **invariant**: Value is a ``float`` > 0.
+        """
+        return self._lineh
+
+    # CLASS METHODS
+    @classmethod
+    def get(cls,font_name,font_size,bold=False):
+        """
+        Returns: The glyph atlas for the given font, creating it if necessary
+
+        :param font_name: The font file name (or None for the default Kivy font)
+        :type font_name:  ``str`` or ``None``
+
+        :param font_size: The font size in points
+        :type font_size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether the font is bold
+        :type bold:  ``bool``
+        """
+        key = (font_name,font_size,bold)
+        if not key in cls.ATLAS_CACHE:
+            cls.ATLAS_CACHE[key] = cls(font_name,font_size,bold)
+        return cls.ATLAS_CACHE[key]
+
+    # BUILT-IN METHODS
+    def __init__(self,font_name,font_size,bold=False):
+        """
+        Creates a new glyph atlas by rendering the character set once.
+
+        :param font_name: The font file name (or None for the default Kivy font)
+        :type font_name:  ``str`` or ``None``
+
+        :param font_size: The font size in points
+        :type font_size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether the font is bold
+        :type bold:  ``bool``
+        """
+        options = {'font_size':font_size,'bold':bold}
+        if font_name:
+            options['font_name'] = font_name
+
+        step  = (len(self.CHARSET)+self.ROWS-1)//self.ROWS
+        lines = [self.CHARSET[pos:pos+step] for pos in range(0,len(self.CHARSET),step)]
+        label = CoreLabel(text='\n'.join(lines),**options)
+        label.refresh()
+        self._texture = label.texture
+        self._lineh = self._texture.height/float(len(lines))
+        self._space = label.get_extents(' ')[0]
+
+        # Each glyph is (width, texture coordinates)
+        self._glyphs = {}
+        for row in range(len(lines)):
+            line = lines[row]
+            top  = self._texture.height-row*self._lineh
+            for pos in range(len(line)):
+                left  = label.get_extents(line[:pos])[0] if pos else 0
+                right = label.get_extents(line[:pos+1])[0]
+                region = self._texture.get_region(left,int(top-self._lineh),
+                                                  right-left,int(self._lineh))
+                self._glyphs[line[pos]] = (float(right-left),tuple(region.tex_coords))
+        self._layouts = {}
+
+    # PUBLIC METHODS
+    def layout(self,text,halign='left'):
+        """
+        Returns: The tuple (vertices, indices, width, height) for the given text
+
+        The vertices are in the format (x, y, u, v), with the origin at the bottom left
+        corner of the text block.  Lines are separated by '\\n' and aligned within the
+        block by ``halign``.  The result is memoized and must not be modified.
+
+        :param text: The text to lay out
+        :type text:  ``str``
+
+        :param halign: The horizontal alignment of the lines
+        :type halign:  one of 'left', 'right', or 'center'
+        """
+        key = (text,halign)
+        if key in self._layouts:
+            return self._layouts[key]
+
+        lines  = text.split('\n')
+        widths = [sum(self._advance(c) for c in line) for line in lines]
+        width  = max(widths)
+        height = self._lineh*len(lines)
+
+        vertices = []
+        indices  = []
+        for row in range(len(lines)):
+            x = 0.0
+            if halign == 'center':
+                x = (width-widths[row])/2.0
+            elif halign == 'right':
+                x = width-widths[row]
+            y = height-(row+1)*self._lineh
+            for c in lines[row]:
+                if c == ' ':
+                    x += self._space
+                    continue
+                advance, uv = self._glyphs.get(c,self._glyphs['?'])
+                base = len(vertices)//4
+                vertices.extend((x,y,uv[0],uv[1],
+                                 x+advance,y,uv[2],uv[3],
+                                 x+advance,y+self._lineh,uv[4],uv[5],
+                                 x,y+self._lineh,uv[6],uv[7]))
+                indices.extend((base,base+1,base+2,base+2,base+3,base))
+                x += advance
+
+        if len(self._layouts) >= self.LAYOUT_LIMIT:
+            self._layouts.clear()
+        result = (vertices,indices,width,height)
+        self._layouts[key] = result
+        return result
+
+    # HIDDEN METHODS
+    def _advance(self,c):
+        """
+        Returns: The horizontal advance of the character c
+
+        :param c: The character
+        :type c:  ``str`` of length 1
+        """
+        if c == ' ':
+            return self._space
+        return self._glyphs.get(c,self._glyphs['?'])[0]
+
+
+# #mark -
+class GlyphText(object):
+    """
+    A class that draws text from a :class:`GlyphAtlas`.
+
+    This class stands in for the Kivy ``Label`` inside of a :class:`GLabel`, and so it
+    supports the subset of that interface used by ``GLabel``: the text and font
+    attributes, the color, the widget geometry (``pos``, ``size``, ``center`` and the
+    edges), ``texture_size``, ``texture_update``, ``bind`` and ``canvas``.  The canvas
+    holds a single mesh.  It is built once, and a text change only replaces the mesh
+    vertices.  When the text box is larger than the text, the text block is placed in
+    the box according to ``halign`` and ``valign``.
+    """
+
+    # TEXT ATTRIBUTES
+    @property
+    def text(self):
+        """
+        The text to display.
+
+        **invariant**: Value is a ``str``.
+        """
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        self._text = value
+        self._dirty = True
+
+    @property
+    def font_name(self):
+        """
+        The font file name, or None for the default Kivy font.
+
+        **invariant**: Value is a ``str`` or ``None``.
+        """
+        return self._fname
+
+    @font_name.setter
+    def font_name(self,value):
+        self._fname = value
+        self._atlas = None
+
+    @property
+    def font_size(self):
+        """
+        The font size in points.
+
+        **invariant**: Value is an ``int`` or ``float`` > 0.
+        """
+        return self._fsize
+
+    @font_size.setter
+    def font_size(self,value):
+        self._fsize = value
+        self._atlas = None
+
+    @property
+    def bold(self):
+        """
+        Whether the font is bold.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._bold
+
+    @bold.setter
+    def bold(self,value):
+        self._bold = value
+        self._atlas = None
+
+    @property
+    def halign(self):
+        """
+        The alignment of the lines within the text block.
+
+        **invariant**: Value is one of 'left', 'right', or 'center'.
+        """
+        return self._halign
+
+    @halign.setter
+    def halign(self,value):
+        self._halign = value
+        self._dirty = True
+
+    @property
+    def valign(self):
+        """
+        The vertical alignment of the text block within the text box.
+
+        This only matters when the text box is taller than the text.
+
+        **invariant**: Value is one of 'top', 'middle', or 'bottom'.
+        """
+        return self._valign
+
+    @valign.setter
+    def valign(self,value):
+        self._valign = value
+        self._place()
+
+    @property
+    def color(self):
+        """
+        The text color.
+
+        **invariant**: Value is a 4-element list of floats between 0 and 1.
+        """
+        return self._color.rgba
+
+    @color.setter
+    def color(self,value):
+        self._color.rgba = value
+
+    @property
+    def texture_size(self):
+        """
+        The size of the laid out text.
+
+        **invariant**: Value is a 2-element list of numbers >= 0.
+        """
+        return list(self._tsize)
+
+    # GEOMETRY ATTRIBUTES
+    @property
+    def pos(self):
+        """
+        The position of the bottom left corner.
+
+        **invariant**: Value is a 2-element sequence of numbers.
+        """
+        return [self._trans.x,self._trans.y]
+
+    @pos.setter
+    def pos(self,value):
+        self._trans.xy = (value[0],value[1])
+
+    @property
+    def x(self):
+        """
+        The left edge.
+
+        **invariant**: Value is an ``int`` or ``float``.
+        """
+        return self._trans.x
+
+    @x.setter
+    def x(self,value):
+        self._trans.x = value
+
+    @property
+    def y(self):
+        """
+        The bottom edge.
+
+        **invariant**: Value is an ``int`` or ``float``.
+        """
+        return self._trans.y
+
+    @y.setter
+    def y(self,value):
+        self._trans.y = value
+
+    @property
+    def size(self):
+        """
+        The size of the text box.
+
+        **invariant**: Value is a 2-element sequence of numbers >= 0.
+        """
+        return list(self._size)
+
+    @size.setter
+    def size(self,value):
+        self._size = (value[0],value[1])
+        self._place()
+
+    @property
+    def width(self):
+        """
+        The width of the text box.
+
+        **invariant**: Value is an ``int`` or ``float`` >= 0.
+        """
+        return self._size[0]
+
+    @property
+    def height(self):
+        """
+        The height of the text box.
+
+        **invariant**: Value is an ``int`` or ``float`` >= 0.
+        """
+        return self._size[1]
+
+    @property
+    def center(self):
+        """
+        The center of the text box.
+
+        **invariant**: Value is a 2-element sequence of numbers.
+        """
+        return [self.x+self.width/2.0,self.y+self.height/2.0]
+
+    @center.setter
+    def center(self,value):
+        self.pos = (value[0]-self.width/2.0,value[1]-self.height/2.0)
+
+    @property
+    def right(self):
+        """
+        The right edge.
+
+        **invariant**: Value is an ``int`` or ``float``.
+        """
+        return self.x+self.width
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width
+
+    @property
+    def top(self):
+        """
+        The top edge.
+
+        **invariant**: Value is an ``int`` or ``float``.
+        """
+        return self.y+self.height
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge.
+
+        **invariant**: Value is an ``int`` or ``float``.
+        """
+        return self.y
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value
+
+    @property
+    def canvas(self):
+        """
+        The graphics instructions drawing this text.
+
+        **invariant**: Value is an ``InstructionGroup``.
+        """
+        return self._canvas
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates new glyph text.
+
+        This constructor accepts the keywords ``text``, ``font_name``, ``font_size``,
+        ``bold``, ``halign``, ``valign`` and ``color``.  Any other keyword (such as the geometry
+        keywords passed on by :class:`GLabel`) is ignored.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._color  = Color(1,1,1,1)
+        self._trans  = Translate(0,0)
+        self._offset = Translate(0,0)
+        self._mesh   = Mesh(mode='triangles',fmt=[(b'vPosition',2,'float'),
+                                                  (b'vTexCoords0',2,'float')])
+        self._canvas = InstructionGroup()
+        self._canvas.add(PushMatrix())
+        self._canvas.add(self._color)
+        self._canvas.add(self._trans)
+        self._canvas.add(self._offset)
+        self._canvas.add(self._mesh)
+        self._canvas.add(PopMatrix())
+
+        self._atlas = None
+        self._size  = (0,0)
+        self._tsize = (0,0)
+        self._callbacks = []
+
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        self.bold   = keywords['bold']   if 'bold'   in keywords else False
+        self.halign = keywords['halign'] if 'halign' in keywords else 'left'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'bottom'
+        if 'color' in keywords:
+            self.color = keywords['color']
+        self.texture_update()
+
+    # PUBLIC METHODS
+    def bind(self,**keywords):
+        """
+        Registers callbacks for property changes.
+
+        Only ``texture_size`` is supported.  The callback is called with this object
+        and the new size whenever a text or font change alters the size of the text.
+
+        :param keywords: the callbacks to register
+        :type keywords:  keys are property names
+        """
+        assert list(keywords) == ['texture_size'], 'only texture_size may be bound'
+        self._callbacks.append(keywords['texture_size'])
+
+    def texture_update(self):
+        """
+        Lays out the text again if the text, font or alignment has changed.
+
+        The mesh is updated in place, and the text block is placed in the text box
+        again.  The ``texture_size`` callbacks are only called if the size of the text
+        has changed.
+        """
+        if self._atlas is None:
+            self._atlas = GlyphAtlas.get(self._fname,self._fsize,self._bold)
+            self._mesh.texture = self._atlas.texture
+            self._dirty = True
+        if not self._dirty:
+            return
+
+        vertices, indices, width, height = self._atlas.layout(self._text,self._halign)
+        self._mesh.vertices = vertices
+        self._mesh.indices  = indices
+        self._dirty = False
+        self._place()
+
+        if self._tsize != (width,height):
+            self._tsize = (width,height)
+            for callback in self._callbacks:
+                callback(self,self.texture_size)
+
+    # HIDDEN METHODS
+    def _place(self):
+        """
+        Moves the text block within the text box to match ``halign`` and ``valign``.
+        """
+        dx = max(self._size[0]-self._tsize[0],0)
+        dy = max(self._size[1]-self._tsize[1],0)
+        x = 0 if self._halign == 'left' else dx if self._halign == 'right' else dx/2.0
+        y = 0 if self._valign == 'bottom' else dy if self._valign == 'top' else dy/2.0
+        self._offset.xy = (x,y)
@@ -0,0 +1,173 @@
+"""
+A module to support the animation frame loop of a game.
+
+Every animation frame, :class:`GameApp` clears the view, updates the game, draws it,
+and does the bookkeeping around those steps: running :meth:`update` with a fixed time
+step, timing the phases of the frame, and reporting the cost of the frame to a
+watchdog.  That work is the same whether the frames come from the Kivy clock or from
+the tight loop of the headless backend, so it lives here, in :class:`FrameLoop`, which
+both versions of :class:`GameApp` inherit from.
+
+This module does not import Kivy, so it may be used by the headless backend.
+"""
+import time
+from .gstats import FrameStats
+from .gwatchdog import FrameWatchdog
+
+# #mark -
+class FrameLoop(object):
+    """
+    A mixin class processing the animation frames of a :class:`GameApp`.
+
+    The class using this mixin must provide the attributes ``view`` and ``height``
+    and the methods ``update`` and ``draw``, and must call :meth:`_setloop` when it
+    is created.  It then calls :meth:`_refresh` once every animation frame.
+    """
+    # The most fixed time steps to simulate in one animation frame, so that a slow
+    # frame cannot make the next one slower still
+    MAX_STEPS = 5
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def step(self):
+        """
+        The fixed simulation time step in seconds, or None.
+
+        If this value is None (the default), :meth:`update` is called once every
+        animation frame with the time since the last frame.  Otherwise :meth:`update` is
+        called with exactly this ``dt``, as many times as needed to keep up with the
+        clock (up to ``MAX_STEPS`` times a frame), so the game runs at the same speed
+        whatever the frame rate.  A frame may then be drawn part of the way between
+        two steps; see :attr:`alpha`.
+
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._step
+
+    @property
+    def alpha(self):
+        """
+        The fraction of a time step that has passed since the last update.
+
+        A game with a fixed :attr:`step` can use this value in :meth:`draw` to draw
+        moving objects between their positions at the last two updates.  It is always
+        1 if there is no fixed step.
+
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._alpha
+
+    @property
+    def stats(self):
+        """
+        The frame time statistics of this game, or None.
+
+        If the game was created with the keyword ``stats``, every animation frame
+        records the time spent clearing the view, updating and drawing in this object.
+        Set its ``overlay`` attribute to show the statistics on screen, or its ``log``
+        attribute to write them to a file.  See :class:`FrameStats`.
+
+        **Invariant**: Must be None or an instance of :class:`FrameStats`.
+        """
+        return self._stats
+
+    @property
+    def watchdog(self):
+        """
+        The frame budget watchdog of this game, or None.
+
+        If the game was created with the keyword ``watchdog``, the time spent on every
+        animation frame (clearing, updating and drawing) is recorded in this object,
+        which raises or lowers its level as frames go over or under budget.  The game
+        checks the level to decide what work to skip.  See :class:`FrameWatchdog`.
+
+        **Invariant**: Must be None or an instance of :class:`FrameWatchdog`.
+        """
+        return self._watchdog
+
+    # HIDDEN METHODS
+    def _setloop(self,fps,step=None,stats=None,watchdog=None):
+        """
+        Initializes the frame loop from the keywords given to the game.
+
+        :param fps: The number of frames per second, used as the budget of new stats
+        :type fps:  ``int`` or ``float`` > 0
+
+        :param step: The fixed time step, or None
+        :type step:  ``int`` or ``float`` > 0, or ``None``
+
+        :param stats: Whether to record frame times, or the object to record them in
+        :type stats:  ``bool``, ``None`` or :class:`FrameStats`
+
+        :param watchdog: The watchdog to give the cost of every frame, or None
+        :type watchdog:  :class:`FrameWatchdog` or ``None``
+        """
+        assert step is None or (type(step) in [int,float] and step > 0), \
+            'step %s is not a positive number' % repr(step)
+        assert stats in [None,False,True] or isinstance(stats,FrameStats), \
+            'stats %s is not a bool or FrameStats' % repr(stats)
+        assert watchdog is None or isinstance(watchdog,FrameWatchdog), \
+            'watchdog %s is not a FrameWatchdog' % repr(watchdog)
+        self._step  = step
+        self._lag   = 0.0
+        self._alpha = 1.0
+        self._stats = FrameStats(budget=1.0/fps) if stats is True else (stats or None)
+        self._watchdog = watchdog
+
+    def _refresh(self,dt):
+        """
+        Processes a single animation frame.
+
+        This method a callback-proxy for the methods `update` and `draw`.  It handles
+        important issues behind the scenes, particularly with clearing the window. In
+        retained mode, the window is not cleared; instead the view drops anything that
+        was not drawn this frame.  With a fixed :attr:`step`, `update` is called once
+        for every step that has passed.  If there are :attr:`stats`, each phase of the
+        frame is timed.  If there is a :attr:`watchdog`, it is given the time of the
+        whole frame.
+
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._watchdog is not None:
+            start = time.perf_counter()
+        stats = self._stats
+        if stats is not None:
+            stats.begin(dt)
+        if not self.view.retained:
+            self.view.clear()
+        if stats is not None:
+            stats.mark('clear')
+        if self._step is None:
+            self.update(dt)
+        else:
+            self._advance(dt)
+        if stats is not None:
+            stats.mark('update')
+        self.draw()
+        if stats is not None:
+            stats.draw(self.view,0,self.height)
+        if self.view.retained:
+            self.view.flush()
+        if stats is not None:
+            stats.mark('draw')
+            stats.end()
+        if self._watchdog is not None:
+            self._watchdog.record(time.perf_counter()-start)
+
+    def _advance(self,dt):
+        """
+        Calls `update` once for every whole time step that has passed.
+
+        The time left over is carried to the next frame, and sets :attr:`alpha`.  At
+        most ``MAX_STEPS`` steps are owed at once; any more time is dropped, which
+        slows the game down instead of stalling it.
+
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        self._lag = min(self._lag+dt,self._step*self.MAX_STEPS)
+        while self._lag >= self._step:
+            self.update(self._step)
+            self._lag -= self._step
+        self._alpha = self._lag/self._step
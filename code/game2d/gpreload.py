@@ -0,0 +1,332 @@
+"""
+A module to support loading assets ahead of time.
+
+Textures are normally loaded the first time an image is drawn, and sounds when they are
+created, so the first frame that uses a new asset stalls while the file is read and
+decoded.  This module moves that work to a loading screen.  An :class:`AssetManifest`
+lists the images, sounds and glyph atlases a game needs.  A :class:`Preloader` decodes
+them in worker threads, and uploads the results into the :class:`GameApp` caches a
+little at a time from :meth:`Preloader.poll`, which is called once per animation frame
+on the main thread.  Once it is done, creating images and sounds from the manifest no
+longer touches the disk.
+
+Kivy is only imported by the worker threads and :meth:`Preloader.poll`, so the manifest
+may be used by the headless backend.
+"""
+import os
+import time
+import threading
+import queue
+
+# The file extensions of each kind of asset
+IMAGE_EXTENSIONS = ('.png','.jpg','.jpeg','.gif','.bmp')
+SOUND_EXTENSIONS = ('.wav','.mp3','.ogg')
+
+# #mark -
+class AssetManifest(object):
+    """
+    A class representing the list of assets to preload.
+
+    The attribute ``images`` lists files in the **Images** folder and ``sounds`` files in
+    the **Sounds** folder.  The attribute ``voices`` lists the sounds that are played
+    over themselves, as (file name, number of voices) pairs (see
+    :meth:`GameApp.load_voices`).  The attribute ``glyphs`` lists the glyph atlases to build,
+    as (font name, font size) pairs for fonts in the **Fonts** folder (see
+    :class:`GLabel`).  Images packed into a texture atlas are preloaded by loading their
+    atlas page instead.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,images=(),sounds=(),glyphs=(),voices=()):
+        """
+        Creates a new manifest.
+
+        :param images: The image file names
+        :type images:  sequence of ``str``
+
+        :param sounds: The sound file names
+        :type sounds:  sequence of ``str``
+
+        :param glyphs: The glyph atlases to build
+        :type glyphs:  sequence of (``str``, ``int`` or ``float``) pairs
+
+        :param voices: The sound file names and number of voices of each
+        :type voices:  sequence of (``str``, ``int``) pairs
+        """
+        self.images = list(images)
+        self.sounds = list(sounds)
+        self.glyphs = list(glyphs)
+        self.voices = list(voices)
+
+    def __len__(self):
+        """
+        :return: The number of assets in this manifest
+        :rtype:  ``int``
+        """
+        return (len(self.images)+len(self.sounds)+len(self.glyphs)+
+                sum(count for name, count in self.voices))
+
+    # CLASS METHODS
+    @classmethod
+    def scan(cls,glyphs=(),voices=()):
+        """
+        Returns: A manifest of every image and sound in the asset folders
+
+        The folders are those of :class:`GameApp`, so this can only be called once a
+        game has been created.  Fonts have no size until they are used, so the glyph
+        atlases must still be given.  So must the number of voices of any sound that
+        is played over itself; such a sound is only loaded as voices.
+
+        :param glyphs: The glyph atlases to build
+        :type glyphs:  sequence of (``str``, ``int`` or ``float``) pairs
+
+        :param voices: The sound file names and number of voices of each
+        :type voices:  sequence of (``str``, ``int``) pairs
+        """
+        from . import GameApp
+        pooled = set(name for name, count in voices)
+        sounds = [name for name in cls._files(GameApp.sounds,SOUND_EXTENSIONS)
+                  if not name in pooled]
+        return cls(images=cls._files(GameApp.images,IMAGE_EXTENSIONS),sounds=sounds,
+                   glyphs=glyphs,voices=voices)
+
+    # HIDDEN METHODS
+    @classmethod
+    def _files(cls,folder,extensions):
+        """
+        Returns: The sorted names of the files in folder with one of the extensions
+
+        :param folder: The folder to scan
+        :type folder:  ``str``
+
+        :param extensions: The lowercase file extensions, including the period
+        :type extensions:  ``tuple`` of ``str``
+        """
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name for name in os.listdir(folder)
+                      if os.path.splitext(name)[1].lower() in extensions)
+
+
+# #mark -
+class Preloader(object):
+    """
+    A class that loads the assets in a manifest in the background.
+
+    Call :meth:`start` to launch the worker threads, and then :meth:`poll` once every
+    animation frame until :attr:`done`.  The workers read and decode the files.  The
+    textures must be created on the main thread, so :meth:`poll` does that, and puts
+    every loaded asset into the :class:`GameApp` caches.  Each call of :meth:`poll`
+    stops once it has used its time budget, so the frame rate of a loading screen
+    is kept.  Call :meth:`finish` to load everything that is left without returning.
+
+    Assets that cannot be loaded are skipped and recorded in :attr:`errors`; they are
+    loaded (or fail) as usual when they are first used.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def total(self):
+        """
+        The number of assets to load.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._total
+
+    @property
+    def loaded(self):
+        """
+        The number of assets loaded so far, including those that failed.
+
+        **invariant**: Value is an ``int`` in 0..total.
+        """
+        return self._loaded
+
+    @property
+    def progress(self):
+        """
+        The fraction of the assets loaded so far.
+
+        **invariant**: Value is a ``float`` in 0..1.
+        """
+        return 1.0 if self._total == 0 else self._loaded/float(self._total)
+
+    @property
+    def done(self):
+        """
+        Whether every asset has been loaded.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._loaded == self._total
+
+    @property
+    def errors(self):
+        """
+        The list of (name, exception) pairs for the assets that failed to load.
+
+        **invariant**: Value is a ``list``.
+        """
+        return self._errors
+
+    # BUILT-IN METHODS
+    def __init__(self,manifest,workers=2):
+        """
+        Creates a new preloader for the given manifest.
+
+        The preloader does nothing until it is started.
+
+        :param manifest: The assets to load
+        :type manifest:  :class:`AssetManifest`
+
+        :param workers: The number of worker threads
+        :type workers:  ``int`` > 0
+        """
+        from .app import GameApp
+        assert isinstance(manifest,AssetManifest), '%s is not a manifest' % repr(manifest)
+        assert type(workers) == int and workers > 0, '%s is not a valid count' % repr(workers)
+
+        # Images in an atlas are loaded through their page
+        images = []
+        for name in manifest.images:
+            region = GameApp.ATLAS_INDEX.get(os.path.splitext(name)[0])
+            name = name if region is None else region[0]
+            if not name in images:
+                images.append(name)
+
+        self._jobs = queue.Queue()
+        for name in images:
+            if not name in GameApp.TEXTURE_CACHE:
+                self._jobs.put(('image',name))
+        for name in manifest.sounds:
+            if not name in GameApp.SOUND_CACHE:
+                self._jobs.put(('sound',name))
+        for name, count in manifest.voices:
+            for x in range(count-len(GameApp.VOICE_CACHE.get(name,()))):
+                self._jobs.put(('voice',name))
+        self._glyphs = list(manifest.glyphs)
+        self._ready  = queue.Queue()
+        self._workers = workers
+        self._threads = []
+        self._pending = self._jobs.qsize()
+        self._total  = self._pending+len(self._glyphs)
+        self._loaded = 0
+        self._errors = []
+        self._audio  = threading.Lock()
+
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts the worker threads.
+
+        The threads are daemons, so they do not keep the game running.
+        """
+        if self._threads:
+            return
+        for x in range(min(self._workers,max(self._pending,1))):
+            thread = threading.Thread(target=self._work,daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def poll(self,budget=0.004):
+        """
+        Returns: The progress after moving the decoded assets into the caches
+
+        This method must be called on the main thread.  It uploads decoded assets until
+        there are none waiting or ``budget`` seconds have passed.  Glyph atlases are
+        built here too, once the files are loaded, one per call.
+
+        :param budget: The time limit in seconds, or None for no limit
+        :type budget:  ``int`` or ``float`` >= 0, or ``None``
+        """
+        start = time.perf_counter()
+        while budget is None or time.perf_counter()-start < budget:
+            try:
+                item = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            self._store(*item)
+
+        if self._pending == 0 and self._glyphs:
+            self._build(self._glyphs.pop(0))
+        return self.progress
+
+    def finish(self):
+        """
+        Loads every asset that is left, waiting for the workers.
+
+        This method must be called on the main thread.
+        """
+        self.start()
+        while self._pending > 0:
+            self._store(*self._ready.get())
+        while self._glyphs:
+            self._build(self._glyphs.pop(0))
+
+    # HIDDEN METHODS
+    def _work(self):
+        """
+        Decodes assets until there are no jobs left.
+
+        This method runs in a worker thread.  Sounds are loaded one at a time, as the
+        audio providers are not guaranteed to be thread-safe.
+        """
+        while True:
+            try:
+                kind, name = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if kind == 'image':
+                    from kivy.core.image import ImageLoader
+                    data = ImageLoader.load(name)
+                else:
+                    from .sound import Sound
+                    with self._audio:
+                        data = Sound(name)
+            except Exception as e:
+                data = e
+            self._ready.put((kind,name,data))
+
+    def _store(self,kind,name,data):
+        """
+        Moves a decoded asset into its cache.
+
+        :param kind: The type of asset
+        :type kind:  'image', 'sound' or 'voice'
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param data: The decoded image or loaded sound, or the exception raised
+        :type data:  image loader, :class:`Sound`, or ``Exception``
+        """
+        from .app import GameApp
+        self._pending -= 1
+        self._loaded  += 1
+        if isinstance(data,Exception):
+            self._errors.append((name,data))
+        elif kind == 'image':
+            try:
+                GameApp.TEXTURE_CACHE.add(name,data.texture)
+            except Exception as e:
+                self._errors.append((name,e))
+        elif kind == 'voice':
+            GameApp.VOICE_CACHE.setdefault(name,[]).append(data)
+        else:
+            GameApp.SOUND_CACHE[name] = data
+
+    def _build(self,glyph):
+        """
+        Builds a glyph atlas.
+
+        :param glyph: The font name and size
+        :type glyph:  (``str``, ``int`` or ``float``) pair
+        """
+        from .gglyph import GlyphAtlas
+        self._loaded += 1
+        try:
+            GlyphAtlas.get(glyph[0],glyph[1])
+        except Exception as e:
+            self._errors.append((glyph[0],e))
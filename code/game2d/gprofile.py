@@ -0,0 +1,318 @@
+"""
+A module to support profiling the phases of a game update.
+
+A game may split its update into a sequence of named phases (see the class ``Wave`` of
+Alien Invaders for an example).  A :class:`PhaseHook` is told when each phase begins
+and ends, so it can measure that phase alone.  This module provides hooks that run
+the standard profilers around the phases: :class:`CProfileHook` for the time spent in
+each function, and :class:`TracemallocHook` for the memory allocated.  The hook
+:class:`StatsHook` records the time of each phase in a :class:`FrameStats`.
+
+A hook can be limited to some of the phases, and can sample only every so many calls
+of them, so that a profiler can be left on in a running game.  A game with no hooks
+should not pay for any of this; it is up to the game to skip the hooks entirely when
+there are none.
+
+This module does not import Kivy, so it may be used by the headless backend.
+"""
+import time
+
+# #mark -
+class PhaseHook(object):
+    """
+    A class representing an observer of the phases of a game update.
+
+    Subclasses override :meth:`begin` and :meth:`end`, which are called immediately
+    before and after each phase that the hook watches.  The attribute ``phases`` is the
+    set of phase names to watch, or None for every phase.  The attribute ``every`` is
+    the sampling period: only one call in ``every`` of each phase is passed on.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,phases=None,every=1):
+        """
+        Creates a new hook.
+
+        :param phases: The names of the phases to watch, or None for all of them
+        :type phases:  iterable of ``str`` or ``None``
+
+        :param every: The sampling period, in calls of a phase
+        :type every:  ``int`` > 0
+        """
+        assert type(every) == int and every > 0, '%s is not a valid period' % repr(every)
+        self.phases = None if phases is None else frozenset(phases)
+        self.every  = every
+        self._calls = {}
+        self._active = set()
+
+    # PUBLIC METHODS
+    def watches(self,phase):
+        """
+        Returns: True if this hook watches the given phase
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        return self.phases is None or phase in self.phases
+
+    def enter(self,phase):
+        """
+        Calls :meth:`begin` for the given phase if this call is sampled.
+
+        This is the method a game calls before each phase.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        count = self._calls.get(phase,0)
+        self._calls[phase] = count+1
+        if count % self.every == 0:
+            self._active.add(phase)
+            self.begin(phase)
+
+    def leave(self,phase):
+        """
+        Calls :meth:`end` for the given phase if :meth:`begin` was called for it.
+
+        This is the method a game calls after each phase.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        if phase in self._active:
+            self._active.discard(phase)
+            self.end(phase)
+
+    def begin(self,phase):
+        """
+        Starts observing a phase.
+
+        By default this does nothing.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        pass
+
+    def end(self,phase):
+        """
+        Stops observing a phase.
+
+        By default this does nothing.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        pass
+
+
+# #mark -
+class StatsHook(PhaseHook):
+    """
+    A class recording the time of each phase in a :class:`FrameStats`.
+
+    Each phase is recorded under its own name.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,stats,phases=None):
+        """
+        Creates a hook recording phase times in stats.
+
+        :param stats: The statistics to record in
+        :type stats:  :class:`FrameStats`
+
+        :param phases: The names of the phases to watch, or None for all of them
+        :type phases:  iterable of ``str`` or ``None``
+        """
+        PhaseHook.__init__(self,phases)
+        self.stats = stats
+        self._start = 0.0
+
+    # PUBLIC METHODS
+    def begin(self,phase):
+        """
+        Starts the clock for a phase.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        self._start = time.perf_counter()
+
+    def end(self,phase):
+        """
+        Records the time of a phase.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        self.stats.add(phase,time.perf_counter()-self._start)
+
+
+# #mark -
+class CProfileHook(PhaseHook):
+    """
+    A class running :mod:`cProfile` around the watched phases.
+
+    The profiler is only enabled while a sampled phase runs, so the results show the
+    functions called by those phases and nothing else.  Use :meth:`stats` to read the
+    results, or :meth:`dump` to save them for a tool such as snakeviz.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,phases=None,every=1):
+        """
+        Creates a new profiling hook.
+
+        :param phases: The names of the phases to profile, or None for all of them
+        :type phases:  iterable of ``str`` or ``None``
+
+        :param every: The sampling period, in calls of a phase
+        :type every:  ``int`` > 0
+        """
+        import cProfile
+        PhaseHook.__init__(self,phases,every)
+        self.profile = cProfile.Profile()
+
+    # PUBLIC METHODS
+    def begin(self,phase):
+        """
+        Enables the profiler.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        self.profile.enable()
+
+    def end(self,phase):
+        """
+        Disables the profiler.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        self.profile.disable()
+
+    def stats(self,sort='cumulative'):
+        """
+        Returns: The results so far, as a :class:`pstats.Stats` sorted by sort
+
+        :param sort: The sort key
+        :type sort:  ``str``
+        """
+        import pstats
+        return pstats.Stats(self.profile).sort_stats(sort)
+
+    def dump(self,filename):
+        """
+        Saves the results so far to a file.
+
+        :param filename: The name of the file
+        :type filename:  ``str``
+        """
+        self.profile.dump_stats(filename)
+
+
+# #mark -
+class TracemallocHook(PhaseHook):
+    """
+    A class measuring the memory allocated by the watched phases with :mod:`tracemalloc`.
+
+    Tracing is started by the first sampled phase (if it is not already on) and is
+    stopped by :meth:`close`.  Memory allocated outside of the watched phases is traced
+    too, as long as tracing is on, but it is not counted.
+
+    For every phase, the hook keeps the number of sampled calls, the total change in
+    traced memory and the largest peak above the memory at the start of a call.  If
+    ``snapshots`` is True, it also takes a snapshot at the end of the last sampled call,
+    so :meth:`top` can show which lines hold the memory.
+    """
+
+    # BUILT-IN METHODS
+    def __init__(self,phases=None,every=1,frames=1,snapshots=False):
+        """
+        Creates a new allocation tracing hook.
+
+        :param phases: The names of the phases to trace, or None for all of them
+        :type phases:  iterable of ``str`` or ``None``
+
+        :param every: The sampling period, in calls of a phase
+        :type every:  ``int`` > 0
+
+        :param frames: The number of stack frames to record per allocation
+        :type frames:  ``int`` > 0
+
+        :param snapshots: Whether to take a snapshot after each sampled call
+        :type snapshots:  ``bool``
+        """
+        PhaseHook.__init__(self,phases,every)
+        self.frames = frames
+        self.snapshots = snapshots
+        self.snapshot = None
+        self._results = {}    # phase -> [calls, net bytes, peak bytes]
+        self._before  = 0
+        self._started = False
+
+    # PUBLIC METHODS
+    def begin(self,phase):
+        """
+        Records the traced memory at the start of a phase.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+
+    def end(self,phase):
+        """
+        Adds the memory allocated by a phase to its results.
+
+        :param phase: The name of a phase
+        :type phase:  ``str``
+        """
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        result = self._results.setdefault(phase,[0,0,0])
+        result[0] += 1
+        result[1] += current-self._before
+        result[2] = max(result[2],peak-self._before)
+        if self.snapshots:
+            self.snapshot = tracemalloc.take_snapshot()
+
+    def results(self):
+        """
+        Returns: A dictionary with the allocation results of every traced phase
+
+        Each phase name maps to a dictionary with the keys 'calls', 'net' (the total
+        change in traced bytes) and 'peak' (the largest peak in bytes of one call).
+        """
+        return {phase:{'calls':r[0],'net':r[1],'peak':r[2]}
+                for phase, r in self._results.items()}
+
+    def top(self,limit=10):
+        """
+        Returns: The lines holding the most memory in the last snapshot
+
+        The result is a list of :class:`tracemalloc.Statistic`, largest first.  It is
+        empty if no snapshot has been taken.
+
+        :param limit: The number of lines to return
+        :type limit:  ``int`` > 0
+        """
+        if self.snapshot is None:
+            return []
+        return self.snapshot.statistics('lineno')[:limit]
+
+    def close(self):
+        """
+        Stops tracing if this hook started it.
+        """
+        import tracemalloc
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
@@ -13,6 +13,7 @@ from kivy.graphics.instructions import *
 from kivy.uix.label import Label
 from kivy.uix.image import Image
 from .gobject import GObject
+from .gglyph import GlyphText
 from .app import GameApp
 
 class GRectangle(GObject):
@@ -258,6 +259,8 @@ class GImage(GRectangle):
         y = -self.height/2.0
         
         self._texture = GameApp.load_texture(self.source)
+        if self._texture is not None:
+            GameApp.TEXTURE_CACHE.hold(self.source,self)
         fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
@@ -296,7 +299,12 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Text that changes often, such as a score, should be created with the keyword
+    ``glyphs=True``.  The label is then drawn from a glyph atlas shared by every label
+    with the same font (see :class:`GlyphText`), so changing the text does not
+    rasterize a new texture.  This keyword can only be given to the constructor."""
     
     # MUTABLE PROPERTIES
     @property
@@ -386,6 +394,7 @@ class GLabel(GRectangle):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
         self._label.halign = value
+        self._label.texture_update()
         if self._defined:
             self._reset()
     
@@ -588,19 +597,26 @@ class GLabel(GRectangle):
             GLabel(text='Hello')
         
         This class supports the all same keywords as :class:`GRectangle`, as well as 
-        additional attributes for the text properties (e.g. font size and name).
+        additional attributes for the text properties (e.g. font size and name), and
+        the keyword ``glyphs`` to draw the text from a glyph atlas.
         """
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
         
         sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
+        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom',
+                     'glyphs']
         for key in keywords:
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        if keywords.get('glyphs',False):
+            halign = keywords['halign'] if 'halign' in keywords else 'center'
+            valign = keywords['valign'] if 'valign' in keywords else 'middle'
+            self._label = GlyphText(halign=halign,valign=valign,**sanitized)
+        else:
+            self._label = Label(**sanitized)
         self._label.size_hint = (None,None)
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
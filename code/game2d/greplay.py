@@ -0,0 +1,229 @@
+"""
+A module to support recording and replaying the input of a game.
+
+A game that updates with a fixed ``dt`` (see the ``step`` attribute of :class:`GameApp`)
+and draws all of its random choices from a seeded generator is fully determined by
+its seed and by the keys held down at each update.  An :class:`InputLog` records those
+keys, update by update, and can be saved to and loaded from a JSON file.  An
+:class:`InputReplay` plays a log back in place of a :class:`GInput`, so the same game
+can be run again, on another machine or as a regression test.
+
+Only the keys are recorded; the mouse is not.  This module does not import Kivy, so it
+may be used by the headless backend.
+"""
+import json
+
+# #mark -
+class InputLog(object):
+    """
+    A class representing the keys held down at every update of a game.
+
+    Call :meth:`record` once before every update, with the input that the update will
+    read.  Only the updates where the keys change are stored, so a long game with
+    little input takes little space.
+
+    The attribute ``meta`` is a dictionary saved with the log, for whatever else is
+    needed to run the game again, such as the seed and the ``dt`` of each update.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def length(self):
+        """
+        The number of updates recorded.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._length
+
+    @property
+    def changes(self):
+        """
+        The list of (update, keys) pairs where the keys held down changed.
+
+        The keys are a sorted ``tuple`` of ``str``.  The first pair, if any, is for
+        update 0.
+
+        **invariant**: Value is a ``list``, sorted by update.
+        """
+        return self._changes
+
+    # BUILT-IN METHODS
+    def __init__(self,meta=None,changes=(),length=0):
+        """
+        Creates a new input log.
+
+        :param meta: The information to save with the log
+        :type meta:  ``dict`` of JSON values, or ``None``
+
+        :param changes: The (update, keys) pairs of an existing log
+        :type changes:  sequence of (``int``, sequence of ``str``) pairs
+
+        :param length: The number of updates of an existing log
+        :type length:  ``int`` >= 0
+        """
+        self.meta = {} if meta is None else dict(meta)
+        self._changes = [(int(frame),tuple(keys)) for frame, keys in changes]
+        self._length  = length
+
+    def __len__(self):
+        """
+        :return: The number of updates recorded
+        :rtype:  ``int``
+        """
+        return self._length
+
+    def __eq__(self,other):
+        """
+        :return: True if other is an input log with the same keys at every update
+        :rtype:  ``bool``
+        """
+        return (isinstance(other,InputLog) and self._length == other._length and
+                self._changes == other._changes)
+
+    # CLASS METHODS
+    @classmethod
+    def load(cls,filename):
+        """
+        Returns: The input log saved in the given file
+
+        :param filename: The name of a file written by :meth:`save`
+        :type filename:  ``str``
+        """
+        with open(filename) as file:
+            data = json.load(file)
+        return cls(data.get('meta'),data['changes'],data['length'])
+
+    # PUBLIC METHODS
+    def record(self,input):
+        """
+        Records the keys held down for the next update.
+
+        :param input: The input the update will read
+        :type input:  :class:`GInput` or :class:`InputReplay`
+        """
+        keys = tuple(sorted(input.keys))
+        if not self._changes or self._changes[-1][1] != keys:
+            self._changes.append((self._length,keys))
+        self._length += 1
+
+    def save(self,filename):
+        """
+        Saves this log to a JSON file.
+
+        :param filename: The name of the file
+        :type filename:  ``str``
+        """
+        data = {'meta':self.meta,'length':self._length,
+                'changes':[[frame,list(keys)] for frame, keys in self._changes]}
+        with open(filename,'w') as file:
+            json.dump(data,file)
+
+    def replay(self):
+        """
+        Returns: A new input handler that plays this log back from the start
+        """
+        return InputReplay(self)
+
+
+# #mark -
+class InputReplay(object):
+    """
+    A class that plays back an :class:`InputLog` in place of a :class:`GInput`.
+
+    Call :meth:`step` once before every update, exactly where the log was recorded.
+    The keys held down are then those recorded for that update.  Once the log is over
+    (see :attr:`done`), no keys are held down.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def touch(self):
+        """
+        The current (x,y) coordinate of the mouse.  Always None, as it is not recorded.
+
+        **Invariant**: Must be None.
+        """
+        return None
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        **Invariant**: Must be an int >= 0."""
+        return len(self._keys)
+
+    @property
+    def keys(self):
+        """
+        The list of keys that are currently held down.
+
+        **Invariant**: Must be a tuple of strings (possibly empty)
+        """
+        return tuple(self._keys)
+
+    @property
+    def frame(self):
+        """
+        The number of updates stepped so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+
+    @property
+    def done(self):
+        """
+        Whether every update of the log has been stepped.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._frame >= self._log.length
+
+    # BUILT-IN METHODS
+    def __init__(self,log):
+        """
+        Creates a new replay of the given log, before its first update.
+
+        :param log: The log to play back
+        :type log:  :class:`InputLog`
+        """
+        self._log   = log
+        self._frame = 0
+        self._next  = 0
+        self._keys  = frozenset()
+
+    # PUBLIC METHODS
+    def step(self):
+        """
+        Sets the keys held down to those recorded for the next update.
+        """
+        changes = self._log.changes
+        if self._next < len(changes) and changes[self._next][0] == self._frame:
+            self._keys = frozenset(changes[self._next][1])
+            self._next += 1
+        elif self._frame == self._log.length:
+            self._keys = frozenset()
+        self._frame += 1
+
+    def is_key_down(self,key):
+        """
+        Checks wether the key is currently held down.
+
+        :param key: the key to test
+        :type key:  ``str``
+
+        :return: True if ``key`` is currently held down
+        :rtype:  ``bool``
+        """
+        return key in self._keys
+
+    def is_touch_down(self):
+        """
+        Checks wether the mouse is currently held down.  Always False.
+
+        :return: False
+        :rtype:  ``bool``
+        """
+        return False
@@ -103,7 +103,7 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = (None,)*self.count
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -130,19 +130,13 @@ class GSprite(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+        # The frames are shared with every sprite using the same filmstrip
+        images = GameApp.load_regions(self.source,self._format)
+        if images:
+            self._images = images
+            GameApp.TEXTURE_CACHE.hold(self.source,self)
         else:
+            self._images = (None,)*self.count
             print('Failed to load',repr(self.source))
         
         self._texture = self._images[self._frame]
@@ -0,0 +1,350 @@
+"""
+A module to support measuring where the time of each animation frame goes.
+
+:class:`GameApp` can record, for every animation frame, how long it took to clear the
+view, to update the game and to draw it.  A game may break its update into smaller
+parts as well.  The times of the most recent frames are kept in a :class:`FrameStats`,
+which reports their percentiles and counts the frames that were dropped because the
+previous frame ran long.  The report can be shown over the game, written to a log
+file, or both.
+
+Recording a frame costs a handful of clock reads.  Percentiles are only computed when
+a report is made.  This module does not import Kivy until the overlay is drawn, so it
+may be used by the headless backend.
+"""
+import time
+from collections import deque
+
+# #mark -
+class FrameStats(object):
+    """
+    A class recording the time taken by each phase of the animation frames.
+
+    A frame is recorded with :meth:`begin`, one :meth:`mark` at the end of every phase,
+    and :meth:`end`.  Code that runs inside a phase may call :meth:`split` to time the
+    parts of that phase; a split measures the time since the phase began or since the
+    previous split, whichever is later, and does not change the time of the phase.
+
+    Besides the phases and splits, every frame records two times: ``'frame'``, the time
+    from :meth:`begin` to :meth:`end`, and ``'interval'``, the time since the previous
+    frame as given by the clock.  A frame whose interval is more than one and a half
+    times the ``budget`` means that frames were dropped; :attr:`dropped` counts them.
+
+    If :attr:`overlay` is True, :meth:`draw` shows the report in the corner of the view.
+    If :attr:`log` is a file name, the report is appended to that file.  Both are
+    refreshed every ``interval`` seconds.
+    """
+    # The percentiles to report
+    PERCENTILES = (50,95,99)
+
+    # MUTABLE PROPERTIES
+    @property
+    def overlay(self):
+        """
+        Whether :meth:`draw` shows the report on screen.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._overlay
+
+    @overlay.setter
+    def overlay(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._overlay = value
+
+    @property
+    def log(self):
+        """
+        The name of the file the report is appended to, or None for no log.
+
+        Setting this attribute closes the previous log file.
+
+        **invariant**: Value is a ``str`` or ``None``.
+        """
+        return self._log
+
+    @log.setter
+    def log(self,value):
+        assert value is None or type(value) == str, 'value %s is not a file name' % repr(value)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._log = value
+        if value is not None:
+            self._file = open(value,'a')
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The target time of one frame in seconds.
+
+        **invariant**: Value is a ``float`` > 0.
+        """
+        return self._budget
+
+    @property
+    def window(self):
+        """
+        The number of recent frames that the percentiles are computed over.
+
+        **invariant**: Value is an ``int`` > 0.
+        """
+        return self._window
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded since this object was created or reset.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._frames
+
+    @property
+    def dropped(self):
+        """
+        The number of frames dropped since this object was created or reset.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._dropped
+
+    # BUILT-IN METHODS
+    def __init__(self,budget=1/60.0,window=600,interval=0.5,overlay=False,log=None):
+        """
+        Creates a new, empty record of frame times.
+
+        :param budget: The target time of one frame in seconds
+        :type budget:  ``int`` or ``float`` > 0
+
+        :param window: The number of recent frames to keep
+        :type window:  ``int`` > 0
+
+        :param interval: The number of seconds between refreshes of the report
+        :type interval:  ``int`` or ``float`` >= 0
+
+        :param overlay: Whether to show the report on screen
+        :type overlay:  ``bool``
+
+        :param log: The name of the file to append the report to, or None
+        :type log:  ``str`` or ``None``
+        """
+        assert type(budget) in [int,float] and budget > 0, \
+            '%s is not a valid budget' % repr(budget)
+        assert type(window) == int and window > 0, '%s is not a valid window' % repr(window)
+        assert type(interval) in [int,float] and interval >= 0, \
+            '%s is not a valid interval' % repr(interval)
+        self._budget = float(budget)
+        self._window = window
+        self._interval = interval
+        self._times = {}     # name -> deque of recent times in seconds
+        self._frames  = 0
+        self._dropped = 0
+        self._start = None
+        self._lap   = None
+        self._sub   = None
+        self._shown = time.perf_counter()
+        self._text  = ''
+        self._label = None
+        self._file  = None
+        self._log   = None
+        self.overlay = overlay
+        self.log = log
+
+    # PUBLIC METHODS
+    def begin(self,dt):
+        """
+        Starts recording a frame.
+
+        :param dt: The time in seconds since the previous frame
+        :type dt:  ``int`` or ``float``
+        """
+        self._start = self._lap = self._sub = time.perf_counter()
+        self._record('interval',dt)
+        if dt > 1.5*self._budget:
+            self._dropped += int(dt/self._budget+0.5)-1
+
+    def mark(self,phase):
+        """
+        Records the time of the phase that just ended.
+
+        The phase started at :meth:`begin` or at the previous mark.
+
+        :param phase: The name of the phase
+        :type phase:  ``str``
+        """
+        now = time.perf_counter()
+        self._record(phase,now-self._lap)
+        self._lap = self._sub = now
+
+    def split(self,part):
+        """
+        Records the time of a part of the current phase.
+
+        This does nothing outside of a frame, so code may call it whether or not its
+        frames are recorded.
+
+        :param part: The name of the part
+        :type part:  ``str``
+        """
+        if self._start is None:
+            return
+        now = time.perf_counter()
+        self._record(part,now-self._sub)
+        self._sub = now
+
+    def add(self,name,seconds):
+        """
+        Records a time measured elsewhere, such as by a :class:`StatsHook`.
+
+        :param name: The name of the phase or part
+        :type name:  ``str``
+
+        :param seconds: The time in seconds
+        :type seconds:  ``int`` or ``float`` >= 0
+        """
+        self._record(name,seconds)
+
+    def end(self):
+        """
+        Finishes recording a frame, refreshing the report if it is due.
+        """
+        now = time.perf_counter()
+        self._record('frame',now-self._start)
+        self._start = None
+        self._frames += 1
+        if (self._overlay or self._file is not None) and now-self._shown >= self._interval:
+            self._shown = now
+            self._text = self.summary()
+            if self._file is not None:
+                self._write()
+
+    def percentile(self,name,p):
+        """
+        Returns: The p-th percentile of the recent times of name, in seconds
+
+        The nearest-rank percentile is used.  The result is 0 if name has no times.
+
+        :param name: The name of a phase or part, or 'frame' or 'interval'
+        :type name:  ``str``
+
+        :param p: The percentile
+        :type p:  ``int`` or ``float`` in 0..100
+        """
+        times = sorted(self._times.get(name,()))
+        return self._nearest(times,p) if times else 0.0
+
+    def report(self):
+        """
+        Returns: A dictionary with the statistics of every phase and part
+
+        Each name maps to a dictionary with the keys 'mean', 'max' and 'p50', 'p95'
+        and 'p99' (see ``PERCENTILES``), all in milliseconds, over the recent frames.
+        The names are in the order they were first recorded.
+        """
+        result = {}
+        for name, times in self._times.items():
+            values = sorted(times)
+            entry = {'mean':1000*sum(values)/len(values),'max':1000*values[-1]}
+            for p in self.PERCENTILES:
+                entry['p%d' % p] = 1000*self._nearest(values,p)
+            result[name] = entry
+        return result
+
+    def summary(self):
+        """
+        Returns: The report as text, one line per phase or part
+        """
+        lines = []
+        for name, entry in self.report().items():
+            values = ' '.join('p%d %6.2f' % (p,entry['p%d' % p]) for p in self.PERCENTILES)
+            lines.append('%-10s %s  max %6.2f ms' % (name,values,entry['max']))
+        lines.append('dropped %d of %d frames' % (self._dropped,self._frames+self._dropped))
+        return '\n'.join(lines)
+
+    def reset(self):
+        """
+        Forgets every recorded frame.
+
+        The overlay and log settings are kept.
+        """
+        self._times.clear()
+        self._frames  = 0
+        self._dropped = 0
+        self._text = ''
+
+    def close(self):
+        """
+        Writes a last report to the log file, if any, and stops logging.
+        """
+        if self._file is not None and self._frames > 0:
+            self._text = self.summary()
+            self._write()
+        self.log = None
+
+    def draw(self,view,left=0,top=0):
+        """
+        Draws the report in the provided view if :attr:`overlay` is True.
+
+        The report is drawn as a label with its top left corner at (left, top).  The
+        text only changes when the report is refreshed.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+
+        :param left: The left edge of the report
+        :type left:  ``int`` or ``float``
+
+        :param top: The top edge of the report
+        :type top:  ``int`` or ``float``
+        """
+        if not self._overlay or not self._text:
+            return
+        if self._label is None:
+            from . import GLabel
+            self._label = GLabel(text=self._text,font_size=12,halign='left',
+                                 linecolor='white',fillcolor=[0,0,0,0.6])
+        elif self._label.text != self._text:
+            self._label.text = self._text
+        self._label.left = left
+        self._label.top = top
+        self._label.draw(view)
+
+    # HIDDEN METHODS
+    def _record(self,name,seconds):
+        """
+        Adds a time to the recent times of name.
+
+        :param name: The name of a phase or part
+        :type name:  ``str``
+
+        :param seconds: The time in seconds
+        :type seconds:  ``float``
+        """
+        times = self._times.get(name)
+        if times is None:
+            times = deque(maxlen=self._window)
+            self._times[name] = times
+        times.append(seconds)
+
+    def _write(self):
+        """
+        Appends the current report to the log file.
+        """
+        self._file.write('frames %d, dropped %d\n%s\n\n' %
+                         (self._frames,self._dropped,self._text))
+        self._file.flush()
+
+    def _nearest(self,values,p):
+        """
+        Returns: The nearest-rank p-th percentile of values
+
+        :param values: The sorted values
+        :type values:  nonempty ``list`` of ``float``
+
+        :param p: The percentile
+        :type p:  ``int`` or ``float`` in 0..100
+        """
+        rank = int(-(-p*len(values)//100))
+        return values[min(max(rank,1),len(values))-1]
@@ -319,12 +319,41 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    In retained mode the window is not cleared.  An object drawn in one frame stays
+    on the canvas, and drawing it again in later frames costs nothing.  Objects that
+    change position simply update their transforms in place.  At the end of the frame
+    :meth:`flush` compares the objects drawn with those on the canvas.  As long as the
+    same objects are drawn in the same order, the canvas is left alone.  Otherwise
+    (an object appeared, disappeared or moved in the drawing order) the canvas is
+    rebuilt in the order of this frame, so objects still overlap exactly as they do in
+    immediate mode.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE ATTRIBUTES
+    @property
+    def retained(self):
+        """
+        Whether this view is in retained mode.
+
+        In retained mode, objects stay on the canvas until a frame goes by without
+        them being drawn.  Changing this value clears the view.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+        self.clear()
+
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -341,6 +370,11 @@ class GView(FloatLayout):
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._retained = False
+        self._sequence = []
+        self._order = []
+        self._drawn = set()
+        self._same = True
 
 
     # PUBLIC METHODS
@@ -354,19 +388,75 @@ class GView(FloatLayout):
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
+        if self._retained:
+            if not cmd in self._drawn:
+                self._drawn.add(cmd)
+                self._order.append(cmd)
+                pos = len(self._order)-1
+                if self._same and (pos >= len(self._sequence) or self._sequence[pos] is not cmd):
+                    self._same = False
+        elif not cmd in self._contents:
             self._frame.add(cmd)
             self._contents.add(cmd)
 
+    def remove(self,cmd):
+        """
+        Removes the given Kivy graphics command from this view.
+
+        You should never call this method directly.  In retained mode, :meth:`flush`
+        removes any command that was not drawn in the current frame.
+
+        :param cmd: the command to remove
+        :type cmd:  A Kivy graphics command
+        """
+        if cmd in self._contents:
+            self._frame.remove(cmd)
+            self._contents.discard(cmd)
+            if self._retained:
+                self._sequence.remove(cmd)
+                self._same = False
+        if cmd in self._drawn:
+            self._drawn.discard(cmd)
+            self._order.remove(cmd)
+            self._same = False
+
     def clear(self):
         """
         Clears the contents of the view.
 
-        This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        Unless the view is in retained mode, this method is called for you
+        automatically at the start of the animation frame.  That way, you are not
+        drawing images on top of one another.
         """
         self._frame.clear()
         self._contents.clear()
+        self._sequence = []
+        self._order = []
+        self._drawn = set()
+        self._same = True
+
+    def flush(self):
+        """
+        Ends a frame in retained mode.
+
+        If the commands drawn since the last flush are exactly those on the canvas, in
+        the same order, the canvas is left as it is.  Otherwise the canvas is rebuilt
+        from the commands drawn, in the order they were drawn.  This method is called
+        for you automatically at the end of the animation frame when the view is in
+        retained mode.
+        """
+        if not self._same or len(self._order) != len(self._sequence):
+            self._frame.clear()
+            for cmd in self._order:
+                self._frame.add(cmd)
+            self._sequence = self._order
+            self._contents = self._drawn
+            self._order = []
+            self._drawn = set()
+        else:
+            self._order.clear()
+            self._drawn.clear()
+        self._same = True
 
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
@@ -0,0 +1,223 @@
+"""
+A module to support keeping the frame rate by lowering the quality of a game.
+
+When the work of an animation frame takes longer than the frame itself, the game runs
+late and stutters.  A :class:`FrameWatchdog` watches the cost of the frames.  If the
+average cost stays over the budget, it raises its level by one, and the game turns off
+one more piece of expensive work (its degradation steps, cheapest to lose first).  When
+the cost falls well under the budget again, the level is lowered one step at a time and
+the work is restored.  The game decides what each step means; the watchdog only keeps
+track of which steps are on.
+
+This module does not import Kivy, so it may be used by the headless backend.
+"""
+from collections import deque
+
+# #mark -
+class FrameWatchdog(object):
+    """
+    A class that degrades the quality of a game while its frames run over budget.
+
+    The watchdog is given the cost in seconds of every frame with :meth:`record`.  Once
+    it has ``window`` costs, it compares their mean with the budget.  If the mean is
+    more than ``overrun`` times the budget, the level goes up; if it is less than
+    ``headroom`` times the budget, the level goes down.  After every change the window
+    starts over, so each step is given a full window to take effect.
+
+    At level n, the first n of the ``steps`` are active.  A game asks whether a step is
+    active with :meth:`degraded`.  The optional function ``on_change`` is called with
+    the new level whenever the level changes.  Every change is kept in :attr:`changes`,
+    and :meth:`report` summarizes the current state and thresholds.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def level(self):
+        """
+        The number of degradation steps that are active.
+
+        Setting the level forces it (for instance, to test a step), and starts the
+        window over.
+
+        **invariant**: Value is an ``int`` in 0..len(steps).
+        """
+        return self._level
+
+    @level.setter
+    def level(self,value):
+        assert type(value) == int and 0 <= value <= len(self._steps), \
+            'level %s is not in 0..%d' % (repr(value),len(self._steps))
+        self._change(value,self.cost)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def steps(self):
+        """
+        The names of the degradation steps, in the order they are turned on.
+
+        **invariant**: Value is a ``tuple`` of ``str``.
+        """
+        return self._steps
+
+    @property
+    def active(self):
+        """
+        The names of the degradation steps that are on.
+
+        **invariant**: Value is a ``tuple`` of ``str``, the first level steps.
+        """
+        return self._steps[:self._level]
+
+    @property
+    def budget(self):
+        """
+        The target cost of one frame in seconds.
+
+        **invariant**: Value is a ``float`` > 0.
+        """
+        return self._budget
+
+    @property
+    def cost(self):
+        """
+        The mean cost in seconds of the frames in the current window.
+
+        **invariant**: Value is a ``float`` >= 0 (0 if the window is empty).
+        """
+        return self._total/len(self._costs) if self._costs else 0.0
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._frames
+
+    @property
+    def changes(self):
+        """
+        The list of level changes, as (frame, old level, new level, mean cost) tuples.
+
+        **invariant**: Value is a ``list``.
+        """
+        return self._changes
+
+    # BUILT-IN METHODS
+    def __init__(self,steps,budget=1/60.0,overrun=1.0,headroom=0.7,window=30,
+                 on_change=None):
+        """
+        Creates a new watchdog at level 0.
+
+        :param steps: The names of the degradation steps, cheapest to lose first
+        :type steps:  sequence of ``str``
+
+        :param budget: The target cost of one frame in seconds
+        :type budget:  ``int`` or ``float`` > 0
+
+        :param overrun: The fraction of the budget above which the level goes up
+        :type overrun:  ``int`` or ``float`` > 0
+
+        :param headroom: The fraction of the budget below which the level goes down
+        :type headroom:  ``int`` or ``float`` in 0..overrun
+
+        :param window: The number of frames to average before a change
+        :type window:  ``int`` > 0
+
+        :param on_change: The function to call with the new level, or None
+        :type on_change:  a function of one argument or ``None``
+        """
+        assert type(budget) in [int,float] and budget > 0, \
+            '%s is not a valid budget' % repr(budget)
+        assert type(overrun) in [int,float] and overrun > 0, \
+            '%s is not a valid overrun' % repr(overrun)
+        assert type(headroom) in [int,float] and 0 <= headroom <= overrun, \
+            '%s is not a valid headroom' % repr(headroom)
+        assert type(window) == int and window > 0, '%s is not a valid window' % repr(window)
+        self._steps  = tuple(steps)
+        self._budget = float(budget)
+        self._overrun  = overrun
+        self._headroom = headroom
+        self._costs  = deque(maxlen=window)
+        self._total  = 0.0
+        self._level  = 0
+        self._frames = 0
+        self._changes = []
+        self.on_change = on_change
+
+    # PUBLIC METHODS
+    def record(self,cost):
+        """
+        Adds the cost of a frame, changing the level if the window calls for it.
+
+        :param cost: The time in seconds spent on the frame
+        :type cost:  ``int`` or ``float`` >= 0
+        """
+        costs = self._costs
+        if len(costs) == costs.maxlen:
+            self._total -= costs[0]
+        costs.append(cost)
+        self._total += cost
+        self._frames += 1
+        if len(costs) < costs.maxlen:
+            return
+
+        mean = self._total/len(costs)
+        if mean > self._budget*self._overrun and self._level < len(self._steps):
+            self._change(self._level+1,mean)
+        elif mean < self._budget*self._headroom and self._level > 0:
+            self._change(self._level-1,mean)
+
+    def degraded(self,step):
+        """
+        Returns: True if the given degradation step is on
+
+        :param step: The name of a step
+        :type step:  ``str``
+        """
+        return step in self._steps[:self._level]
+
+    def reset(self):
+        """
+        Returns to level 0 and forgets the costs recorded so far.
+
+        The list of changes is kept.
+        """
+        self._change(0,self.cost)
+
+    def report(self):
+        """
+        Returns: A dictionary describing the state of this watchdog
+
+        The keys are 'level', 'steps' (all of them), 'active' (those that are on),
+        'budget', 'cost', 'overrun' and 'headroom' (the mean costs that raise and
+        lower the level), all times in milliseconds, and 'window', 'frames' and
+        'changes' (the number of level changes).
+        """
+        return {'level':self._level,'steps':list(self._steps),
+                'active':list(self.active),'budget':1000*self._budget,
+                'cost':1000*self.cost,'overrun':1000*self._budget*self._overrun,
+                'headroom':1000*self._budget*self._headroom,
+                'window':self._costs.maxlen,'frames':self._frames,
+                'changes':len(self._changes)}
+
+    # HIDDEN METHODS
+    def _change(self,level,cost):
+        """
+        Sets the level and starts the window over.
+
+        :param level: The new level
+        :type level:  ``int`` in 0..len(steps)
+
+        :param cost: The mean cost that caused the change, in seconds
+        :type cost:  ``float``
+        """
+        self._costs.clear()
+        self._total = 0.0
+        if level == self._level:
+            return
+        self._changes.append((self._frames,self._level,level,cost))
+        self._level = level
+        if self.on_change is not None:
+            self.on_change(level)
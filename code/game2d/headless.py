@@ -0,0 +1,1105 @@
+"""
+A headless backend for 2D game support.
+
+This module provides plain-Python stand-ins for every class exported by game2d.  They
+keep the same attributes and methods as the Kivy-backed classes (position, size,
+frames, text, collision tests) but never create a window, a texture or a graphics
+instruction.  This allows model and subcontroller code written against game2d to be
+stepped thousands of times a second on machines without a display.
+
+The backend is selected by setting the environment variable ``GAME2D_HEADLESS`` to a
+non-empty value **before** game2d is first imported.  Nothing in this module may import
+Kivy.
+"""
+import os.path
+from .gcache import TextureCache
+from .gloop import FrameLoop
+from .gpreload import AssetManifest
+
+
+# #mark -
+class GObject(object):
+    """
+    A headless graphics object.
+
+    This class stores the geometry of a :class:`game2d.GObject` as plain attributes.
+    There are no transforms and no drawing cache, so setting an attribute costs no more
+    than an ordinary assignment.
+    """
+
+    # DERIVED PROPERTIES
+    @property
+    def left(self):
+        """
+        The left edge of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self.x-self.width/2.0
+
+    @left.setter
+    def left(self,value):
+        self.x = value+self.width/2.0
+
+    @property
+    def right(self):
+        """
+        The right edge of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self.x+self.width/2.0
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width/2.0
+
+    @property
+    def top(self):
+        """
+        The vertical coordinate of the top edge.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self.y+self.height/2.0
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height/2.0
+
+    @property
+    def bottom(self):
+        """
+        The vertical coordinate of the bottom edge.
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self.y-self.height/2.0
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value+self.height/2.0
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new headless object.
+
+        This constructor accepts the same keywords as :class:`game2d.GObject`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.width  = keywords['width']  if 'width'  in keywords else 1
+        self.height = keywords['height'] if 'height' in keywords else 1
+        self.angle  = keywords['angle']  if 'angle'  in keywords else 0
+        self.scale  = keywords['scale']  if 'scale'  in keywords else 1
+        self.x = 0
+        self.y = 0
+
+        if 'x' in keywords:
+            self.x = keywords['x']
+        elif 'left' in keywords:
+            self.left = keywords['left']
+        elif 'right' in keywords:
+            self.right = keywords['right']
+
+        if 'y' in keywords:
+            self.y = keywords['y']
+        elif 'bottom' in keywords:
+            self.bottom = keywords['bottom']
+        elif 'top' in keywords:
+            self.top = keywords['top']
+
+        self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else None
+        self.linecolor = keywords['linecolor'] if 'linecolor' in keywords else None
+        self.name = keywords['name'] if 'name' in keywords else None
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,center=(%s,%s),width=%s,height=%s,angle=%s]' \
+                % (s,repr(self.x),repr(self.y),repr(self.width),repr(self.height),repr(self.angle))
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this object.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # PUBLIC METHODS
+    def contains(self,point):
+        """
+        Checks whether the bounding box of this shape contains the point
+
+        Rotation is ignored by the headless backend.
+
+        :param point: the point to check
+        :type point: a pair of numbers
+
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+
+    def draw(self, view):
+        """
+        Draws this shape in the provide view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self)
+
+
+class GScene(GObject):
+    """
+    A headless scene graph node.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless scene graph node.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.children = list(keywords['children']) if 'children' in keywords else []
+        GObject.__init__(self,**keywords)
+
+
+# #mark -
+class GRectangle(GObject):
+    """
+    A headless rectangle.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless rectangle.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
+        GObject.__init__(self,**keywords)
+
+
+class GEllipse(GRectangle):
+    """
+    A headless ellipse.
+    """
+
+    def contains(self,point):
+        """
+        Checks whether this ellipse contains the point
+
+        :param point: the point to check
+        :type point: a pair of numbers
+
+        :return: True if the ellipse contains this point
+        :rtype:  ``bool``
+        """
+        rx = self.width/2.0
+        ry = self.height/2.0
+        dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
+        dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
+        return dx+dy <= 1.0
+
+
+class GImage(GRectangle):
+    """
+    A headless image.
+
+    The ``source`` is recorded but never loaded.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless image.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.source = keywords['source'] if 'source' in keywords else None
+        GRectangle.__init__(self,**keywords)
+
+
+class GLabel(GRectangle):
+    """
+    A headless text label.
+
+    The text is recorded but never rasterized.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless text label.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 12
+        self.bold   = keywords['bold']   if 'bold'   in keywords else False
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+        self.glyphs = keywords['glyphs'] if 'glyphs' in keywords else False
+        GRectangle.__init__(self,**keywords)
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+
+class GSprite(GRectangle):
+    """
+    A headless filmstrip.
+
+    The frame counter is kept so that animation logic behaves as it does with Kivy.
+    """
+
+    @property
+    def count(self):
+        """
+        The number of frames in this filmstrip
+
+        **invariant**. Value is an int > 0.
+        """
+        return self._format[0]*self._format[1]
+
+    @property
+    def frame(self):
+        """
+        The current animation frame of this filmstrip
+
+        **invariant**. Value is an int 0..count-1.
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self,value):
+        assert type(value) == int, '%s is not an int' % repr(value)
+        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        self._frame = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless sprite.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.source  = keywords['source'] if 'source' in keywords else None
+        self._format = keywords['format'] if 'format' in keywords else (1,1)
+        self._frame  = 0
+        GRectangle.__init__(self,**keywords)
+
+
+class GSpriteBatch(object):
+    """
+    A headless sprite batch.
+
+    The sprites are recorded but never turned into a mesh.
+    """
+
+    @property
+    def count(self):
+        """
+        The number of sprites currently in this batch.
+
+        **invariant**. Value is an int >= 0.
+        """
+        return len(self.sprites)
+
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty headless sprite batch.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.source = keywords['source']
+        self.format = keywords['format'] if 'format' in keywords else (1,1)
+        self.width  = keywords['width']
+        self.height = keywords['height']
+        self.sprites = []
+
+    def update(self,sprites):
+        """
+        Sets the sprites in this batch.
+
+        :param sprites: the sprites to draw
+        :type sprites:  sequence of (``float``, ``float``, ``int``) tuples
+        """
+        self.sprites = list(sprites)
+
+    def draw(self,view):
+        """
+        Records this batch as drawn in the given view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self)
+
+
+# #mark -
+class GPath(GObject):
+    """
+    A headless path.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless path.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.points = tuple(keywords['points']) if 'points' in keywords else ()
+        self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 1.0
+        GObject.__init__(self,**keywords)
+
+
+class GTriangle(GPath):
+    """
+    A headless triangle.
+    """
+    pass
+
+
+class GPolygon(GPath):
+    """
+    A headless polygon.
+    """
+    pass
+
+
+# #mark -
+class GInput(object):
+    """
+    A headless input handler.
+
+    There is no keyboard or mouse to listen to.  Instead, the keys reported as held
+    down are set by a script or bot through :meth:`press` and :meth:`release`.
+    """
+
+    @property
+    def touch(self):
+        """
+        The current (x,y) coordinate of the mouse, if pressed.
+
+        **Invariant**: Must be either a pair of numbers or None (if there is no touch).
+        """
+        return self._touch
+
+    @touch.setter
+    def touch(self,value):
+        self._touch = value
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        **Invariant**: Must be an int >= 0."""
+        return len(self._keys)
+
+    @property
+    def keys(self):
+        """
+        The list of keys that are currently held down.
+
+        **Invariant**: Must be a list of strings (possibly empty)
+        """
+        return tuple(self._keys)
+
+    def __init__(self):
+        """
+        Creates a new headless input handler with no keys held down.
+        """
+        self._keys  = set()
+        self._touch = None
+
+    def is_key_down(self,key):
+        """
+        Checks wether the key is currently held down.
+
+        :param key: the key to test
+        :type key:  ``str``
+
+        :return: True if ``key`` is currently held down
+        :rtype:  ``bool``
+        """
+        return key in self._keys
+
+    def is_touch_down(self):
+        """
+        Checks wether the mouse is currently held down.
+
+        :return: True if the mouse is currently held down; False otherwise
+        :rtype:  ``bool``
+        """
+        return not self._touch is None
+
+    def press(self,*keys):
+        """
+        Marks the given keys as held down.
+
+        :param keys: the keys to press
+        :type keys:  ``str``
+        """
+        self._keys.update(keys)
+
+    def release(self,*keys):
+        """
+        Marks the given keys as released.
+
+        If no key is given, every key is released.
+
+        :param keys: the keys to release
+        :type keys:  ``str``
+        """
+        if keys:
+            self._keys.difference_update(keys)
+        else:
+            self._keys.clear()
+
+
+class GView(object):
+    """
+    A headless view.
+
+    The view draws nothing.  It counts the objects drawn since the last clear (or the
+    last flush, in retained mode), and keeps the list of objects that would be on the
+    canvas, in the order they would be painted.
+    """
+
+    @property
+    def retained(self):
+        """
+        Whether this view is in retained mode.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+        self.clear()
+
+    @property
+    def count(self):
+        """
+        The number of objects drawn since the last call to :meth:`clear`.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._count
+
+    @property
+    def contents(self):
+        """
+        The objects on the canvas, from the bottom to the top.
+
+        In retained mode the canvas only changes when the view is flushed.
+
+        **Invariant**: Must be a list (which should not be modified)
+        """
+        return self._canvas
+
+    def __init__(self):
+        """
+        Creates a new, empty headless view.
+        """
+        self._count = 0
+        self._retained = False
+        self._canvas = []
+        self._contents = set()
+        self._order = []
+        self._drawn = set()
+        self._same = True
+
+    def draw(self,cmd):
+        """
+        Records that an object was drawn to this view.
+
+        :param cmd: the object drawn
+        :type cmd:  any
+        """
+        self._count += 1
+        if self._retained:
+            if not cmd in self._drawn:
+                self._drawn.add(cmd)
+                self._order.append(cmd)
+                pos = len(self._order)-1
+                if self._same and (pos >= len(self._canvas) or self._canvas[pos] is not cmd):
+                    self._same = False
+        elif not cmd in self._contents:
+            self._canvas.append(cmd)
+            self._contents.add(cmd)
+
+    def remove(self,cmd):
+        """
+        Removes the given object from this view.
+
+        :param cmd: the object to remove
+        :type cmd:  any
+        """
+        if cmd in self._contents:
+            self._canvas.remove(cmd)
+            self._contents.discard(cmd)
+            self._same = False
+        if cmd in self._drawn:
+            self._drawn.discard(cmd)
+            self._order.remove(cmd)
+            self._same = False
+
+    def clear(self):
+        """
+        Clears the contents of the view.
+        """
+        self._count = 0
+        self._canvas = []
+        self._contents = set()
+        self._order = []
+        self._drawn = set()
+        self._same = True
+
+    def flush(self):
+        """
+        Ends a frame in retained mode.
+
+        The canvas is rebuilt in drawing order unless the objects drawn since the last
+        flush are exactly those on the canvas, in the same order.
+        """
+        self._count = 0
+        if not self._same or len(self._order) != len(self._canvas):
+            self._canvas = self._order
+            self._contents = self._drawn
+            self._order = []
+            self._drawn = set()
+        else:
+            self._order.clear()
+            self._drawn.clear()
+        self._same = True
+
+
+# #mark -
+class Sound(object):
+    """
+    A silent sound.
+
+    The source is recorded, but no file is opened and nothing is ever played.
+    """
+
+    @property
+    def source(self):
+        """
+        The source file for this sound.
+
+        **Invariant**: Must be a nonempty string.
+        """
+        return self._source
+
+    @property
+    def playing(self):
+        """
+        Whether or not the sound is currently playing. Always False.
+
+        **Invariant**: Must be a boolean.
+        """
+        return False
+
+    def __init__(self,source):
+        """
+        Creates a new silent sound.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        """
+        self._source = source
+        self.volume  = 1
+
+    def play(self,loop=False):
+        """
+        Does nothing.
+
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        pass
+
+    def stop(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+class SoundLibrary(object):
+    """
+    A dictionary that maps keys to silent Sound objects.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty sound library.
+        """
+        self._data = {}
+
+    def __len__(self):
+        """
+        :return: The number of sounds in this library.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._data)
+
+    def __getitem__(self, key):
+        """
+        :return: The object for the given sound name.
+        :rtype:  :class:`Sound`
+        """
+        return self._data[key]
+
+    def __setitem__(self, key, filename):
+        """
+        Creates a silent sound for filename and assigns it the given name.
+        """
+        self._data[key] = Sound(filename)
+
+    def __delitem__(self, key):
+        """
+        Deletes the Sound object for the given sound name.
+        """
+        del self._data[key]
+
+    def __iter__(self):
+        """
+        :return: The iterator for this sound dictionary.
+        :rtype:  ``iterable``
+        """
+        return iter(self._data.keys())
+
+    def keys(self):
+        """
+        :return: The keys for this sound dictionary.
+        :rtype:  ``iterable``
+        """
+        return self._data.keys()
+
+
+class VoicePool(object):
+    """
+    A pool of silent voices.
+
+    Voices are created and handed out in order, but nothing is ever played.
+    """
+
+    def __init__(self,limit=8):
+        """
+        Creates a new, empty voice pool.
+
+        :param limit: The maximum number of voices that may play at once
+        :type limit:  ``int`` > 0
+        """
+        self._effects = {}
+        self.limit  = limit
+        self.volume = 1
+
+    def __contains__(self, key):
+        """
+        :return: True if an effect has been added for the given key
+        :rtype:  ``bool``
+        """
+        return key in self._effects
+
+    def __len__(self):
+        """
+        :return: The number of effects in this pool.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._effects)
+
+    @property
+    def voices(self):
+        """
+        The number of voices loaded in this pool.
+        """
+        return sum(len(effect) for effect in self._effects.values())
+
+    @property
+    def playing(self):
+        """
+        The number of voices that are currently playing. Always 0.
+        """
+        return 0
+
+    def add(self, key, filename, voices=4):
+        """
+        Assigns the given number of silent voices of filename to the given key.
+
+        The voices come from :meth:`GameApp.load_voices`, as in the Kivy backend.
+        """
+        self._effects[key] = GameApp.load_voices(filename,voices)
+
+    def play(self, key):
+        """
+        Does nothing, but the key must have been added.
+        """
+        self._effects[key]
+
+    def start(self, sound, loop=False):
+        """
+        Does nothing, as silent sounds never play.
+        """
+        pass
+
+    def stop(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+class SoundBank(SoundLibrary):
+    """
+    The shared library of silent sounds, with a mute flag.
+
+    Files are loaded through :meth:`GameApp.load_sound`, as in the Kivy backend.
+    """
+    _shared = None
+
+    def __init__(self):
+        """
+        Creates a new, empty sound bank.
+        """
+        SoundLibrary.__init__(self)
+        self.muted  = False
+        self.volume = 1
+        self.voices = VoicePool()
+        self.coalesce = 0
+
+    def __setitem__(self, key, filename):
+        """
+        Assigns the shared silent sound for filename to the given name.
+        """
+        self._data[key] = GameApp.load_sound(filename)
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns: The sound bank shared by the whole game
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def play(self, key, loop=False):
+        """
+        Does nothing, but the key must have been assigned or added to the voices.
+        """
+        if not key in self.voices:
+            self._data[key]
+
+class Preloader(object):
+    """
+    A headless preloader.
+
+    There are no textures or glyphs to load, so the sounds and voices of the manifest
+    are put in the sound caches on the first poll and the preloader is done.
+    """
+
+    @property
+    def total(self):
+        """
+        The number of assets to load.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return len(self._manifest)
+
+    @property
+    def loaded(self):
+        """
+        The number of assets loaded so far.
+
+        **invariant**: Value is an ``int`` in 0..total.
+        """
+        return self.total if self._done else 0
+
+    @property
+    def progress(self):
+        """
+        The fraction of the assets loaded so far.
+
+        **invariant**: Value is a ``float`` in 0..1.
+        """
+        return 1.0 if self._done or self.total == 0 else 0.0
+
+    @property
+    def done(self):
+        """
+        Whether every asset has been loaded.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._done
+
+    @property
+    def errors(self):
+        """
+        The list of (name, exception) pairs for the assets that failed to load.
+
+        **invariant**: Value is a ``list``.
+        """
+        return []
+
+    def __init__(self,manifest,workers=2):
+        """
+        Creates a new headless preloader for the given manifest.
+
+        :param manifest: The assets to load
+        :type manifest:  :class:`AssetManifest`
+
+        :param workers: Ignored
+        :type workers:  ``int`` > 0
+        """
+        self._manifest = manifest
+        self._done = False
+
+    def start(self):
+        """
+        Does nothing, as there are no worker threads.
+        """
+        pass
+
+    def poll(self,budget=0.004):
+        """
+        :return: The progress after loading every sound in the manifest
+        :rtype:  ``float``
+        """
+        self.finish()
+        return self.progress
+
+    def finish(self):
+        """
+        Loads every sound and voice in the manifest.
+        """
+        if not self._done:
+            for name in self._manifest.sounds:
+                GameApp.load_sound(name)
+            for name, count in self._manifest.voices:
+                GameApp.load_voices(name,count)
+            self._done = True
+
+
+# #mark -
+class GameApp(FrameLoop):
+    """
+    A headless controller class for a simple game application.
+
+    Subclasses override :meth:`start`, :meth:`update` and :meth:`draw` exactly as they
+    would for the Kivy application.  Instead of a window and a clock, :meth:`run` steps
+    the game in a tight loop with a fixed ``dt`` of ``1/fps``.
+    """
+    # Class attribute for tracking textures; always empty, as nothing is loaded
+    TEXTURE_CACHE = TextureCache()
+    # Class attribute for tracking shared (silent) sounds, keyed by file name
+    SOUND_CACHE = {}
+    # Class attribute for tracking the (silent) voices of sounds, keyed by file name
+    VOICE_CACHE = {}
+
+    @property
+    def fps(self):
+        """
+        The number of frames-per-second to simulate
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._fps
+
+    @fps.setter
+    def fps(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._fps = value
+
+    @property
+    def width(self):
+        """
+        The window width
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._gwidth
+
+    @property
+    def height(self):
+        """
+        The window height
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._gheight
+
+    @property
+    def view(self):
+        """
+        The (headless) game view.
+
+        **Invariant**: Must be instance of :class:`GView`.
+        """
+        return self._view
+
+    @property
+    def input(self):
+        """
+        The (headless) game input handler.
+
+        **Invariant**: Must be instance of :class:`GInput`
+        """
+        return self._input
+
+    @classmethod
+    def is_image(cls,name):
+        """
+        :return: True if ``name`` refers to an image file; False otherwise
+        :rtype:  ``bool``
+        """
+        return type(name) == str and os.path.exists(os.path.join(cls.images,name))
+
+    @classmethod
+    def is_font(cls,name):
+        """
+        :return: True if ``name`` refers to a font file; False otherwise
+        :rtype:  ``bool``
+        """
+        return type(name) == str and os.path.exists(os.path.join(cls.fonts,name))
+
+    @classmethod
+    def is_sound(cls,name):
+        """
+        :return: True if ``name`` refers to a sound file; False otherwise
+        :rtype:  ``bool``
+        """
+        return type(name) == str and os.path.exists(os.path.join(cls.sounds,name))
+
+    @classmethod
+    def load_sound(cls,name):
+        """
+        :return: The shared silent sound for the given file name
+        :rtype:  :class:`Sound`
+
+        As with :class:`Sound`, the file is not checked, so this works before any
+        game has set the resource paths.
+        """
+        if not name in cls.SOUND_CACHE:
+            cls.SOUND_CACHE[name] = Sound(name)
+        return cls.SOUND_CACHE[name]
+
+    @classmethod
+    def load_voices(cls,name,count):
+        """
+        :return: A list of count silent voices of the given file name
+        :rtype:  ``list`` of :class:`Sound`
+
+        The voices are cached by file name, and only the missing voices are created.
+        """
+        voices = cls.VOICE_CACHE.setdefault(name,[])
+        while len(voices) < count:
+            voices.append(Sound(name))
+        return voices[:count]
+
+    def __init__(self,**keywords):
+        """
+        Creates, but does not start, a new headless game.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._gwidth = keywords.pop('width', 0.0)
+        self._gheight = keywords.pop('height', 0.0)
+        self.fps = keywords.pop('fps', 60.0)
+        self._setloop(self.fps,keywords.pop('step', None),keywords.pop('stats', None),
+                      keywords.pop('watchdog', None))
+        self._view  = GView()
+        self._view.retained = keywords.pop('retained', False)
+        GameApp.TEXTURE_CACHE.budget = keywords.pop('texture_budget',
+                                                    GameApp.TEXTURE_CACHE.budget)
+        self._input = GInput()
+        self._running = False
+        self._setpaths()
+
+    def run(self,frames=None):
+        """
+        Starts the game and steps it until :meth:`stop` is called.
+
+        :param frames: The maximum number of frames to step (None for no limit)
+        :type frames:  ``int`` or ``None``
+        """
+        self._running = True
+        self.start()
+        dt = 1.0/self.fps
+        count = 0
+        while self._running and (frames is None or count < frames):
+            self._refresh(dt)
+            count += 1
+
+    def stop(self):
+        """
+        Stops the game loop at the end of the current frame.
+        """
+        self._running = False
+
+    def start(self):
+        """
+        Initializes the game state, creating a new game.
+        """
+        pass
+
+    def update(self,dt):
+        """
+        Updates the state of the game one animation frame.
+
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        pass
+
+    def draw(self):
+        """
+        Draws the game objects to the (headless) view.
+        """
+        pass
+
+    def _setpaths(self):
+        """
+        Sets the resource paths to the application directory.
+        """
+        import inspect
+        path = os.path.abspath(inspect.getfile(self.__class__))
+        path = os.path.dirname(path)
+
+        GameApp.fonts  = str(os.path.join(path, 'Fonts'))
+        GameApp.sounds = str(os.path.join(path, 'Sounds'))
+        GameApp.images = str(os.path.join(path, 'Images'))
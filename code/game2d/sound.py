@@ -6,6 +6,8 @@ This classes wrap the Kivy audio interface, making it simpler for students to us
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+from collections import deque, OrderedDict
+import time
 from kivy.core.audio import SoundLoader
 from .app import GameApp
 
@@ -21,7 +23,7 @@ class Sound(object):
     
     When a sound is played, it cannot be played again until it finishes, or is stopped.  
     This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    file.you will need to create multiple Sound objects, or use a :class:`VoicePool`.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
@@ -179,3 +181,360 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+
+
+# #mark -
+class VoicePool(object):
+    """
+    A class representing sound effects that can overlap with themselves.
+    
+    A :class:`Sound` cannot be played again until it finishes, so an effect that is
+    triggered faster than it plays is either cut off or dropped.  A voice pool loads
+    several copies (voices) of each effect up front with :meth:`add`.  Every call to
+    :meth:`play` starts the voice of that effect that was started least recently,
+    stopping it first if it is still playing.
+    
+    The pool also caps the number of sounds that play at once.  The cap covers all of
+    its effects, and any other sound started through :meth:`start` (as
+    :class:`SoundBank` does for every sound it plays).  When the cap is reached,
+    starting a sound stops the sound that has been playing the longest.  No sounds are
+    ever loaded by :meth:`play`, so the cost of heavy use is fixed by the number of
+    voices.
+    """
+    
+    # MUTABLE PROPERTIES
+    @property
+    def limit(self):
+        """
+        The maximum number of sounds (voices or others) that may play at once.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._limit
+    
+    @limit.setter
+    def limit(self,value):
+        assert type(value) == int and value > 0, 'value %s is not a valid limit' % repr(value)
+        self._limit = value
+    
+    @property
+    def volume(self):
+        """
+        The volume of every voice in this pool.
+        
+        1 means full volume, 0 means silent.  The default value is 1.
+        
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+    
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+        for voice in self._started:
+            voice.volume = value
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def voices(self):
+        """
+        The number of voices loaded in this pool.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return sum(len(effect) for effect in self._effects.values())
+    
+    @property
+    def playing(self):
+        """
+        The number of sounds started by this pool that are currently playing.
+        
+        **Invariant**: Must be an int in 0..limit.
+        """
+        return sum(1 for sound in self._started if sound.playing)
+    
+    # BUILT-IN METHODS
+    def __init__(self,limit=8):
+        """
+        Creates a new, empty voice pool.
+        
+        :param limit: The maximum number of voices that may play at once
+        :type limit:  ``int`` > 0
+        """
+        self._effects = {}               # key -> deque of voices, next voice first
+        self._started = OrderedDict()    # every sound, least recently started first
+        self._volume  = 1
+        self.limit = limit
+    
+    def __contains__(self, key):
+        """
+        :return: True if an effect has been added for the given key
+        :rtype:  ``bool``
+        """
+        return key in self._effects
+    
+    def __len__(self):
+        """
+        :return: The number of effects in this pool.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._effects)
+    
+    # PUBLIC METHODS
+    def add(self, key, filename, voices=4):
+        """
+        Loads the given number of voices of the file filename for the given key.
+        
+        The voices come from :meth:`GameApp.load_voices`, so they are only read from
+        disk once (or never, if a :class:`Preloader` loaded them).  If the key already
+        has that many voices of that file, nothing changes.  Otherwise any old voices
+        for the key are replaced.
+        
+        :param key: The key identifying the effect
+        :type key:  ``str``
+        
+        :param filename: The name of the file containing the sound source
+        :type filename:  ``str``
+        
+        :param voices: The number of voices to load
+        :type voices:  ``int`` > 0
+        """
+        assert type(voices) == int and voices > 0, '%s is not a valid count' % repr(voices)
+        if key in self._effects:
+            old = self._effects[key]
+            if len(old) == voices and old[0].source == filename:
+                return
+            for voice in old:
+                voice.stop()
+                del self._started[voice]
+        
+        effect = deque()
+        for voice in GameApp.load_voices(filename,voices):
+            voice.volume = self._volume
+            effect.append(voice)
+            self._started[voice] = None
+            self._started.move_to_end(voice,last=False)
+        self._effects[key] = effect
+    
+    def play(self, key):
+        """
+        Plays the effect for the given key on its least recently started voice.
+        
+        If that voice is still playing, it is restarted.  Otherwise, if the pool is
+        already playing :attr:`limit` voices, the voice playing the longest is stopped.
+        
+        :param key: The key identifying the effect
+        :type key:  ``str``
+        """
+        effect = self._effects[key]
+        voice = effect.popleft()
+        effect.append(voice)
+        self.start(voice)
+    
+    def start(self, sound, loop=False):
+        """
+        Plays the given sound, counting it against :attr:`limit`.
+        
+        The sound need not be a voice of this pool.  If it is still playing, it is
+        restarted.  Otherwise, if the pool is already playing :attr:`limit` sounds, the
+        sound playing the longest is stopped.
+        
+        :param sound: The sound to play
+        :type sound:  :class:`Sound`
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        if sound.playing:
+            sound.stop()
+        else:
+            active = 0
+            oldest = None
+            for other in self._started:
+                if other.playing:
+                    active += 1
+                    if oldest is None:
+                        oldest = other
+            if active >= self._limit:
+                oldest.stop()
+        self._started[sound] = None
+        self._started.move_to_end(sound)
+        sound.play(loop)
+    
+    def stop(self):
+        """
+        Stops every voice in this pool.
+        """
+        for voice in self._started:
+            if voice.playing:
+                voice.stop()
+
+
+# #mark -
+class SoundBank(SoundLibrary):
+    """
+    A class representing the sound library shared by the whole game.
+    
+    There is only one sound bank, which you get with the class method :meth:`shared`.
+    Assigning a file to a key uses :meth:`GameApp.load_sound`, so each file is read 
+    from disk only once, however many times (or in however many waves) it is assigned.
+    Assigning a key again simply remaps it to another loaded sound.
+    
+    Sounds in the bank should be played with :meth:`play`, which respects the 
+    :attr:`muted` flag of the bank.  Muting and unmuting the bank therefore costs 
+    nothing: no sounds are discarded or loaded.
+    
+    Effects that must overlap with themselves can be added to the :class:`VoicePool`
+    of the bank, :attr:`voices`.  A key in that pool is played on one of its voices.
+    The other sounds are started through the pool as well, so the limit of the pool
+    caps every sound the bank plays.
+    
+    To save work when a game is busy, the bank can coalesce repeated triggers: while 
+    :attr:`coalesce` is positive, a sound started less than that many seconds ago is 
+    not started again.
+    """
+    # The single shared instance
+    _shared = None
+    
+    # MUTABLE PROPERTIES
+    @property
+    def muted(self):
+        """
+        Whether the sounds in this bank are silenced.
+        
+        While the bank is muted, :meth:`play` does nothing.  Muting the bank also stops
+        any of its sounds that are playing.
+        
+        **Invariant**: Must be a boolean.
+        """
+        return self._muted
+    
+    @muted.setter
+    def muted(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value and not self._muted:
+            for sound in self._data.values():
+                if sound.playing:
+                    sound.stop()
+            self._voices.stop()
+        self._muted = value
+    
+    @property
+    def volume(self):
+        """
+        The volume of every sound in this bank.
+        
+        1 means full volume, 0 means silent.  The default value is 1.  Sounds added to
+        the bank are given this volume.
+        
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+    
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+        for sound in self._data.values():
+            sound.volume = value
+        self._voices.volume = value
+    
+    @property
+    def coalesce(self):
+        """
+        The number of seconds within which repeated plays of a sound are dropped.
+        
+        0 (the default) means that every call to :meth:`play` starts its sound.
+        
+        **Invariant**: Must be an int or float >= 0.
+        """
+        return self._coalesce
+    
+    @coalesce.setter
+    def coalesce(self,value):
+        assert type(value) in [int, float] and value >= 0, \
+            'value %s is not a valid time' % repr(value)
+        self._coalesce = value
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def voices(self):
+        """
+        The voice pool for the effects of this bank that overlap.
+        
+        **Invariant**: Must be a :class:`VoicePool`.
+        """
+        return self._voices
+    
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new, empty sound bank.
+        
+        You should use :meth:`shared` instead of creating a bank yourself.
+        """
+        SoundLibrary.__init__(self)
+        self._muted  = False
+        self._volume = 1
+        self._voices = VoicePool()
+        self._coalesce = 0
+        self._started  = {}
+    
+    def __setitem__(self, key, filename):
+        """
+        Assigns the shared sound for the file filename to the given name.
+        
+        :param key: The key identifying a sound object
+        :type key:  ``str``
+        
+        :param filename: The name of the file containing the sound source
+        :type filename:  ``str``
+        """
+        sound = GameApp.load_sound(filename)
+        if sound.volume != self._volume:
+            sound.volume = self._volume
+        self._data[key] = sound
+    
+    # CLASS METHODS
+    @classmethod
+    def shared(cls):
+        """
+        Returns: The sound bank shared by the whole game
+        
+        The bank is created the first time this method is called.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    # PUBLIC METHODS
+    def play(self, key, loop=False):
+        """
+        Plays the sound for the given name, unless this bank is muted.
+        
+        If the name is in the voice pool of this bank, it is played on a voice of the
+        pool (and ``loop`` is ignored).  Any other sound is started through the pool,
+        so every sound of the bank counts against the :attr:`VoicePool.limit`.  If
+        :attr:`coalesce` is positive and the sound was started less than that many
+        seconds ago, it is not started again.
+        
+        :param key: The key identifying a sound object
+        :type key:  ``str``
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        if self._muted:
+            return
+        if self._coalesce > 0:
+            now = time.perf_counter()
+            if now-self._started.get(key,-self._coalesce) < self._coalesce:
+                return
+            self._started[key] = now
+        if key in self._voices:
+            self._voices.play(key)
+        else:
+            self._voices.start(self._data[key],loop)
@@ -10,9 +10,10 @@ could just be an instance of GImage that you move across the screen. You only ne
 class when you add extra features to an object. So technically Bolt, which has a velocity,
 is really the only model that needs to have its own class.
 
-With that said, we have included the subclasses for Ship and Aliens.  That is because
-there are a lot of constants in consts.py for initializing the objects, and you might
-want to add a custom initializer.  With that said, feel free to keep the pass underneath
+With that said, we have included the subclass for Ship.  That is because there are a
+lot of constants in consts.py for initializing the objects, and you might want to add a
+custom initializer.  The aliens have no class of their own; their state is kept in an
+AlienFormation and they are drawn through sprite batches.  With that said, feel free to keep the pass underneath
 the class definitions if you do not want to do that.
 
 You are free to add even more models to this module.  You may wish to do this when you
@@ -24,6 +25,7 @@ December 4, 2018
 """
 from consts import *
 from game2d import *
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
 # consts.py.  If you need extra information from Gameplay, then it should be
@@ -31,7 +33,67 @@ from game2d import *
 # calls the method.
 
 
-class Ship(GImage):
+class Interpolated(object):
+    """
+    A mixin class for a model that can be drawn between two simulation steps.
+
+    When the game runs with a fixed time step (see the step attribute of GameApp), a
+    frame is usually drawn part of the way between two steps.  A model with this mixin
+    remembers where it was at the start of the current step, so that Wave can draw it
+    at a blended position instead of snapping from one step to the next.
+
+    Blending really moves the object, so its true position is kept aside until the
+    next call to remember.  Hence remember must be called at the start of every step,
+    before any game logic looks at the object.
+
+    INSTANCE ATTRIBUTES:
+        _lastX: the x coordinate at the start of the current step [int or float]
+        _lastY: the y coordinate at the start of the current step [int or float]
+        _trueX: the true x coordinate while blended, or None [int, float or None]
+        _trueY: the true y coordinate while blended, or None [int, float or None]
+    """
+
+    # METHODS TO INTERPOLATE THE POSITION
+    def remember(self):
+        """
+        Records the current position as the position at the start of a step.
+
+        If the object is blended, it is moved back to its true position first.
+        """
+        if self._trueX is not None:
+            self.x = self._trueX
+            self.y = self._trueY
+            self._trueX = None
+            self._trueY = None
+        self._lastX = self.x
+        self._lastY = self.y
+
+    def blend(self,alpha):
+        """
+        Moves the object alpha of the way from its position at the start of the
+        step to its true position.
+
+        Parameter alpha: the fraction of the step to blend
+        Precondition: alpha is a float in 0..1
+        """
+        if self._trueX is None:
+            self._trueX = self.x
+            self._trueY = self.y
+        self.x = self._lastX + (self._trueX-self._lastX)*alpha
+        self.y = self._lastY + (self._trueY-self._lastY)*alpha
+
+    def settle(self):
+        """
+        Makes the current position both the true position and the position at the
+        start of the step, forgetting any blend.
+        """
+        self._trueX = None
+        self._trueY = None
+        self._lastX = self.x
+        self._lastY = self.y
+
+
+class Ship(Interpolated,GImage):
     """
     A class to represent the game ship.
 
@@ -109,6 +171,7 @@ class Ship(GImage):
         Precondition: source is a string refering to a valid file.
         """
         super().__init__(x=x,y=y,width=width,height=height,source=source)
+        self.settle()
 
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def moveShip(self,input):
@@ -150,112 +213,7 @@ class Ship(GImage):
                 return False
 
 
-class Alien(GSprite):
-    """
-    A class to represent a single alien.
-
-    At the very least, you want a __init__ method to initialize the alien dimensions.
-    These dimensions are all specified in consts.py.
-
-    You also MIGHT want to add code to detect a collision with a bolt. We do not require
-    this.  You could put this method in Wave if you wanted to.  But the advantage of
-    putting it here is that Ships and Aliens collide with different bolts.  Ships
-    collide with Alien bolts, not Ship bolts.  And Aliens collide with Ship bolts, not
-    Alien bolts. An easy way to keep this straight is for this class to have its own
-    collision method.
-
-    However, there is no need for any more attributes other than those inherited by
-    GImage. You would only add attributes if you needed them for extra gameplay
-    features (like giving each alien a score value). If you add attributes, list
-    them below.
-
-    LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    """
-
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getX(self):
-        """
-        Returns: the alien's x coordinate.
-        """
-        return self.x
-
-    def getY(self):
-        """
-        Returns: the alien's y coordinate.
-        """
-        return self.y
-
-    def setX(self,x):
-        """
-        Sets the alien's x coordinate to the given value.
-
-        Parameter value: the new x coordinate
-        Precondition: value is a number (int or float).
-        """
-        self.x = x
-
-    def setY(self,y):
-        """
-        Sets the alien's y coordinate to the given value.
-
-        Parameter value: the new y coordinate
-        Precondition: value is a number (int or float).
-        """
-        self.y = y
-
-    # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self, x, y, width, height, source, format):
-        """
-        Initializer: Creates the Alien Object centered at x and y,
-        with a width of width, a height of height, from a source source, and
-        with a format of format.
-
-        Parameter x: The horizontal coordinate of the object center.
-        Precondition: x is an int or float
-
-        Parameter y: The vertical coordinate of the object center.
-        Precondition: y is an int or float
-
-        Parameter width: The horizontal width of this shape.
-        Precondition: width is an int or float > 0
-
-        Parameter height: The vertical height of this shape.
-        Precondition: height is an int or float > 0
-
-        Parameter source: The source file for this spritesheet.
-        Precondition: source is a string refering to a valid file.
-
-        Parameter format: The format for this spritesheet.
-        Precondition: format is a 2-element tuple describing the rows and columns
-                        of the object.
-        """
-        super().__init__(x=x,y=y,width=width,height=height,source=source,
-                            format=format)
-
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
-        """
-        Returns: True if the bolt was fired by the player and collides with this alien
-
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        assert isinstance(bolt,Bolt)
-
-        if bolt.getIsPlayerBolt():
-            if self.contains((bolt.getX()+BOLT_WIDTH/2,bolt.getY()+BOLT_HEIGHT/2)):
-                return True
-            elif self.contains((bolt.getX()-BOLT_WIDTH/2,bolt.getY()+BOLT_HEIGHT/2)):
-                return True
-            elif self.contains((bolt.getX()+BOLT_WIDTH/2,bolt.getY()-BOLT_HEIGHT/2)):
-                return True
-            elif self.contains((bolt.getX()-BOLT_WIDTH/2,bolt.getY()-BOLT_HEIGHT/2)):
-                return True
-            else:
-                return False
-
-
-class Bolt(GRectangle):
+class Bolt(Interpolated,GRectangle):
     """
     A class representing a laser bolt.
 
@@ -364,8 +322,31 @@ class Bolt(GRectangle):
                             linecolor=linecolor)
         self.setVelocity(velocity)
         self._isPlayerBolt = None
+        self.settle()
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
+    def reset(self,x,y,velocity):
+        """
+        Reuses this bolt for a new shot centered at x and y with the given velocity.
+
+        The bolt is left exactly as the initializer would leave it, but its colors
+        and drawing instructions are kept.
+
+        Parameter x: The horizontal coordinate of the object center.
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the object center.
+        Precondition: y is an int or float
+
+        Parameter velocity: The velocity in the y direction
+        Precondition: velocity is an int or float
+        """
+        self.setX(x)
+        self.setY(y)
+        self.setVelocity(velocity)
+        self._isPlayerBolt = None
+        self.settle()
+
     def isPlayerBolt(self):
         """
         Sets _isPlayerBolt to True if the velocity of the bolt is positive (>0)
@@ -375,3 +356,382 @@ class Bolt(GRectangle):
             self._isPlayerBolt = True
         else:
             self._isPlayerBolt = False
+
+
+class AlienFormation(object):
+    """
+    A class to represent the state of every alien in a wave as arrays.
+
+    The formation is a structure of arrays: instead of a 2d list of alien sprites, it
+    keeps one NumPy array per attribute, each of shape (rows, columns). Row 0 is the
+    bottom row and column 0 is the leftmost column.  Because the whole formation moves
+    together, a march step, a drop, the extent check and the alive count are each a
+    single vectorized operation.
+
+    The cells of dead aliens keep moving with the formation.  That way every cell
+    always sits on a regular grid whose bottom left cell is at (getX(0,0), getY(0,0)).
+
+    Sprite batches are views of this state.  Call getQuads to fill a batch.  Every
+    change to the formation increases getVersion(), so a view only needs to be
+    refreshed when the version differs from the one it last saw.
+
+    INSTANCE ATTRIBUTES:
+        _x:     the x-coordinates of the alien centers [float array]
+        _y:     the y-coordinates of the alien centers [float array]
+        _alive: whether each alien is alive [bool array]
+        _frame: the animation frame of each alien [int array, values 0 or 1]
+        _kind:  the index of each alien's image in ALIEN_SPRITES [int array]
+        _version: the number of changes (moves and kills) so far [int >= 0]
+        _lowest:  the row of the lowest living alien in each column, or -1 if the
+                  column is empty [list of int, one per column]
+        _columns: the columns that still have a living alien, in increasing order
+                  [list of int]
+        _bottom:  the lowest row that still has a living alien, or -1 if there are
+                  no living aliens [int]
+        _count:   the number of living aliens [int >= 0]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getRows(self):
+        """
+        Returns: the number of rows in the formation.
+        """
+        return self._alive.shape[0]
+
+    def getCols(self):
+        """
+        Returns: the number of aliens in each row of the formation.
+        """
+        return self._alive.shape[1]
+
+    def getX(self,row,col):
+        """
+        Returns: the x coordinate of the given cell.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return float(self._x[row,col])
+
+    def getY(self,row,col):
+        """
+        Returns: the y coordinate of the given cell.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return float(self._y[row,col])
+
+    def getKind(self,row,col):
+        """
+        Returns: the index in ALIEN_SPRITES of the alien in the given cell.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return int(self._kind[row,col])
+
+    def getLowest(self,col):
+        """
+        Returns: the row of the lowest living alien in the given column, or -1 if
+        every alien in that column is dead.
+
+        Parameter col: the column to check
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return self._lowest[col]
+
+    def getColumns(self):
+        """
+        Returns: the list of columns that still have a living alien, in increasing
+        order.
+
+        This list is maintained by the formation and must not be modified.
+        """
+        return self._columns
+
+    def getBottomRow(self):
+        """
+        Returns: the lowest row that still has a living alien, or -1 if every alien
+        is dead.
+        """
+        return self._bottom
+
+    def getVersion(self):
+        """
+        Returns: the number of times the formation has moved or lost an alien.
+        """
+        return self._version
+
+    def getQuads(self,kind):
+        """
+        Returns: a list of (x, y, frame) tuples, one for each living alien with the
+        given image, for drawing in a sprite batch.
+
+        Parameter kind: the index of the image in ALIEN_SPRITES
+        Precondition: kind is an int in 0..len(ALIEN_SPRITES)-1
+        """
+        mask = self._alive & (self._kind == kind)
+        return list(zip(self._x[mask].tolist(),self._y[mask].tolist(),
+                        self._frame[mask].tolist()))
+
+    def isAlive(self,row,col):
+        """
+        Returns: True if the alien in the given cell is alive.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return bool(self._alive[row,col])
+
+    # INITIALIZER TO CREATE A FULL FORMATION
+    def __init__(self,rows,cols,x,y):
+        """
+        Initializer: Creates a formation of rows x cols living aliens whose bottom
+        left alien is centered at x and y.
+
+        Every two rows (from the bottom) share an alien image, cycling through
+        ALIEN_SPRITES.
+
+        Parameter rows: The number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: The number of aliens in each row
+        Precondition: cols is an int > 0
+
+        Parameter x: The horizontal coordinate of the bottom left alien
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the bottom left alien
+        Precondition: y is an int or float
+        """
+        self._x = np.empty((rows,cols))
+        self._x[:] = x + ALIEN_H_PITCH*np.arange(cols)
+        self._y = np.empty((rows,cols))
+        self._y[:] = (y + ALIEN_V_PITCH*np.arange(rows))[:,np.newaxis]
+        self._alive = np.ones((rows,cols),dtype=bool)
+        self._frame = np.zeros((rows,cols),dtype=int)
+        self._kind = np.empty((rows,cols),dtype=int)
+        self._kind[:] = ((np.arange(rows)//2) % len(ALIEN_SPRITES))[:,np.newaxis]
+        self._version = 0
+        self._lowest = [0]*cols
+        self._columns = list(range(cols))
+        self._bottom = 0
+        self._count = rows*cols
+
+    # METHODS TO MOVE THE FORMATION AND REMOVE ALIENS
+    def march(self,dx):
+        """
+        Moves the formation horizontally by dx and advances the animation frame.
+
+        Parameter dx: The number of pixels to move (negative is to the left)
+        Precondition: dx is an int or float
+        """
+        self._x += dx
+        self._frame ^= 1
+        self._version += 1
+
+    def drop(self,dy):
+        """
+        Moves the formation down by dy and advances the animation frame.
+
+        Parameter dy: The number of pixels to move down
+        Precondition: dy is an int or float
+        """
+        self._y -= dy
+        self._frame ^= 1
+        self._version += 1
+
+    def kill(self,row,col):
+        """
+        Marks the alien in the given cell as dead, if it is not dead already.
+
+        If it was the lowest living alien in its column, the column index moves up to
+        the next living alien, and the column is dropped from getColumns() when none
+        are left.  The bottom row is recomputed from the column index only if it
+        could have changed.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+        """
+        if not self._alive[row,col]:
+            return
+        self._alive[row,col] = False
+        self._count -= 1
+        self._version += 1
+        if self._lowest[col] == row:
+            lowest = -1
+            for above in range(row+1,self.getRows()):
+                if self._alive[above,col]:
+                    lowest = above
+                    break
+            self._lowest[col] = lowest
+            if lowest == -1:
+                self._columns.remove(col)
+            if row == self._bottom:
+                self._bottom = -1
+                for other in self._columns:
+                    if self._bottom == -1 or self._lowest[other] < self._bottom:
+                        self._bottom = self._lowest[other]
+
+    def count(self):
+        """
+        Returns: the number of living aliens.
+
+        The count is updated by kill, so this takes constant time.
+        """
+        return self._count
+
+    def extent(self):
+        """
+        Returns: a tuple (leftmost, rightmost) of the x coordinates of the living
+        aliens, or None if there are no living aliens.
+
+        The edges are the first and last entries of getColumns(), so this takes
+        constant time.
+        """
+        if self._columns == []:
+            return None
+        return (float(self._x[0,self._columns[0]]),float(self._x[0,self._columns[-1]]))
+
+    def collides(self,row,col,bolt):
+        """
+        Returns: True if the bolt was fired by the player and collides with the alien
+        in the given cell.
+
+        This is the same corner test that Ship.collides uses (a corner of the bolt is
+        inside the alien), computed from the formation arrays.
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..getCols()-1
+
+        Parameter bolt: The laser bolt to check
+        Precondition: bolt is of class Bolt
+        """
+        assert isinstance(bolt,Bolt)
+
+        if bolt.getIsPlayerBolt() and self._alive[row,col]:
+            return (abs(bolt.getX()-self._x[row,col]) < (ALIEN_WIDTH+BOLT_WIDTH)/2 and
+                    abs(bolt.getY()-self._y[row,col]) < (ALIEN_HEIGHT+BOLT_HEIGHT)/2)
+        return False
+
+
+class BoltPool(object):
+    """
+    A class to represent the laser bolts on screen as a fixed-capacity pool.
+
+    Building a Bolt is expensive, since every GRectangle creates its own drawing
+    instructions and parses its colors.  A pool never throws a Bolt away.  The bolts
+    on screen are the first len(pool) entries of _bolts; when a bolt expires it is
+    swapped with the last bolt on screen, and it is reused by the next call to fire.
+    Hence removing a bolt takes constant time, but it changes the order of the bolts.
+
+    A pool supports len, indexing (for 0 <= i < len(pool)) and iteration over the bolts
+    on screen.  Do not call release while iterating; use an index loop instead.
+
+    INSTANCE ATTRIBUTES:
+        _bolts:    every bolt built by this pool, those on screen first [list of Bolt]
+        _active:   the number of bolts on screen [0 <= int <= len(_bolts)]
+        _capacity: the maximum number of bolts on screen [int > 0]
+    """
+
+    # INITIALIZER TO CREATE AN EMPTY POOL
+    def __init__(self,capacity):
+        """
+        Initializer: Creates an empty pool that holds up to capacity bolts.
+
+        Bolts are only built when they are first needed.
+
+        Parameter capacity: The maximum number of bolts on screen
+        Precondition: capacity is an int > 0
+        """
+        self._bolts = []
+        self._active = 0
+        self._capacity = capacity
+
+    def __len__(self):
+        """
+        Returns: the number of bolts on screen.
+        """
+        return self._active
+
+    def __getitem__(self,i):
+        """
+        Returns: the bolt on screen at position i.
+
+        Parameter i: the position of the bolt
+        Precondition: i is an int in 0..len(self)-1
+        """
+        if i < 0 or i >= self._active:
+            raise IndexError('bolt index %s out of range' % repr(i))
+        return self._bolts[i]
+
+    def __iter__(self):
+        """
+        Returns: an iterator over the bolts on screen.
+        """
+        for i in range(self._active):
+            yield self._bolts[i]
+
+    # METHODS TO ADD AND REMOVE BOLTS
+    def fire(self,x,y,velocity):
+        """
+        Returns: a bolt centered at x and y with the given velocity, or None if the
+        pool is full.
+
+        The bolt is recycled if an expired one is available; otherwise a new one is
+        built.
+
+        Parameter x: The horizontal coordinate of the bolt center.
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the bolt center.
+        Precondition: y is an int or float
+
+        Parameter velocity: The velocity in the y direction
+        Precondition: velocity is an int or float
+        """
+        if self._active == self._capacity:
+            return None
+        if self._active < len(self._bolts):
+            bolt = self._bolts[self._active]
+            bolt.reset(x,y,velocity)
+        else:
+            bolt = Bolt(x=x,y=y,height=BOLT_HEIGHT,width=BOLT_WIDTH,fillcolor='yellow',
+                        linecolor='white',velocity=velocity)
+            self._bolts.append(bolt)
+        self._active += 1
+        return bolt
+
+    def release(self,i):
+        """
+        Removes the bolt at position i from the screen.
+
+        The last bolt on screen takes its place.
+
+        Parameter i: the position of the bolt
+        Precondition: i is an int in 0..len(self)-1
+        """
+        if i < 0 or i >= self._active:
+            raise IndexError('bolt index %s out of range' % repr(i))
+        last = self._active-1
+        self._bolts[i], self._bolts[last] = self._bolts[last], self._bolts[i]
+        self._active = last
@@ -0,0 +1,275 @@
+"""
+Headless simulation script for Alien Invaders
+
+This module plays waves of Alien Invaders without Kivy, a window or any sounds.  It
+selects the headless game2d backend before anything else is imported, and then steps
+Wave objects in a tight loop with a simple bot at the controls.  This is useful for
+balancing the constants in consts.py, for soak tests, and for measuring how many waves
+a machine can simulate per second.
+
+To simulate 1000 waves at a fixed 60 frames per second, type
+
+    python simulate.py --waves 1000
+
+To see where the time of one phase of Wave.update goes (see Wave.PHASES), add the
+option --profile with the name of the phase, such as
+
+    python simulate.py --waves 100 --profile collisions
+
+Every wave starts afresh unless --campaign is given, in which case each won wave is
+followed by the next one (with the same lives and score), as in the game.
+
+Every wave draws its random choices from its own generator (see Wave.getSeed), and the
+seed of each wave comes from the --seed option.  Since the waves are stepped with a
+fixed dt, the same seed always gives the same results.  If no seed is given, one is
+chosen and printed.  The option --record saves the keys the bot held down, frame by
+frame, and --replay plays them back instead of the bot, so
+
+    python simulate.py --waves 10 --record run.json
+    python simulate.py --replay run.json
+
+play the same waves twice, with the same frames and score.  The log keeps the options
+the waves were played with, including --campaign.
+
+The options are hidden from consts.py, which reads the number of rows, aliens per row
+and alien speed from the positional command line arguments, so they keep their
+default values.
+"""
+import os
+os.environ.setdefault('GAME2D_HEADLESS', '1')
+
+import sys
+# consts.py reads positional arguments from sys.argv, so hide the options from it
+ARGUMENTS = sys.argv[1:]
+del sys.argv[1:]
+
+import argparse
+import random
+import time
+from consts import *
+from game2d import *
+from wave import *
+
+# How many frames ahead the bot looks for alien bolts falling on the ship
+DODGE_FRAMES = 12
+# The extra distance (in pixels) the bot keeps between the ship and a falling bolt
+DODGE_MARGIN = 6
+
+def threat(wave, ship):
+    """
+    Returns: the x-coordinate of the nearest alien bolt falling near the ship, or None.
+
+    A bolt is near the ship if it is less than DODGE_FRAMES frames above it, and at
+    most DODGE_MARGIN pixels (horizontally) from hitting it.
+
+    Parameter wave: the wave being played
+    Precondition: wave is an instance of Wave
+
+    Parameter ship: the player ship
+    Precondition: ship is an instance of Ship
+    """
+    top = ship.getY() + SHIP_HEIGHT/2
+    bottom = ship.getY() - SHIP_HEIGHT/2
+    reach = SHIP_WIDTH/2 + BOLT_WIDTH/2 + DODGE_MARGIN
+    nearest = None
+    for bolt in wave.getBolts():
+        if bolt.getIsPlayerBolt():
+            continue
+        height = bolt.getY() - BOLT_HEIGHT/2 - top
+        if bolt.getY() + BOLT_HEIGHT/2 < bottom or height > ALIEN_BOLT_SPEED*DODGE_FRAMES:
+            continue
+        if abs(bolt.getX() - ship.getX()) < reach:
+            if nearest is None or height < nearest[0]:
+                nearest = (height,bolt.getX())
+    return None if nearest is None else nearest[1]
+
+
+def bot(wave, input):
+    """
+    Sets the keys for a simple bot that chases the lowest aliens and fires constantly.
+
+    The bot steps out of the way of alien bolts falling on the ship, and never steps
+    back towards a bolt until it has passed, so it survives long enough to win waves.
+
+    Parameter wave: the wave being played
+    Precondition: wave is an instance of Wave
+
+    Parameter input: the headless input handler
+    Precondition: input is an instance of the headless GInput
+    """
+    input.release()
+    ship = wave.getShip()
+    targets = wave.findLowestCells()
+    if ship is None or targets == []:
+        return
+    x = ship.getX()
+    row, col = targets[len(targets)//2]
+    target = wave.getFormation().getX(row,col)
+    danger = threat(wave,ship)
+    if danger is not None and abs(danger - x) <= SHIP_WIDTH/2 + BOLT_WIDTH/2:
+        # Dodge away from the bolt, unless the wall is in the way
+        left = x - SHIP_WIDTH/2 > SHIP_MOVEMENT
+        right = x + SHIP_WIDTH/2 < GAME_WIDTH - SHIP_MOVEMENT
+        input.press('right' if (danger < x and right) or not left else 'left')
+    elif target < x - SHIP_MOVEMENT and (danger is None or danger > x):
+        input.press('left')
+    elif target > x + SHIP_MOVEMENT and (danger is None or danger < x):
+        input.press('right')
+    input.press('spacebar')
+
+
+def replay(wave, input):
+    """
+    Sets the keys recorded for the next frame of a replayed game.
+
+    Parameter wave: the wave being played
+    Precondition: wave is an instance of Wave
+
+    Parameter input: the replayed input
+    Precondition: input is an instance of InputReplay
+    """
+    input.step()
+
+
+def play(wave, input, dt, frames, control=bot, log=None):
+    """
+    Returns: a tuple (result, frames) after playing a single wave to completion.
+
+    The result is 'won' if every alien was shot, 'lost' if the ship ran out of lives or
+    the aliens crossed the defense line, and 'timeout' if the wave was still running
+    after the given number of frames.  A destroyed ship is rebuilt immediately while
+    lives remain, as Invaders does after STATE_DEATH.
+
+    Parameter wave: the wave to play
+    Precondition: wave is an instance of Wave
+
+    Parameter input: the headless input handler
+    Precondition: input is an instance of the headless GInput
+
+    Parameter dt: the time in seconds of each animation frame
+    Precondition: dt is a number > 0
+
+    Parameter frames: the maximum number of frames to play
+    Precondition: frames is an int > 0
+
+    Parameter control: the function that sets the keys before each frame
+    Precondition: control is a function taking a wave and input (such as bot)
+
+    Parameter log: the log to record the keys of each frame in, if any
+    Precondition: log is None or an instance of InputLog
+    """
+    for frame in range(frames):
+        if wave.getShip() is None:
+            if wave.getLives() == 0:
+                return ('lost',frame)
+            wave.makeShip()
+        if wave.getNoAliens():
+            return ('won',frame)
+        if wave.dLineCollision():
+            return ('lost',frame)
+        control(wave,input)
+        if log is not None:
+            log.record(input)
+        wave.update(input,dt)
+    return ('timeout',frames)
+
+
+def nextWave(wave, seed):
+    """
+    Returns: a new wave that follows the given (won) wave, as in Invaders.afterFirst.
+
+    The new wave keeps the lives and score of the old one, and its aliens start at the
+    speed the old aliens had reached, slowed down again by the kills of 3/4 of a wave.
+
+    Parameter wave: the wave that was just won
+    Precondition: wave is an instance of Wave
+
+    Parameter seed: the seed of the random number generator of the new wave
+    Precondition: seed is an int
+    """
+    result = Wave(seed=seed)
+    result.setLives(wave.getLives())
+    result.setScore(wave.getScore())
+    result.setAlienSpeed(wave.getAlienSpeed()*(1/0.97)**(3*ALIEN_ROWS*ALIENS_IN_ROW/4))
+    return result
+
+
+def main():
+    """
+    Simulates the waves requested on the command line and prints a summary.
+    """
+    parser = argparse.ArgumentParser(description='Simulate Alien Invaders waves headless')
+    parser.add_argument('--waves',type=int,default=100,help='number of waves to play')
+    parser.add_argument('--fps',type=float,default=60.0,help='simulated frame rate')
+    parser.add_argument('--frames',type=int,default=60*60*10,
+                        help='maximum frames per wave')
+    parser.add_argument('--seed',type=int,default=None,help='random seed')
+    parser.add_argument('--campaign',action='store_true',
+                        help='follow each won wave with the next one, as the game does')
+    parser.add_argument('--record',default=None,metavar='FILE',
+                        help='save the keys of every frame to FILE')
+    parser.add_argument('--replay',default=None,metavar='FILE',
+                        help='play back the keys saved in FILE instead of the bot')
+    parser.add_argument('--profile',action='append',default=None,metavar='PHASE',
+                        choices=[name for name, method in Wave.PHASES],
+                        help='profile a phase of the update (repeatable)')
+    args = parser.parse_args(ARGUMENTS)
+
+    record = None if args.record is None else InputLog()
+    if args.replay is not None:
+        log = InputLog.load(args.replay)
+        args.seed     = log.meta['seed']
+        args.fps      = log.meta['fps']
+        args.waves    = log.meta['waves']
+        args.frames   = log.meta['frames']
+        args.campaign = log.meta['campaign']
+        input = log.replay()
+        control = replay
+    else:
+        input = GInput()
+        control = bot
+    if args.seed is None:
+        args.seed = random.getrandbits(32)
+    seeds = random.Random(args.seed)
+    results = {'won':0,'lost':0,'timeout':0}
+    total = 0
+    score = 0
+    profile = None if args.profile is None else CProfileHook(phases=args.profile)
+
+    start = time.perf_counter()
+    wave = None
+    for x in range(args.waves):
+        seed = seeds.getrandbits(32)
+        carried = 0
+        if args.campaign and wave is not None and wave.getNoAliens():
+            carried = wave.getScore()
+            wave = nextWave(wave,seed)
+        else:
+            wave = Wave(seed=seed)
+        if profile is not None:
+            wave.addHook(profile)
+        result, frames = play(wave,input,1.0/args.fps,args.frames,control,record)
+        results[result] += 1
+        total += frames
+        score += wave.getScore() - carried
+    elapsed = time.perf_counter() - start
+
+    if record is not None:
+        record.meta.update(seed=args.seed,fps=args.fps,waves=args.waves,frames=args.frames,
+                           campaign=args.campaign)
+        record.save(args.record)
+
+    print('seed:     %d' % args.seed)
+    print('waves:    %d (won %d, lost %d, timeout %d)' %
+            (args.waves,results['won'],results['lost'],results['timeout']))
+    print('frames:   %d (%.1f per wave)' % (total,total/max(args.waves,1)))
+    print('score:    %.1f per wave' % (score/max(args.waves,1)))
+    print('elapsed:  %.3f s (%.1f waves/s, %.0f frames/s)' %
+            (elapsed,args.waves/elapsed,total/elapsed))
+    if profile is not None:
+        print()
+        profile.stats().print_stats(15)
+
+
+if __name__ == '__main__':
+    main()
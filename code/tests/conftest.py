@@ -0,0 +1,15 @@
+"""
+Test configuration for Alien Invaders
+
+The tests run the game on the headless game2d backend, so they need no window or GL
+context.  The backend is chosen when game2d is first imported, and the game modules
+import each other by name (as they do when launched with python space_invaders), so
+this module must run before any test module is imported.  Some tests import Kivy
+modules directly, so Kivy is told to leave the pytest options alone.
+"""
+import os
+import sys
+
+os.environ['GAME2D_HEADLESS'] = '1'
+os.environ['KIVY_NO_ARGS'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
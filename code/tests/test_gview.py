@@ -0,0 +1,62 @@
+"""
+Unit tests for the drawing order of the headless GView
+
+In retained mode the canvas must always end a frame in the order the objects were
+drawn, exactly as it would in immediate mode.
+"""
+from game2d import *
+
+
+def frame(view, *objects):
+    """
+    Draws the objects to the view as a single animation frame.
+
+    Parameter view: the view to draw to
+    Precondition: view is a headless GView
+
+    Parameter objects: the objects to draw, from the bottom to the top
+    Precondition: objects are hashable
+    """
+    if not view.retained:
+        view.clear()
+    for obj in objects:
+        view.draw(obj)
+    if view.retained:
+        view.flush()
+    return list(view.contents)
+
+
+def test_immediate_mode_draws_in_order():
+    view = GView()
+    assert frame(view,'a','b','c') == ['a','b','c']
+    assert frame(view,'c','a') == ['c','a']
+
+
+def test_retained_mode_follows_draw_order():
+    view = GView()
+    view.retained = True
+    assert frame(view,'a','b','c') == ['a','b','c']
+    canvas = view.contents
+    assert frame(view,'a','b','c') == ['a','b','c']
+    assert view.contents is canvas
+    # A new object drawn between two others goes between them, not on top
+    assert frame(view,'a','d','b','c') == ['a','d','b','c']
+    # Objects that were not drawn leave the canvas
+    assert frame(view,'a','c') == ['a','c']
+    # Objects whose order changed are reordered
+    assert frame(view,'c','a') == ['c','a']
+    assert frame(view,'c','a','c') == ['c','a']
+    assert frame(view) == []
+
+
+def test_retained_mode_remove():
+    view = GView()
+    view.retained = True
+    frame(view,'a','b','c')
+    view.remove('b')
+    assert view.contents == ['a','c']
+    view.draw('a')
+    view.draw('c')
+    view.remove('c')
+    view.flush()
+    assert view.contents == ['a']
@@ -0,0 +1,200 @@
+"""
+Unit tests for the model classes of Alien Invaders
+
+The vectorized queries of AlienFormation are checked against brute-force scans over
+its cells, while aliens are shot in a random order.
+"""
+import random
+import pytest
+from consts import *
+from models import *
+
+
+def alive_cells(formation):
+    """
+    Returns: the list of (row, column) cells of the living aliens, by a full scan.
+
+    Parameter formation: the formation to scan
+    Precondition: formation is an instance of AlienFormation
+    """
+    result = []
+    for row in range(formation.getRows()):
+        for col in range(formation.getCols()):
+            if formation.isAlive(row,col):
+                result.append((row,col))
+    return result
+
+
+def brute_extent(formation):
+    """
+    Returns: the (leftmost, rightmost) x-coordinates of the living aliens, or None.
+
+    Parameter formation: the formation to scan
+    Precondition: formation is an instance of AlienFormation
+    """
+    xs = [formation.getX(row,col) for (row,col) in alive_cells(formation)]
+    return None if xs == [] else (min(xs),max(xs))
+
+
+def make_bolt(x, y, velocity=PLAYER_BOLT_SPEED):
+    """
+    Returns: a new bolt centered at (x, y) with the given velocity.
+
+    Parameter x: the x-coordinate of the center of the bolt
+    Precondition: x is a number
+
+    Parameter y: the y-coordinate of the center of the bolt
+    Precondition: y is a number
+
+    Parameter velocity: the velocity of the bolt (positive for the player)
+    Precondition: velocity is a nonzero number
+    """
+    result = Bolt(x=x,y=y,width=BOLT_WIDTH,height=BOLT_HEIGHT,fillcolor='yellow',
+                  linecolor='white',velocity=velocity)
+    result.isPlayerBolt()
+    return result
+
+
+def brute_lowest(formation, col):
+    """
+    Returns: the row of the lowest living alien in column col, or -1, by a full scan.
+
+    Parameter formation: the formation to scan
+    Precondition: formation is an instance of AlienFormation
+
+    Parameter col: the column to scan
+    Precondition: col is an int in 0..formation.getCols()-1
+    """
+    for row in range(formation.getRows()):
+        if formation.isAlive(row,col):
+            return row
+    return -1
+
+
+@pytest.mark.parametrize('rows,cols',[(1,1),(1,12),(5,12),(10,15)])
+def test_lowest_and_columns(rows, cols):
+    formation = AlienFormation(rows,cols,50,100)
+    cells = [(row,col) for row in range(rows) for col in range(cols)]
+    random.Random(rows+cols).shuffle(cells)
+    for (row,col) in cells:
+        formation.kill(row,col)
+        lowest = [brute_lowest(formation,c) for c in range(cols)]
+        assert [formation.getLowest(c) for c in range(cols)] == lowest
+        assert formation.getColumns() == [c for c in range(cols) if lowest[c] != -1]
+        rows_alive = [row for (row,col) in alive_cells(formation)]
+        assert formation.getBottomRow() == (min(rows_alive) if rows_alive else -1)
+
+
+@pytest.mark.parametrize('rows,cols',[(1,1),(1,12),(5,12),(10,15)])
+def test_kill_count_and_extent(rows, cols):
+    formation = AlienFormation(rows,cols,50,100)
+    cells = [(row,col) for row in range(rows) for col in range(cols)]
+    random.Random(rows*cols).shuffle(cells)
+    for (row,col) in cells:
+        assert formation.count() == len(alive_cells(formation))
+        assert formation.extent() == brute_extent(formation)
+        formation.kill(row,col)
+        assert not formation.isAlive(row,col)
+    assert formation.count() == 0
+    assert formation.extent() is None
+
+
+def test_kill_twice_does_not_drift():
+    formation = AlienFormation(3,4,50,100)
+    formation.kill(0,1)
+    formation.kill(0,1)
+    assert formation.count() == 11
+    assert formation.getLowest(1) == 1
+    for row in range(3):
+        formation.kill(row,2)
+        formation.kill(row,2)
+    assert formation.count() == 8
+    assert formation.getColumns() == [0,1,3]
+
+
+def test_extent_moves_when_an_edge_column_empties():
+    formation = AlienFormation(3,4,50,100)
+    for row in range(2):
+        formation.kill(row,0)
+        formation.kill(row,3)
+    assert formation.extent() == (50,50+3*ALIEN_H_PITCH)
+    formation.kill(2,0)
+    assert formation.extent() == (50+ALIEN_H_PITCH,50+3*ALIEN_H_PITCH)
+    formation.kill(2,3)
+    formation.march(ALIEN_H_WALK)
+    assert formation.extent() == (50+ALIEN_H_PITCH+ALIEN_H_WALK,50+2*ALIEN_H_PITCH+ALIEN_H_WALK)
+
+
+def test_march_and_drop_keep_the_grid():
+    formation = AlienFormation(3,4,50,100)
+    formation.kill(0,0)
+    formation.march(ALIEN_H_WALK)
+    formation.drop(ALIEN_V_WALK)
+    formation.march(-3*ALIEN_H_WALK)
+    for row in range(3):
+        for col in range(4):
+            assert formation.getX(row,col) == 50+col*ALIEN_H_PITCH-2*ALIEN_H_WALK
+            assert formation.getY(row,col) == 100+row*ALIEN_V_PITCH-ALIEN_V_WALK
+
+
+def test_collides_matches_corner_test():
+    formation = AlienFormation(2,2,100,100)
+    formation.kill(1,1)
+    rng = random.Random(5)
+    for trial in range(4000):
+        bolt = make_bolt(rng.uniform(40,220),rng.uniform(40,220))
+        for (row,col) in [(0,0),(0,1),(1,0),(1,1)]:
+            x = formation.getX(row,col)
+            y = formation.getY(row,col)
+            expected = formation.isAlive(row,col) and any(
+                abs(bolt.getX()+dx-x) < ALIEN_WIDTH/2 and abs(bolt.getY()+dy-y) < ALIEN_HEIGHT/2
+                for dx in (-BOLT_WIDTH/2,BOLT_WIDTH/2) for dy in (-BOLT_HEIGHT/2,BOLT_HEIGHT/2))
+            assert bool(formation.collides(row,col,bolt)) == expected
+
+
+def test_collides_ignores_alien_bolts():
+    formation = AlienFormation(1,1,100,100)
+    assert not formation.collides(0,0,make_bolt(100,100,-ALIEN_BOLT_SPEED))
+
+
+def test_bolt_pool_swap_remove():
+    pool = BoltPool(4)
+    bolts = [pool.fire(10*i,20,PLAYER_BOLT_SPEED) for i in range(4)]
+    assert pool.fire(50,20,PLAYER_BOLT_SPEED) is None
+    assert len(pool) == 4
+    pool.release(1)
+    assert list(pool) == [bolts[0],bolts[3],bolts[2]]
+    pool.release(2)
+    assert list(pool) == [bolts[0],bolts[3]]
+    with pytest.raises(IndexError):
+        pool[2]
+
+
+def test_bolt_pool_reuses_expired_bolts():
+    pool = BoltPool(3)
+    first = pool.fire(10,20,PLAYER_BOLT_SPEED)
+    second = pool.fire(30,40,-ALIEN_BOLT_SPEED)
+    pool.release(0)
+    again = pool.fire(50,60,-ALIEN_BOLT_SPEED)
+    assert again is first
+    assert list(pool) == [second,first]
+    assert (again.getX(),again.getY(),again.getVelocity()) == (50,60,-ALIEN_BOLT_SPEED)
+    again.isPlayerBolt()
+    assert not again.getIsPlayerBolt()
+
+
+def test_bolt_pool_release_in_index_loop():
+    # Releasing while walking the pool by index must visit every bolt exactly once
+    pool = BoltPool(8)
+    for i in range(8):
+        pool.fire(i,0,PLAYER_BOLT_SPEED)
+    seen = []
+    i = 0
+    while i < len(pool):
+        seen.append(pool[i].getX())
+        if pool[i].getX() % 2 == 0:
+            pool.release(i)
+        else:
+            i += 1
+    assert sorted(seen) == list(range(8))
+    assert sorted(bolt.getX() for bolt in pool) == [1,3,5,7]
@@ -0,0 +1,124 @@
+"""
+Unit tests for recording and replaying the input of a wave with InputLog
+
+A wave updated with a fixed dt is determined by its seed and the keys held down at
+each update, so a recorded game played back on a wave with the same seed must give
+the same wave, frame by frame.
+"""
+import pytest
+from consts import *
+from game2d import *
+from wave import *
+
+# The seed of the waves played in these tests
+SEED = 1234
+# The number of updates played in each test
+FRAMES = 1200
+
+
+def script(input, frame):
+    """
+    Sets the keys of a scripted player for the given frame.
+
+    The player sweeps left and right across the screen, firing most of the time.
+
+    Parameter input: the headless input handler
+    Precondition: input is an instance of the headless GInput
+
+    Parameter frame: the number of the update about to be played
+    Precondition: frame is an int >= 0
+    """
+    input.release()
+    input.press('left' if (frame // 90) % 2 else 'right')
+    if frame % 7:
+        input.press('spacebar')
+
+
+def state(wave):
+    """
+    Returns: a tuple with everything about wave that the input can change.
+
+    Parameter wave: the wave to describe
+    Precondition: wave is an instance of Wave
+    """
+    ship = wave.getShip()
+    bolts = tuple((bolt.getX(),bolt.getY()) for bolt in wave.getBolts())
+    return (wave.getScore(),wave.getLives(),len(wave.findLowestCells()),
+            None if ship is None else ship.getX(),bolts)
+
+
+def play(wave, input, control, log=None):
+    """
+    Returns: the list of the states of wave after each of FRAMES updates.
+
+    A destroyed ship is rebuilt immediately while lives remain, as Invaders does.
+
+    Parameter wave: the wave to play
+    Precondition: wave is an instance of Wave
+
+    Parameter input: the input the wave reads
+    Precondition: input is a headless GInput or an InputReplay
+
+    Parameter control: the function that sets the keys before each update
+    Precondition: control is a function taking input and the frame number
+
+    Parameter log: the log to record the keys of each update in, if any
+    Precondition: log is None or an instance of InputLog
+    """
+    result = []
+    for frame in range(FRAMES):
+        if wave.getShip() is None and wave.getLives() > 0:
+            wave.makeShip()
+        control(input,frame)
+        if log is not None:
+            log.record(input)
+        wave.update(input,GAME_STEP)
+        result.append(state(wave))
+    return result
+
+
+def test_replay_matches_record(tmp_path):
+    path = str(tmp_path / 'run.json')
+    log = InputLog({'seed':SEED})
+    played = play(Wave(seed=SEED),GInput(),script,log)
+    assert len(log) == FRAMES
+    log.save(path)
+
+    loaded = InputLog.load(path)
+    assert loaded == log
+    assert loaded.meta == {'seed':SEED}
+
+    again = InputLog()
+    replay = loaded.replay()
+    replayed = play(Wave(seed=loaded.meta['seed']),replay,
+                    lambda input, frame: input.step(),again)
+    assert replay.done
+    assert again == log
+    assert replayed == played
+    assert played[-1][0] > 0
+
+
+def test_replay_releases_keys_when_done():
+    input = GInput()
+    log = InputLog()
+    for frame in range(3):
+        script(input,frame)
+        log.record(input)
+    replay = log.replay()
+    for frame in range(3):
+        replay.step()
+        assert replay.is_key_down('right')
+    assert replay.done
+    replay.step()
+    assert replay.keys == ()
+
+
+def test_log_stores_only_changes():
+    input = GInput()
+    log = InputLog()
+    for frame in range(180):
+        script(input,frame)
+        log.record(input)
+    assert len(log) == 180
+    assert len(log.changes) < 180
+    assert log.changes[:2] == [(0,('right',)),(1,('right','spacebar'))]
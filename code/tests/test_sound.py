@@ -0,0 +1,106 @@
+"""
+Unit tests for the voice cap of the Kivy VoicePool and SoundBank
+
+The sounds are plain objects with the interface of Sound, so nothing is read from
+disk and nothing is played.
+"""
+import pytest
+import game2d.sound
+from game2d.sound import VoicePool, SoundBank
+
+
+class FakeSound(object):
+    """
+    A silent sound that stays playing until it is stopped.
+
+    INSTANCE ATTRIBUTES:
+        source:  the file name of the sound [str]
+        playing: whether the sound is playing [bool]
+        volume:  the volume of the sound [float in 0..1]
+        plays:   the number of times the sound was started [int >= 0]
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.playing = False
+        self.volume = 1
+        self.plays = 0
+
+    def play(self, loop=False):
+        self.playing = True
+        self.plays += 1
+
+    def stop(self):
+        self.playing = False
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """
+    Replaces the sound loading of GameApp with fake sounds, and returns the sounds.
+    """
+    sounds = {}
+    def load_sound(name):
+        if not name in sounds:
+            sounds[name] = FakeSound(name)
+        return sounds[name]
+    def load_voices(name, count):
+        return [FakeSound(name) for x in range(count)]
+    monkeypatch.setattr(game2d.sound.GameApp,'load_sound',staticmethod(load_sound))
+    monkeypatch.setattr(game2d.sound.GameApp,'load_voices',staticmethod(load_voices))
+    return sounds
+
+
+def test_voices_rotate_and_restart(loader):
+    pool = VoicePool(limit=8)
+    pool.add('pew','pew2.wav',2)
+    for x in range(3):
+        pool.play('pew')
+    assert pool.voices == 2
+    assert pool.playing == 2
+
+
+def test_limit_stops_the_oldest_voice(loader):
+    pool = VoicePool(limit=3)
+    pool.add('a','a.wav',4)
+    pool.add('b','b.wav',4)
+    for key in ['a','a','b','b','b']:
+        pool.play(key)
+        assert pool.playing <= 3
+    assert pool.playing == 3
+
+
+def test_limit_counts_other_sounds(loader):
+    pool = VoicePool(limit=2)
+    pool.add('pew','pew2.wav',4)
+    note = FakeSound('note.wav')
+    pool.start(note)
+    pool.play('pew')
+    pool.play('pew')
+    assert not note.playing
+    assert pool.playing == 2
+    pool.start(note)
+    assert note.playing
+    assert pool.playing == 2
+
+
+def test_bank_caps_every_sound(loader):
+    bank = SoundBank()
+    bank.voices.limit = 3
+    bank.voices.add('alienPew','pew2.wav',4)
+    for name in ['shipPew','pop','note']:
+        bank[name] = name+'.wav'
+    for key in ['note','shipPew','pop','alienPew','alienPew','alienPew','alienPew']:
+        bank.play(key)
+        assert bank.voices.playing <= 3
+    assert bank.voices.playing == 3
+    assert sum(sound.playing for sound in loader.values()) == 0
+    assert sum(sound.plays for sound in loader.values()) == 3
+
+
+def test_muted_bank_plays_nothing(loader):
+    bank = SoundBank()
+    bank['note'] = 'note.wav'
+    bank.muted = True
+    bank.play('note')
+    assert loader['note.wav'].plays == 0
@@ -0,0 +1,138 @@
+"""
+Unit tests for the alien queries and collision detection in Wave
+
+Every optimized lookup is checked against a brute-force scan of the formation that
+uses the corner test of the original Alien.collides: a player bolt hits an alien if
+one of the corners of the bolt lies strictly inside the alien.
+"""
+import random
+import pytest
+from consts import *
+from models import *
+from wave import *
+
+
+def corner_hit(x, y, bolt):
+    """
+    Returns: True if a corner of bolt is strictly inside the alien centered at (x, y).
+
+    Parameter x: the x-coordinate of the center of the alien
+    Precondition: x is a number
+
+    Parameter y: the y-coordinate of the center of the alien
+    Precondition: y is a number
+
+    Parameter bolt: the laser bolt to check
+    Precondition: bolt is of class Bolt
+    """
+    for dx in (-BOLT_WIDTH/2, BOLT_WIDTH/2):
+        for dy in (-BOLT_HEIGHT/2, BOLT_HEIGHT/2):
+            if (abs(bolt.getX()+dx-x) < ALIEN_WIDTH/2 and
+                abs(bolt.getY()+dy-y) < ALIEN_HEIGHT/2):
+                return True
+    return False
+
+
+def brute_force(wave, bolt):
+    """
+    Returns: the (row, column) of the alive alien hit by bolt, or None, by a full scan.
+
+    Parameter wave: the wave to search
+    Precondition: wave is an instance of Wave
+
+    Parameter bolt: the laser bolt to check
+    Precondition: bolt is of class Bolt
+    """
+    formation = wave.getFormation()
+    for row in range(ALIEN_ROWS):
+        for col in range(ALIENS_IN_ROW):
+            if (formation.isAlive(row,col) and
+                corner_hit(formation.getX(row,col),formation.getY(row,col),bolt)):
+                return (row,col)
+    return None
+
+
+def make_bolt(x, y):
+    """
+    Returns: a new player bolt centered at (x, y).
+
+    Parameter x: the x-coordinate of the center of the bolt
+    Precondition: x is a number
+
+    Parameter y: the y-coordinate of the center of the bolt
+    Precondition: y is a number
+    """
+    result = Bolt(x=x,y=y,width=BOLT_WIDTH,height=BOLT_HEIGHT,fillcolor='yellow',
+                  linecolor='white',velocity=PLAYER_BOLT_SPEED)
+    result.isPlayerBolt()
+    return result
+
+
+@pytest.fixture
+def wave():
+    """
+    Returns: a new wave with a fixed random seed, half of its aliens shot and its
+    formation moved away from the starting position.
+    """
+    random.seed(7)
+    result = Wave()
+    formation = result.getFormation()
+    for row in range(ALIEN_ROWS):
+        for col in range(ALIENS_IN_ROW):
+            if random.random() < 0.5:
+                formation.kill(row,col)
+    for step in range(37):
+        result.moveAliensH()
+    return result
+
+
+def test_find_lowest_cells(wave):
+    formation = wave.getFormation()
+    expected = []
+    for col in range(ALIENS_IN_ROW):
+        rows = [row for row in range(ALIEN_ROWS) if formation.isAlive(row,col)]
+        if rows != []:
+            expected.append((rows[0],col))
+    assert wave.findLowestCells() == expected
+
+
+def test_find_alien_cell_matches_corner_test(wave):
+    rng = random.Random(11)
+    hits = 0
+    for trial in range(5000):
+        bolt = make_bolt(rng.uniform(0,GAME_WIDTH),rng.uniform(0,GAME_HEIGHT))
+        expected = brute_force(wave,bolt)
+        assert wave.findAlienCell(bolt) == expected
+        hits += expected is not None
+    assert hits > 0
+
+
+def test_find_alien_cell_on_cell_edges(wave):
+    # Bolts whose corners land exactly on (or just past) the edges of every cell
+    formation = wave.getFormation()
+    for row in range(ALIEN_ROWS):
+        for col in range(ALIENS_IN_ROW):
+            if not formation.isAlive(row,col):
+                continue
+            x = formation.getX(row,col)
+            y = formation.getY(row,col)
+            for dx in (-ALIEN_WIDTH/2-BOLT_WIDTH/2, -ALIEN_WIDTH/2, 0, ALIEN_WIDTH/2,
+                       ALIEN_WIDTH/2+BOLT_WIDTH/2):
+                for dy in (-ALIEN_HEIGHT/2-BOLT_HEIGHT/2, 0, ALIEN_HEIGHT/2+BOLT_HEIGHT/2):
+                    bolt = make_bolt(x+dx,y+dy)
+                    assert wave.findAlienCell(bolt) == brute_force(wave,bolt)
+
+
+def test_alien_collision_shoots_one_alien(wave):
+    formation = wave.getFormation()
+    row, col = wave.findLowestCells()[0]
+    bolt = wave.getBolts().fire(formation.getX(row,col),formation.getY(row,col),
+                                PLAYER_BOLT_SPEED)
+    bolt.isPlayerBolt()
+    score = wave.getScore()
+    alive = formation.count()
+    wave.alienCollision()
+    assert not formation.isAlive(row,col)
+    assert formation.count() == alive - 1
+    assert wave.getScore() == score + 100
+    assert [b for b in wave.getBolts() if b.getIsPlayerBolt()] == []
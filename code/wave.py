@@ -44,8 +44,7 @@ class Wave(object):
     #UPDATE ME LATER
     INSTANCE ATTRIBUTES:
         _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave [rectangular 2d list of Alien or None]
-        _bolts:  the laser bolts currently on screen [list of Bolt, possibly empty]
+        _bolts:  the laser bolts currently on screen [BoltPool, possibly empty]
         _dline:  the defensive line being protected [GPath]
         _lives:  the number of lives left  [int >= 0]
         _time:   The amount of time since the last Alien "step" [number >= 0]
@@ -61,6 +60,8 @@ class Wave(object):
     and number of lives. If you make changes, please list the changes with the invariants.
 
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+        _seed:          the seed of _random [int]
+        _random:        the source of every random choice in the wave [random.Random]
         _bground:       the background of the game [GRectangle]
         _direction:     the direction of the aliens [either 'right' or 'left']
         _alienStep:     the x-value change of the aliens since the last "step" [number >= 0]
@@ -70,16 +71,23 @@ class Wave(object):
         _alienBoltTime: the amount of time since the last alien bolt "step" [num >= 0]
         _alienSpeed:    the number of seconds between alien steps [0 < float <= 1]
         _alienFrCount:  the number of frames passed [int >= 0]
-
-        _shipPew:       the sound made when the ship shoots [Sound]
-        _alienPew:      the sound made when an alien shoots [Sound]
-        _shipBlast:     the sound made when the ship is shot [Sound]
-        _alienPop:      the sound made when an alien is shot [Sound]
-        _musicNote:     the current note being played [Sound]
-        _musicSounds:   the list of notes [list of Sounds]
+        _formation:     the positions, frames and alive flags of the aliens
+                        [AlienFormation with rows x cols aliens]
+        _batches:       the living aliens to draw, one batch for each image in
+                        ALIEN_SPRITES [list of GSpriteBatch]
+        _batchVersion:  the formation version last copied into _batches [int >= -1]
+        _blended:       whether the last draw blended the ship and bolts between two
+                        updates [bool]
+
+        _sounds:        the shared sound bank, with the keys 'shipPew', 'shipBlast',
+                        'alienPop' and the keys in _musicSounds, and 'alienPew' in
+                        its voice pool [SoundBank]
+        _musicNote:     the key of the current note being played [str]
+        _musicSounds:   the keys of the notes [list of str]
         _musicNotePos:  the position of the note in the list [0 =< 0 int <= 3]
         _mute:          whether the sound is muted or not [bool, True or False]
         _muteIcon:      the icon on the screen that displays mute on/off [GImage]
+        _soundIcons:    the icons for sound on and sound off [tuple of two GImages]
 
         _lastkeys:      if the input key in the previous animation frame was held down [bool]
 
@@ -89,10 +97,31 @@ class Wave(object):
         _scoreValue:    the score value, increases by 100 as an alien is killed [int]
         _scoreWord:     the display of the word "score" [GLabel]
         _score:         the display of scoreValue [GLabel]
-
-        _lifeIcons      the display of life counter [a list of GImages]
+        _scoreShown:    the score value currently rendered in _score [int]
+
+        _lifeIcons      the display of life counter [a list of GImages, one per life,
+                        kept in step with _lives by updateLives]
+
+        _hooks:         the hooks observing the phases of update, in the order they
+                        were added [list of PhaseHook]
+        _statsHook:     the hook recording the phase times in the frame statistics,
+                        or None [StatsHook, also in _hooks, or None]
+        _stages:        for each phase in PHASES, its name, its method and the hooks
+                        watching it [list of (str, function, tuple of PhaseHook)]
+        _hooked:        whether there are any hooks [bool]
+
+        _watchdog:      the frame watchdog whose level decides which of the steps in
+                        DEGRADE_STEPS are skipped, or None [FrameWatchdog or None]
+        _quality:       the watchdog level last applied [int >= 0]
+        _degraded:      the degradation steps that are on [tuple of str]
+        _hudTime:       the time since the hud was last brought up to date, while
+                        it is throttled [num >= 0]
 
     """
+    # The phases of update, in the order they run, as (name, method name) pairs
+    PHASES = (('ship','updateShip'),('bolts','updateBolts'),('aliens','updateAliens'),
+              ('collisions','updateCollisions'),('hud','updateHud'),
+              ('audio','updateAudio'))
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getShip(self):
@@ -101,11 +130,17 @@ class Wave(object):
         """
         return self._ship
 
-    def getAliens(self):
+    def getBolts(self):
+        """
+        Returns: the pool of laser bolts on screen.
+        """
+        return self._bolts
+
+    def getFormation(self):
         """
-        Returns: the 2d list of aliens in the wave.
+        Returns: the AlienFormation holding the state of the aliens.
         """
-        return self._aliens
+        return self._formation
 
     def getLives(self):
         """
@@ -119,12 +154,24 @@ class Wave(object):
         """
         return self._noAliens
 
+    def getAliveCount(self):
+        """
+        Returns: the number of aliens still alive in the wave.
+        """
+        return self._formation.count()
+
     def getScore(self):
         """
         Returns: the value of the score.
         """
         return self._scoreValue
 
+    def getSeed(self):
+        """
+        Returns: the seed of the random number generator of the wave.
+        """
+        return self._seed
+
     def getAlienSpeed(self):
         """
         Returns: the number of seconds between alien steps.
@@ -158,18 +205,64 @@ class Wave(object):
         """
         self._alienSpeed = speed
 
+    def setStats(self,stats):
+        """
+        Sets the frame statistics that update records the time of its phases in.
+
+        The statistics are recorded by a StatsHook, which replaces the hook for any
+        previous statistics.
+
+        Parameter stats: the statistics of the game, or None to record nothing
+        Precondition: stats is None or an instance of FrameStats
+        """
+        if self._statsHook is not None:
+            self.removeHook(self._statsHook)
+            self._statsHook = None
+        if stats is not None:
+            self._statsHook = StatsHook(stats)
+            self.addHook(self._statsHook)
+
+    def setWatchdog(self,watchdog):
+        """
+        Sets the frame watchdog whose level decides what work update may skip.
+
+        Parameter watchdog: the watchdog of the game, or None to never skip work
+        Precondition: watchdog is None or an instance of FrameWatchdog
+        """
+        self._watchdog = watchdog
+        self.applyQuality()
+
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self,rows=ALIEN_ROWS,cols=ALIENS_IN_ROW,seed=None):
         """
         Initializes the wave subcontroller.
+
+        Every random choice of the wave (when and from where the aliens shoot, and
+        which sounds it uses) comes from its own random number generator, started
+        from seed. Hence two waves with the same seed, updated with the same dt and
+        the same keys held down, play exactly the same. If seed is None, a seed is
+        drawn from the random module, and getSeed tells what it was.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0 (the game itself uses 1..10)
+
+        Parameter cols: the number of aliens per row
+        Precondition: cols is an int > 0 (the game itself uses 1..15)
+
+        Parameter seed: the seed of the random number generator of the wave
+        Precondition: seed is None or an int
         """
+        # RANDOM NUMBER GENERATOR
+        self._seed = random.getrandbits(32) if seed is None else seed
+        self._random = random.Random(self._seed)
+
         # DRAW RELATED ATTRIBUTES
         self.makeBground()
-        self.makeWave()
+        self.makeWave(rows,cols)
         self.makeShip()
         self.makeLine()
         self.makeMuteIcon()
-        self._bolts = []
+        self._bolts = BoltPool(BOLT_CAPACITY)
 
         # TIME RELATED ATTRIBUTES (ANIMATIONS, BOLT CREATION, ETC.)
         self.timeInit()
@@ -188,60 +281,70 @@ class Wave(object):
         self._scoreValue = 0
         self.makeScoreAndScoreWord()
 
+        # UPDATE PHASES AND THEIR HOOKS
+        self._hooks = []
+        self._statsHook = None
+        self.buildStages()
+
+        # QUALITY
+        self._watchdog = None
+        self._hudTime = 0
+        self.applyQuality()
+
     # HELPER METHODS FOR INIT (ALIENS, SHIP, GRAPHICS, SOUNDS)
-    def makeWave(self):
+    def makeWave(self,rows,cols):
         """
         Initializes the wave of aliens.
 
-        Creates a 2D list of Alien objects for the current wave.
-        """
-        self._aliens = []
-        for k in range(ALIEN_ROWS):
-            self._aliens.append([])
-            for j in range(ALIENS_IN_ROW):
-                self._aliens[k].append(Alien(x=(j+1)*ALIEN_H_SEP+(2*j+1)*0.5*ALIEN_WIDTH,
-                                            y=(GAME_HEIGHT-ALIEN_CEILING-(ALIEN_ROWS-1)*
-                                            ALIEN_V_SEP-(2*ALIEN_HEIGHT*ALIEN_ROWS-1)/2)
-                                            +k*ALIEN_V_SEP+(2*k+1)*0.5*ALIEN_HEIGHT,
-                                            width=ALIEN_WIDTH,
-                                            height=ALIEN_HEIGHT,
-                                            source=ALIEN_SPRITES[(math.ceil((k+1)/2-1))%3],
-                                            format=(3,2)))
+        Creates the AlienFormation for the current wave and one sprite batch for each
+        alien image to draw the formation.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens per row
+        Precondition: cols is an int > 0
+        """
+        self._formation = AlienFormation(rows,cols,
+                                x=ALIEN_H_SEP+0.5*ALIEN_WIDTH,
+                                y=(GAME_HEIGHT-ALIEN_CEILING-(rows-1)*ALIEN_V_SEP-
+                                (2*ALIEN_HEIGHT*rows-1)/2)+0.5*ALIEN_HEIGHT)
+        self._batches = []
+        for source in ALIEN_SPRITES:
+            self._batches.append(GSpriteBatch(source=source,format=(3,2),
+                                              width=ALIEN_WIDTH,height=ALIEN_HEIGHT))
+        self._batchVersion = -1
+        self._blended = False
 
     def makeAlienBolt(self):
         """
         Initializes the Alien bolts.
 
-        Creates Bolt objects shot by random aliens in the lowest
-        vertical positions at random times and adds them to self._bolts (the list
-        of all bolts in the current frame).
-        """
-        min_aliens = self.findLowestAliens()
-        if min_aliens != []:
-            alien = random.choice(min_aliens)
-            self._bolts.append(Bolt(x=alien.getX(),y=alien.getY(),
-                                 height=BOLT_HEIGHT,width=BOLT_WIDTH,fillcolor='yellow',
-                                 linecolor='white',velocity=-ALIEN_BOLT_SPEED))
-            if self._alienPew != None:
-                self._alienPew.play()
-        self._randBoltRate = random.randint(1,BOLT_RATE)
+        Creates Bolt objects shot by random aliens in the lowest vertical positions
+        (read from the formation's per-column index) at random times and adds them
+        to self._bolts (the pool of all bolts in the current frame).
+        """
+        columns = self._formation.getColumns()
+        if columns != []:
+            col = self._random.choice(columns)
+            row = self._formation.getLowest(col)
+            bolt = self._bolts.fire(self._formation.getX(row,col),
+                                    self._formation.getY(row,col),-ALIEN_BOLT_SPEED)
+            if bolt is not None:
+                self._sounds.play('alienPew')
+        self._randBoltRate = self._random.randint(1,BOLT_RATE)
         self._alienBoltTime = 0
 
-    def findLowestAliens(self):
+    def findLowestCells(self):
         """
-        Returns a list of the Alien objects (not NoneType) at the lowest vertical
-        positions in each column of _aliens.
+        Returns a list of the (row, column) cells of the living aliens at the lowest
+        vertical positions in each column of _formation.
+
+        The cells are read from the per-column index kept by the formation, so this
+        does not scan the grid.  Wave itself reads that index directly.
         """
-        temp_column = []
-        min_aliens = []
-        for i in range(ALIENS_IN_ROW):
-            for j in range(ALIEN_ROWS):
-                if self._aliens[j][i] != None:
-                    temp_column.append(self._aliens[j][i])
-            if temp_column != []:
-                min_aliens.append(temp_column[0])
-                temp_column = []
-        return min_aliens
+        return [(self._formation.getLowest(col),col)
+                for col in self._formation.getColumns()]
 
     def makeShip(self):
         """
@@ -255,9 +358,9 @@ class Wave(object):
         Initializes the player's bolts.
 
         Creates Bolt objects shot by the player by pressing 'spacebar'
-        and adds them to self._bolts (the list of all bolts in the current frame).
+        and adds them to self._bolts (the pool of all bolts in the current frame).
 
-        Plays a sound when the bolt is shot and created.
+        Plays a sound when the bolt is shot and created (not when the pool is full).
 
         Parameter input:    the user input used to make a player bolt
         Precondition:       it is an instance of GInput; inherited from GameApp
@@ -268,11 +371,10 @@ class Wave(object):
                 if bolt.getIsPlayerBolt():
                     num_player_bolts += 1
             if num_player_bolts == 0 and self._ship != None:
-                self._bolts.append(Bolt(x=self._ship.getX(),y=self._ship.getY(),
-                                    height=BOLT_HEIGHT,width=BOLT_WIDTH,fillcolor='yellow',
-                                    linecolor='white',velocity=PLAYER_BOLT_SPEED))
-                if self._shipPew != None:
-                    self._shipPew.play()
+                bolt = self._bolts.fire(self._ship.getX(),self._ship.getY(),
+                                        PLAYER_BOLT_SPEED)
+                if bolt is not None:
+                    self._sounds.play('shipPew')
 
 
     def makeLine(self):
@@ -286,31 +388,38 @@ class Wave(object):
         """
         Initializes the mute icon.
         """
-        self._muteIcon = GImage(x=GAME_WIDTH - 40,y=GAME_HEIGHT - 40,width=40,
-                                height=40,source='soundOn.png')
+        self._soundIcons = (GImage(x=GAME_WIDTH - 40,y=GAME_HEIGHT - 40,width=40,
+                                   height=40,source='soundOn.png'),
+                            GImage(x=GAME_WIDTH - 40,y=GAME_HEIGHT - 40,width=40,
+                                   height=40,source='soundOff.png'))
+        self._muteIcon = self._soundIcons[0]
 
     def makeScoreAndScoreWord(self):
         """
         Initializes the score label and the score.
+
+        Both labels are drawn from the glyph atlas for Arcade.ttf, so a new score
+        does not rasterize a new texture.
         """
         self._scoreWord = GLabel(text="Score: ",font_name='Arcade.ttf',
                 font_size=50,halign='center',valign='middle',linecolor='yellow',
-                x=100,y=GAME_HEIGHT-50)
+                x=100,y=GAME_HEIGHT-50,glyphs=True)
+        self._scoreShown = self._scoreValue
         self._score = GLabel(text=str(self._scoreValue),
                             font_name='Arcade.ttf',
                             font_size=50,halign='left',valign='middle',
                             linecolor='white',
-                            x=250,y=GAME_HEIGHT-50)
+                            x=250,y=GAME_HEIGHT-50,glyphs=True)
 
     def makeLives(self):
         """
         Initializes the life icons.
+
+        The icons are kept for the whole wave; updateLives adds or removes icons
+        when the number of lives changes.
         """
         self._lifeIcons = []
-        for x in range(self._lives):
-            self._lifeIcons.append(GImage(x=GAME_WIDTH - 100 - 40*x,
-                                            y=GAME_HEIGHT-40,width=35,
-                                            height=35,source='ship.png'))
+        self.updateLives()
 
     def makeBground(self):
         """
@@ -324,7 +433,7 @@ class Wave(object):
         Initializes the time-related attributes.
         """
         self._time = 0
-        self._randBoltRate = random.randint(1,BOLT_RATE)
+        self._randBoltRate = self._random.randint(1,BOLT_RATE)
         self._bgTime = 0
         self._alienBoltTime = 0
         self._direction = 'right'
@@ -334,40 +443,108 @@ class Wave(object):
     def soundInit(self):
         """
         Initializes the sound-related attributes.
-        """
-        self._shipPew = Sound('pew1.wav')
-        self._alienPew = Sound('pew2.wav')
-        self._shipBlast = Sound(random.choice(['blast1.wav','blast2.wav','blast3.wav']))
-        self._alienPop = Sound(random.choice(['pop1.wav','pop2.wav']))
-        self._musicSounds = [Sound('musicNote1.wav'),Sound('musicNote2.wav'),
-                                Sound('musicNote1.wav'),Sound('musicNote3.wav')]
+
+        The sounds live in the shared SoundBank, so each file is only read from disk
+        once (or never, if the welcome screen preloaded them).  Alien bolts can come
+        faster than the laser sound plays, so it has ALIEN_PEW_VOICES voices in the
+        bank's voice pool, which the welcome screen preloads too.  A new wave
+        starts with the sound on.
+        """
+        self._sounds = SoundBank.shared()
+        self._sounds.voices.limit = SOUND_VOICES
+        self._sounds.voices.add('alienPew','pew2.wav',ALIEN_PEW_VOICES)
+        self._sounds['shipPew'] = 'pew1.wav'
+        self._sounds['shipBlast'] = self._random.choice(['blast1.wav','blast2.wav',
+                                                         'blast3.wav'])
+        self._sounds['alienPop'] = self._random.choice(['pop1.wav','pop2.wav'])
+        for note in ['musicNote1','musicNote2','musicNote3']:
+            self._sounds[note] = note+'.wav'
+        self._musicSounds = ['musicNote1','musicNote2','musicNote1','musicNote3']
         self._musicNotePos = 0
         self._musicNote = self._musicSounds[self._musicNotePos]
 
         self._mute = False
+        self._sounds.muted = False
+        self._lastkeys = False
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
     def update(self,input,dt):
         """
         Animates a single animation frame in the wave.
 
+        If the watchdog has changed its level, the new level is applied first.
+
+        The update runs the phases in PHASES in order. If there are no hooks, the
+        phases are simply called one after the other. Otherwise each hook watching
+        a phase is told when it begins and ends (see addHook).
+
         Parameter input:    the user input used to make a player bolt
         Precondition:       it is an instance of GInput; inherited from GameApp
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        if self._watchdog is not None and self._watchdog.level != self._quality:
+            self.applyQuality()
+        if self._hooked:
+            for name, phase, hooks in self._stages:
+                for hook in hooks:
+                    hook.enter(name)
+                phase(self,input,dt)
+                for hook in reversed(hooks):
+                    hook.leave(name)
+        else:
+            for name, phase, hooks in self._stages:
+                phase(self,input,dt)
+
+    # UPDATE PHASES, IN THE ORDER OF PHASES
+    def updateShip(self,input,dt):
+        """
+        Moves the ship and fires a player bolt if the player asks for one.
+
+        The positions of the ship and the bolts are recorded first, for drawing
+        between updates.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self.rememberPositions()
         if self._ship != None:
             self._ship.moveShip(input)
             self.makeShipBolt(input)
+
+    def updateBolts(self,input,dt):
+        """
+        Moves the bolts, removing those that leave the screen.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
         self.moveShipBolts()
         self.moveAlienBolts()
         self.isEachPlayerBolt()
+
+    def updateAliens(self,input,dt):
+        """
+        Steps the aliens (with a music note), fires an alien bolt and animates the
+        background when each is due, and otherwise advances their timers.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
         if self._time >= self._alienSpeed:
             self.moveAliensH()
-            if self._musicSounds != None:
-                self._musicNote.play()
-                self._musicNotePos = (self._musicNotePos + 1)%4
+            self._sounds.play(self._musicNote)
+            self._musicNotePos = (self._musicNotePos + 1)%4
         if self._alienBoltTime >= self._randBoltRate * self._alienSpeed:
             self.makeAlienBolt()
         if self._bgTime >= BACKGROUND_SPEED:
@@ -376,42 +553,135 @@ class Wave(object):
             self._time = self._time + dt
             self._bgTime = self._bgTime + dt
             self._alienBoltTime += dt
+
+    def updateCollisions(self,input,dt):
+        """
+        Resolves the collisions of the bolts with the aliens and the ship, and
+        checks whether the aliens are all dead.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
         self.alienCollision()
         self.dLineCollision()
         self.shipCollision()
         self.noAliens()
-        self.makeLives()
+
+    def updateHud(self,input,dt):
+        """
+        Brings the life icons and the score label up to date.
+
+        If the 'hud' step is degraded, this is only done every HUD_INTERVAL seconds.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if 'hud' in self._degraded:
+            self._hudTime += dt
+            if self._hudTime < HUD_INTERVAL:
+                return
+            self._hudTime = 0
+        self.updateLives()
+        self.updateScore()
+
+    def updateAudio(self,input,dt):
+        """
+        Mutes or unmutes the sound if the player presses 'm', and moves on to the
+        next music note.
+
+        Parameter input: the user input
+        Precondition: it is an instance of GInput; inherited from GameApp
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
         self.mute(input)
         self.unmute(input)
-        self.updateScore()
         self.updateMusicNote()
 
+    # HELPER METHOD FOR QUALITY
+    def applyQuality(self):
+        """
+        Turns the degradation steps of the watchdog level on or off.
+
+        The steps are 'background' (the background stops animating), 'hud' (the
+        life icons and score are updated less often) and 'audio' (repeated sounds
+        within AUDIO_COALESCE seconds are dropped). Other steps are left to Invaders.
+        """
+        if self._watchdog is None:
+            self._quality = 0
+            self._degraded = ()
+        else:
+            self._quality = self._watchdog.level
+            self._degraded = self._watchdog.active
+        self._sounds.coalesce = AUDIO_COALESCE if 'audio' in self._degraded else 0
+
+    # HOOKS TO OBSERVE THE UPDATE PHASES
+    def addHook(self,hook):
+        """
+        Adds a hook that observes the phases of update.
+
+        Before each phase that the hook watches, update calls hook.enter with the
+        name of the phase, and after it, hook.leave. Hooks are called in the order
+        they were added when a phase begins, and in reverse order when it ends.
+
+        Parameter hook: the hook to add
+        Precondition: hook is an instance of PhaseHook
+        """
+        self._hooks.append(hook)
+        self.buildStages()
+
+    def removeHook(self,hook):
+        """
+        Removes a hook added by addHook.
+
+        Parameter hook: the hook to remove
+        Precondition: hook was added to this wave
+        """
+        self._hooks.remove(hook)
+        self.buildStages()
+
+    def buildStages(self):
+        """
+        Builds the list of phases that update runs, with the hooks watching each.
+
+        This is only done when the hooks change, so update does not look anything
+        up by name.
+        """
+        self._stages = []
+        for name, method in self.PHASES:
+            hooks = tuple(hook for hook in self._hooks if hook.watches(name))
+            self._stages.append((name,getattr(type(self),method),hooks))
+        self._hooked = len(self._hooks) > 0
+
     # UPDATE METHOD HELPERS
     def moveAliensH(self):
         """
         Moves the wave of aliens horizontally until they reach one separation from
         the edge of the screen, and then moves them down one separation.
 
-        The method first records all the x-coordinates of the alive Aliens in the wave;
-        then it finds the maximum and minimum x-coordinates to determine the edges
-        of the wave. It checks the direction of motion and if the boundary of the wave
-        has reached that direction's side of the playing field; if the latter is true,
-        it calls the helper function for vertical motion and moves the aliens down.
-        Then it reverses the direction.
+        The method first asks the formation for the minimum and maximum x-coordinates
+        of the alive Aliens to determine the edges of the wave. The formation keeps
+        its leftmost and rightmost columns up to date, so this takes constant time.
+        It checks the direction of motion and if the boundary of the wave has reached
+        that direction's side of the playing field; if the latter is true, it calls
+        the helper function for vertical motion and moves the aliens down. Then it
+        reverses the direction.
 
         Otherwise, it moves the wave horizontally based on a predetermined speed.
         Also, the horizontal motion occurs in steps after each certain number of
         animation frames determined by the _alienSpeed attribute, so it resets the
         time counter (which measures animation frames passed) to 0.
         """
-        alien_positions = []
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    alien_positions.append(alien.getX())
-        if alien_positions != []:
-            rightmost = max(alien_positions)
-            leftmost = min(alien_positions)
+        extent = self._formation.extent()
+        if extent is not None:
+            leftmost, rightmost = extent
 
             if (self._direction == 'right' and rightmost >= GAME_WIDTH -
                 ALIEN_H_SEP - ALIEN_WIDTH/2):
@@ -420,30 +690,21 @@ class Wave(object):
             elif self._direction == 'left' and leftmost <= ALIEN_H_SEP + ALIEN_WIDTH/2:
                 self.moveAliensV()
                 self._direction = 'right'
+            elif self._direction == 'right':
+                self._formation.march(ALIEN_H_WALK)
+                self._time = 0
             else:
-                for row in self._aliens:
-                    for alien in row:
-                        if alien != None and self._direction == 'right':
-                            alien.setX(alien.getX() + ALIEN_H_WALK)
-                            alien.frame = (alien.frame+1)%2
-                            self._time = 0
-                        if alien != None and self._direction == 'left':
-                            alien.setX(alien.getX() - ALIEN_H_WALK)
-                            alien.frame = (alien.frame+1)%2
-                            self._time = 0
+                self._formation.march(-ALIEN_H_WALK)
+                self._time = 0
 
     def moveAliensV(self):
         """
         Moves the wave down when called.
 
-        Loops over self._aliens and moves each alien down. This occurs once each
-        step, so it resets the time counter to 0.
+        Drops the whole formation in one step. This occurs once each step, so it
+        resets the time counter to 0.
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    alien.setY(alien.getY() - ALIEN_V_WALK)
-                    alien.frame = (alien.frame+1)%2
+        self._formation.drop(ALIEN_V_WALK)
         self._time = 0
 
     def moveShipBolts(self):
@@ -452,17 +713,17 @@ class Wave(object):
 
         Checks if the bolt is a player bolt and increases its y-coordinate if yes;
         if the bottom of the bolt goes outside the top of the window, the bolt
-        is deleted.
+        is returned to the pool.
         """
-        for bolt in self._bolts:
+        i = 0
+        while i < len(self._bolts):
+            bolt = self._bolts[i]
             if bolt.getIsPlayerBolt():
                 bolt.setY(bolt.getY() + bolt.getVelocity())
-                i = 0
-                while i < len(self._bolts):
-                    if self._bolts[i].getY() > GAME_HEIGHT + BOLT_HEIGHT/2:
-                        del self._bolts[i]
-                    else:
-                        i += 1
+            if bolt.getY() > GAME_HEIGHT + BOLT_HEIGHT/2:
+                self._bolts.release(i)
+            else:
+                i += 1
 
     def moveAlienBolts(self):
         """
@@ -470,26 +731,28 @@ class Wave(object):
 
         Checks if each bolt is a player bolt and decreases its y-coordinate if no;
         if the top of the bolt goes outside the bottom of the window, the bolt
-        is deleted.
+        is returned to the pool.
         """
-        for bolt in self._bolts:
+        i = 0
+        while i < len(self._bolts):
+            bolt = self._bolts[i]
             if not bolt.getIsPlayerBolt():
                 bolt.setY(bolt.getY() + bolt.getVelocity())
-                i = 0
-                while i < len(self._bolts):
-                    if self._bolts[i].getY() < 0 - BOLT_HEIGHT/2:
-                        del self._bolts[i]
-                    else:
-                        i += 1
+            if bolt.getY() < 0 - BOLT_HEIGHT/2:
+                self._bolts.release(i)
+            else:
+                i += 1
 
     def animateBground(self):
         """
         Animates the background GSprite.
 
         Increments the frame attribute of the GSprite and resets background-specific
-        time steps to 0.
+        time steps to 0. If the 'background' step is degraded, the frame is kept, so
+        the background is not redrawn, but the timing of the wave does not change.
         """
-        self._bground.frame = (self._bground.frame+1)%8
+        if not 'background' in self._degraded:
+            self._bground.frame = (self._bground.frame+1)%8
         self._bgTime = 0
 
     def isEachPlayerBolt(self):
@@ -502,14 +765,44 @@ class Wave(object):
         for bolt in self._bolts:
             bolt.isPlayerBolt()
 
+    def updateBatches(self):
+        """
+        Copies the living aliens of the formation into the sprite batches.
+
+        The batches are only rewritten when the formation has moved or lost an alien
+        since they were last updated, which is once per alien step or kill.
+        """
+        if self._batchVersion != self._formation.getVersion():
+            for kind in range(len(self._batches)):
+                self._batches[kind].update(self._formation.getQuads(kind))
+            self._batchVersion = self._formation.getVersion()
+
+    def updateLives(self):
+        """
+        Updates the life icons to show _lives ships.
+
+        Icons are only created or removed when the number of lives differs from the
+        number of icons, so a frame where the lives do not change allocates nothing.
+        The icons run right to left, so the leftmost icon is the one removed.
+        """
+        while len(self._lifeIcons) > self._lives:
+            self._lifeIcons.pop()
+        while len(self._lifeIcons) < self._lives:
+            self._lifeIcons.append(GImage(x=GAME_WIDTH - 100 - 40*len(self._lifeIcons),
+                                          y=GAME_HEIGHT-40,width=35,
+                                          height=35,source='ship.png'))
+
     def updateScore(self):
         """
         Updates the display of score to be _scoreValue.
 
         Used to update the display of score every animation frame without creating
-        a new GLabel object each time.
+        a new GLabel object each time. The label text is only reassigned when the
+        score differs from _scoreShown, since every new text re-renders the label.
         """
-        self._score.text = str(self._scoreValue)
+        if self._scoreShown != self._scoreValue:
+            self._scoreShown = self._scoreValue
+            self._score.text = str(self._scoreValue)
 
     def updateMusicNote(self):
         """
@@ -519,20 +812,38 @@ class Wave(object):
         list; it is checked every animation frame, but only changes every alien
         step.
         """
-        if self._musicSounds != None:
-            self._musicNote = self._musicSounds[self._musicNotePos]
+        self._musicNote = self._musicSounds[self._musicNotePos]
+
+    def rememberPositions(self):
+        """
+        Records the positions of the ship and the bolts at the start of an update.
+
+        Anything blended by the last draw is moved back to its true position first,
+        so the update only ever sees true positions.
+        """
+        if self._ship != None:
+            self._ship.remember()
+        for bolt in self._bolts:
+            bolt.remember()
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw(self,view):
+    def draw(self,view,alpha=1):
         """
         Draws the game objects in wave to the view.
 
+        If alpha is less than 1, the game runs with a fixed time step and this frame
+        falls alpha of the way between two updates.  The ship and the bolts, which
+        move every update, are then drawn blended between their last two positions.
+        The aliens only move every alien step, so they are never blended.
+
         This method draws all of the objects in wave. If there is sound, it
         will draw the unmuted sound icon. If there is no sound, it will draw the
         muted sound icon.
 
-        This method also loops through all of the aliens and
-        bolts in _aliens and _bolts, respectively, and draws those.
+        This method also loops through all of the bolts in _bolts and draws them.
+        The aliens are drawn as one sprite batch per alien image, which is refreshed
+        from _formation first, so the number of drawing commands does not depend on
+        the number of aliens.
 
         If the ship attribute is not None, it will draw the ship.
 
@@ -540,15 +851,26 @@ class Wave(object):
         remaining on the top right corner of the screen
 
         It will always draw the defense line and the score.
+
+        Parameter view: the view to draw to
+        Precondition: view is an instance of GView; inherited from GameApp
+
+        Parameter alpha: the fraction of an update since the last update
+        Precondition: alpha is a float in 0..1
         """
+        if alpha < 1 or self._blended:
+            if self._ship != None:
+                self._ship.blend(alpha)
+            for bolt in self._bolts:
+                bolt.blend(alpha)
+            self._blended = alpha < 1
         self._bground.draw(view)
         self._muteIcon.draw(view)
         for bolt in self._bolts:
             bolt.draw(view)
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    alien.draw(view)
+        self.updateBatches()
+        for batch in self._batches:
+            batch.draw(view)
         if self._ship != None:
             self._ship.draw(view)
         for life in self._lifeIcons:
@@ -564,33 +886,58 @@ class Wave(object):
         alien speed, plays a sound effect, and increases score when a player bolt
         collides with an alien.
 
-        Loops through the wave and determines if any player bolt has collided with
-        a currently alive alien; if this is true, it completes the above actions.
+        Loops through the bolts and asks findAlienCell which alien, if any, each
+        player bolt has hit; if there is one, it completes the above actions.
         This updates every animation frame to adjust the wave after collision.
         """
-        for i in range(len(self._aliens)):
-            for j in range(len(self._aliens[i])):
-                for k in range(len(self._bolts)):
-                    if self._aliens[i][j] != None:
-                        if self._aliens[i][j].collides(self._bolts[k]):
-                            self._aliens[i][j] = None
-                            del self._bolts[k]
-                            self._alienSpeed = self._alienSpeed*0.97
-                            if self._alienPop != None:
-                                self._alienPop.play()
-                            self._scoreValue += 100
+        i = 0
+        while i < len(self._bolts):
+            cell = None
+            if self._bolts[i].getIsPlayerBolt():
+                cell = self.findAlienCell(self._bolts[i])
+            if cell is None:
+                i += 1
+            else:
+                self._formation.kill(cell[0],cell[1])
+                self._bolts.release(i)
+                self._alienSpeed = self._alienSpeed*0.97
+                self._sounds.play('alienPop')
+                self._scoreValue += 100
+
+    def findAlienCell(self,bolt):
+        """
+        Returns the (row, column) of the alive alien that collides with bolt, or
+        None if the bolt does not hit any alien.
+
+        The aliens sit on a regular grid, so the cells that the bolt overlaps are
+        computed directly from its edges relative to the bottom left cell of the
+        formation. Only the aliens in those cells (at most four) are tested.
+
+        Parameter bolt: The laser bolt to check
+        Precondition: bolt is of class Bolt
+        """
+        originX = self._formation.getX(0,0)
+        originY = self._formation.getY(0,0)
+        left = math.floor((bolt.getX()-BOLT_WIDTH/2-originX)/ALIEN_H_PITCH+0.5)
+        right = math.floor((bolt.getX()+BOLT_WIDTH/2-originX)/ALIEN_H_PITCH+0.5)
+        bottom = math.floor((bolt.getY()-BOLT_HEIGHT/2-originY)/ALIEN_V_PITCH+0.5)
+        top = math.floor((bolt.getY()+BOLT_HEIGHT/2-originY)/ALIEN_V_PITCH+0.5)
+        for row in range(max(bottom,0),min(top,self._formation.getRows()-1)+1):
+            for col in range(max(left,0),min(right,self._formation.getCols()-1)+1):
+                if self._formation.collides(row,col,bolt):
+                    return (row,col)
+        return None
 
     def dLineCollision(self):
         """
         Returns True if the wave goes below the defense line.
 
-        Finds the aliens with lowest y-coordinates; if the bottom of any of those
-        aliens goes beneath the defense line, it returns true.
+        Reads the lowest row with a living alien from the formation; if the bottom
+        of that row goes beneath the defense line, it returns true.
         """
-        min_aliens = self.findLowestAliens()
-        for alien in min_aliens:
-            if alien.getY() <= DEFENSE_LINE + ALIEN_HEIGHT/2:
-                return True
+        row = self._formation.getBottomRow()
+        if row != -1 and self._formation.getY(row,0) <= DEFENSE_LINE + ALIEN_HEIGHT/2:
+            return True
 
     def shipCollision(self):
         """
@@ -601,29 +948,26 @@ class Wave(object):
         the ship; if this is true, it completes the above actions.
         This updates every animation frame to adjust the wave after collision.
         """
-        for i in range(len(self._bolts)):
-            if self._ship != None:
-                if self._ship.collides(self._bolts[i]):
-                    self._ship = None
-                    del self._bolts[i]
-                    if self._shipBlast != None:
-                        self._shipBlast.play()
-                    self._lives -= 1
+        i = 0
+        while self._ship != None and i < len(self._bolts):
+            if self._ship.collides(self._bolts[i]):
+                self._ship = None
+                self._bolts.release(i)
+                self._sounds.play('shipBlast')
+                self._lives -= 1
+            else:
+                i += 1
 
     # HELPER METHODS FOR STATE CHANGES
     def noAliens(self):
         """
         Checks if there are no aliens left.
 
-        Loops through the wave to see if all aliens are type None; if this is
-        true, it sets the attribute _noAliens to true.
+        Asks the formation how many aliens are alive (a count kept up to date as
+        alienCollision kills aliens); if there are none, it sets the attribute
+        _noAliens to true.
         """
-        num_aliens = 0
-        for row in self._aliens:
-            for alien in row:
-                if alien != None:
-                    num_aliens += 1
-        if num_aliens == 0:
+        if self._formation.count() == 0:
             self._noAliens = True
 
     # HELPER METHODS FOR MUTING
@@ -631,38 +975,32 @@ class Wave(object):
         """
         Mutes all of the sounds in the game.
 
-        This method checks if _nosound == False (there is sound), then once the
-        player presses the key 'm', all of the sound objects in the game is set
-        to None. A key press is when a key is pressed for the FIRST TIME. We do
-        not want the sound to continue to change as we hold down the key. After
-        setting all of the sounds to None, the sound icon is also changed to an
-        image where there is no sound.
+        This method checks if _mute == False (there is sound), then once the
+        player presses the key 'm', the shared sound bank is muted. A key press is
+        when a key is pressed for the FIRST TIME. We do not want the sound to
+        continue to change as we hold down the key. After muting the bank, the
+        sound icon is also changed to an image where there is no sound.
         """
         if self._mute == False:
             curr_keys = input.is_key_down('m')
             change = curr_keys == True and self._lastkeys == False
 
             if change:
-                self._shipPew = None
-                self._alienPew = None
-                self._shipBlast = None
-                self._alienPop = None
-                self._musicSounds = None
+                self._sounds.muted = True
                 self._mute = True
-                self._muteIcon = GImage(x=GAME_WIDTH - 40,y=GAME_HEIGHT - 40,width=40,
-                                        height=40,source='soundOff.png')
+                self._muteIcon = self._soundIcons[1]
             self._lastkeys = curr_keys
 
     def unmute(self,input):
         """
         Unmutes all of the sounds in the game.
 
-        This method checks if _nosound == True (there is no sound), then once the
-        player presses the key 'm', all of the sound objects in the game is reset
-        to its original sound objects. A key press is when a key is pressed for
-        the FIRST TIME. We do not want the sound to continue to change as we hold
-        down the key. After setting all of the sounds to back to the original
-        sound objects, the sound icon is also changed to an image where there is sound.
+        This method checks if _mute == True (there is no sound), then once the
+        player presses the key 'm', the shared sound bank is unmuted. The sounds
+        were never discarded, so nothing is loaded again. A key press is when a key
+        is pressed for the FIRST TIME. We do not want the sound to continue to
+        change as we hold down the key. After unmuting the bank, the sound icon is
+        also changed to an image where there is sound.
         """
 
         if self._mute == True:
@@ -670,14 +1008,8 @@ class Wave(object):
             change = curr_keys == True and self._lastkeys == False
 
             if change:
-                self._shipPew = Sound('pew1.wav')
-                self._alienPew = Sound('pew2.wav')
-                self._shipBlast = Sound(random.choice(['blast1.wav','blast2.wav','blast3.wav']))
-                self._alienPop = Sound(random.choice(['pop1.wav','pop2.wav']))
-                self._musicSounds = [Sound('musicNote1.wav'),Sound('musicNote2.wav'),
-                                        Sound('musicNote1.wav'),Sound('musicNote3.wav')]
+                self._sounds.muted = False
                 self._mute = False
-                self._muteIcon = GImage(x=GAME_WIDTH - 40,y=GAME_HEIGHT - 40,width=40,
-                                        height=40,source='soundOn.png')
+                self._muteIcon = self._soundIcons[0]
 
             self._lastkeys = curr_keys